@@ -5,16 +5,21 @@ A web application that creates interactive comic book stories using AI.
 Users provide an initial prompt, AI generates scenes with comic panels and branching choices.
 """
 
+import hashlib
+import logging
 import streamlit as st
-from typing import Optional
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
 # Import project modules
 from config.settings import settings
-from models.story import Story
-from services.story_service import get_story_service
+from models.story import Story, Scene, escape_scene_text
+from services.story_service import StoryService, get_story_service
 from utils.session_manager import SessionManager
-from components.story_display import display_scene, display_ending_scene
-from components.comic_display import display_comic_panel, display_comic_panel_ending, display_loading_panel
+from components.story_display import build_scene_html, display_scene, display_ending_scene
+from components.comic_display import build_comic_panel_html, display_comic_panel, display_comic_panel_ending, display_loading_panel
 from components.choice_selector import display_choices, display_choice_prompt
 from components.story_history import display_story_history, display_stats_sidebar
 from utils.comic_exporter import export_story_pdf, get_pdf_download_name
@@ -29,17 +34,31 @@ st.set_page_config(
 )
 
 
-def inject_comic_theme() -> None:
-    """Inject comic book themed CSS styling."""
-    st.markdown("""
+# Services log through the logging module; the app script reruns on every
+# interaction, so attach the console handler only once per process
+_services_logger = logging.getLogger("services")
+if not _services_logger.handlers:
+    _services_handler = logging.StreamHandler()
+    _services_handler.setFormatter(logging.Formatter("%(message)s"))
+    _services_logger.addHandler(_services_handler)
+    _services_logger.setLevel(logging.INFO)
+
+
+# Comic fonts, loaded with <link> tags instead of a CSS @import so the font
+# stylesheet is fetched in parallel instead of blocking the theme styles.
+_FONT_LINKS_HTML = (
+    '<link rel="preconnect" href="https://fonts.googleapis.com">'
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+    '<link href="https://fonts.googleapis.com/css2?family=Bangers&family=Comic+Neue:wght@400;700&display=swap" rel="stylesheet">'
+)
+
+# Comic book theme stylesheet, built once at import time.
+_COMIC_CSS = """
     <style>
     /* ========================================
        COMIC BOOK THEME - Main Styles
        ======================================== */
     
-    /* Import Comic Font */
-    @import url('https://fonts.googleapis.com/css2?family=Bangers&family=Comic+Neue:wght@400;700&display=swap');
-    
     /* Hide Streamlit Branding but keep menu functional */
     footer {visibility: hidden;}
     .stDeployButton {display: none;}
@@ -79,8 +98,7 @@ def inject_comic_theme() -> None:
     }
     
     /* Sidebar toggle button - always visible */
-    button[data-testid="stSidebarCollapseButton"],
-    button[data-testid="baseButton-headerNoPadding"] {
+    button[data-testid="stSidebarCollapseButton"] {
         background: #ffeb3b !important;
         border: 3px solid #000 !important;
         border-radius: 8px !important;
@@ -88,15 +106,13 @@ def inject_comic_theme() -> None:
         color: #000 !important;
     }
     
-    button[data-testid="stSidebarCollapseButton"]:hover,
-    button[data-testid="baseButton-headerNoPadding"]:hover {
+    button[data-testid="stSidebarCollapseButton"]:hover {
         background: #fdd835 !important;
         transform: translate(1px, 1px);
         box-shadow: 2px 2px 0px #000 !important;
     }
     
-    button[data-testid="stSidebarCollapseButton"] svg,
-    button[data-testid="baseButton-headerNoPadding"] svg {
+    button[data-testid="stSidebarCollapseButton"] svg {
         fill: #000 !important;
         stroke: #000 !important;
     }
@@ -181,36 +197,45 @@ def inject_comic_theme() -> None:
         font-family: 'Comic Neue', sans-serif !important;
     }
     
-    /* Don't override colors inside custom HTML divs */
-    section[data-testid="stSidebar"] div[style] p,
-    section[data-testid="stSidebar"] div[style] span {
-        /* Allow inline styles to work */
+    /* Story progress and stats (components/story_history.py) */
+    section[data-testid="stSidebar"] h3.story-sidebar-heading {
+        font-family: 'Bangers', cursive;
+        color: #ffeb3b;
+        text-shadow: 2px 2px 0px #000;
+        margin-bottom: 10px;
     }
     
-    /* Sidebar expander fix */
-    section[data-testid="stSidebar"] .streamlit-expanderHeader {
-        background: rgba(255,255,255,0.2) !important;
-        border: 2px solid #fff !important;
-        border-radius: 8px !important;
+    section[data-testid="stSidebar"] p.story-scene-count {
+        color: #fff;
+        font-family: 'Comic Neue', sans-serif;
+        font-size: 1rem;
     }
     
-    section[data-testid="stSidebar"] .streamlit-expanderHeader p,
-    section[data-testid="stSidebar"] .streamlit-expanderHeader svg {
-        color: #fff !important;
-        fill: #fff !important;
-        font-weight: bold !important;
+    section[data-testid="stSidebar"] .story-stats-card {
+        background-color: #ffffff !important;
+        padding: 15px;
+        border-radius: 8px;
+        border: 3px solid #000;
+        margin: 10px 0;
+        box-shadow: 4px 4px 0px #000;
     }
     
-    section[data-testid="stSidebar"] .streamlit-expanderContent {
-        background: #ffffff !important;
-        border: 2px solid #000 !important;
-        border-radius: 0 0 8px 8px !important;
+    section[data-testid="stSidebar"] .story-stats-card p {
+        margin: 8px 0 !important;
+        color: #1a1a1a !important;
+        font-family: 'Comic Neue', sans-serif !important;
+        font-size: 0.95rem !important;
     }
     
-    section[data-testid="stSidebar"] .streamlit-expanderContent p {
+    section[data-testid="stSidebar"] .story-stats-card span {
         color: #1a1a1a !important;
+        font-weight: bold;
     }
     
+    section[data-testid="stSidebar"] .story-stats-card span.stat-scenes { color: #d32f2f !important; }
+    section[data-testid="stSidebar"] .story-stats-card span.stat-choices { color: #1976d2 !important; }
+    section[data-testid="stSidebar"] .story-stats-card span.stat-current { color: #388e3c !important; }
+    
     /* ========================================
        TYPOGRAPHY
        ======================================== */
@@ -398,6 +423,55 @@ def inject_comic_theme() -> None:
         margin: 30px 0;
     }
     
+    /* ========================================
+       STORY UI BLOCKS
+       ======================================== */
+    
+    .how-it-works-bubble {
+        border: 3px solid #000;
+        border-radius: 50%;
+        width: 120px;
+        height: 120px;
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+        box-shadow: 4px 4px 0px #000;
+    }
+    
+    .how-it-works-bubble .bubble-emoji {
+        font-size: 2rem;
+    }
+    
+    .how-it-works-bubble .bubble-label {
+        font-family: 'Bangers', cursive;
+        font-size: 0.9rem;
+    }
+    
+    .choice-banner {
+        background: linear-gradient(90deg, #c8e6c9 0%, #a5d6a7 100%);
+        border: 3px solid #000;
+        border-radius: 8px;
+        padding: 12px 20px;
+        margin: 10px 0;
+        box-shadow: 4px 4px 0px #000;
+        font-family: 'Bangers', cursive;
+        font-size: 1.1rem;
+    }
+    
+    .cta-prompt {
+        text-align: center;
+        margin: 20px 0;
+    }
+    
+    .cta-prompt span {
+        font-family: 'Bangers', cursive;
+        font-size: 2rem;
+        color: #d32f2f;
+        text-shadow: 2px 2px 0px #ffeb3b, 4px 4px 0px #000;
+        animation: pulse 1s ease-in-out infinite;
+    }
+    
     /* ========================================
        DOWNLOAD BUTTON
        ======================================== */
@@ -411,24 +485,108 @@ def inject_comic_theme() -> None:
         color: #fff !important;
     }
     
+    /* ========================================
+       ANIMATIONS (shared by panels and loaders)
+       ======================================== */
+    
+    @keyframes pulse {
+        0%, 100% { transform: scale(1); }
+        50% { transform: scale(1.1); }
+    }
+    
+    @keyframes pulseFade {
+        0%, 100% { transform: scale(1); opacity: 1; }
+        50% { transform: scale(1.15); opacity: 0.8; }
+    }
+    
+    @keyframes shake {
+        0%, 100% { transform: translateX(0) rotate(-5deg); }
+        50% { transform: translateX(5px) rotate(5deg); }
+    }
+    
+    @keyframes popIn {
+        0% { transform: scale(0); opacity: 0; }
+        70% { transform: scale(1.1); }
+        100% { transform: scale(1); opacity: 1; }
+    }
+    
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+
+@st.cache_resource
+def _get_theme_html() -> str:
+    """
+    Build the font links and comic stylesheet as one HTML block.
+    
+    Built once per process; cache_resource hands back the same string on
+    every hit instead of unpickling a copy like cache_data would. Blank
+    lines are dropped so Markdown keeps the links and the <style> element
+    in a single HTML block.
+    
+    Returns:
+        str: Theme HTML ready for a single st.markdown call
+    """
+    css = "\n".join(line for line in textwrap.dedent(_COMIC_CSS).splitlines() if line.strip())
+    return f"{_FONT_LINKS_HTML}\n{css}"
+
+
+def inject_comic_theme() -> None:
+    """
+    Inject comic book themed CSS styling.
+    
+    Streamlit drops any element that is not re-emitted on a rerun, so the
+    theme is still written every run, as a single element; only the HTML
+    string is cached.
+    """
+    st.markdown(_get_theme_html(), unsafe_allow_html=True)
+
+
+@st.cache_resource
+def _start_service_warmup() -> threading.Thread:
+    """
+    Start building the Gemini and image clients in the background, once per process.
+    
+    The first page render doesn't wait for it; a story started before it
+    finishes simply waits for the same cached clients.
+    
+    Returns:
+        threading.Thread: The warm-up thread
+    """
+    thread = threading.Thread(target=StoryService.warmup, name="service-warmup", daemon=True)
+    thread.start()
+    return thread
 
 
 def initialize_app() -> None:
     """Initialize the application and session state."""
+    _start_service_warmup()
     SessionManager.initialize()
     # Initialize comic mode setting
-    if 'comic_mode' not in st.session_state:
-        st.session_state.comic_mode = True
-    if 'art_style' not in st.session_state:
-        st.session_state.art_style = "western_comic"
+    st.session_state.setdefault('comic_mode', True)
+    st.session_state.setdefault('art_style', "western_comic")
+    # These keys are owned by sidebar widgets that are hidden while a story
+    # is active; re-assigning them stops Streamlit from clearing their state.
+    st.session_state.comic_mode = st.session_state.comic_mode
+    st.session_state.art_style = st.session_state.art_style
 
 
-def display_welcome_screen() -> None:
-    """Display the welcome screen for new users."""
-    # Comic-style header
-    st.markdown("""
+# "How it works" steps: (background, emoji, label, label color)
+_WELCOME_STEPS = (
+    ("#ffeb3b", "📝", "WRITE", None),
+    ("#ff5252", "🎨", "CREATE", "#fff"),
+    ("#4caf50", "🔀", "CHOOSE", "#fff"),
+    ("#42a5f5", "📥", "EXPORT", "#fff"),
+)
+
+_WELCOME_STEP_TEMPLATE = """
+            <div class="how-it-works-bubble" style="background: {background};">
+                <span class="bubble-emoji">{emoji}</span>
+                <span class="bubble-label"{label_style}>{label}</span>
+            </div>"""
+
+# Welcome header plus "how it works" panels, built once at import time
+_WELCOME_HTML = textwrap.dedent("""
     <div style="text-align: center; margin-bottom: 20px;">
         <h1 style="
             font-family: 'Bangers', cursive;
@@ -444,10 +602,6 @@ def display_welcome_screen() -> None:
             color: #1a1a1a;
         ">Create Your Own Interactive Comic Adventure!</p>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # How it works in comic panels
-    st.markdown("""
     <div style="
         background: #fff;
         border: 4px solid #000;
@@ -462,78 +616,33 @@ def display_welcome_screen() -> None:
             text-shadow: 2px 2px 0px #000;
             margin-bottom: 15px;
         ">⚡ HOW IT WORKS ⚡</h3>
-        <div style="display: flex; flex-wrap: wrap; gap: 15px; justify-content: center;">
-            <div style="
-                background: #ffeb3b;
-                border: 3px solid #000;
-                border-radius: 50%;
-                width: 120px;
-                height: 120px;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-                box-shadow: 4px 4px 0px #000;
-            ">
-                <span style="font-size: 2rem;">📝</span>
-                <span style="font-family: 'Bangers', cursive; font-size: 0.9rem;">WRITE</span>
-            </div>
-            <div style="
-                background: #ff5252;
-                border: 3px solid #000;
-                border-radius: 50%;
-                width: 120px;
-                height: 120px;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-                box-shadow: 4px 4px 0px #000;
-            ">
-                <span style="font-size: 2rem;">🎨</span>
-                <span style="font-family: 'Bangers', cursive; font-size: 0.9rem; color: #fff;">CREATE</span>
-            </div>
-            <div style="
-                background: #4caf50;
-                border: 3px solid #000;
-                border-radius: 50%;
-                width: 120px;
-                height: 120px;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-                box-shadow: 4px 4px 0px #000;
-            ">
-                <span style="font-size: 2rem;">🔀</span>
-                <span style="font-family: 'Bangers', cursive; font-size: 0.9rem; color: #fff;">CHOOSE</span>
-            </div>
-            <div style="
-                background: #42a5f5;
-                border: 3px solid #000;
-                border-radius: 50%;
-                width: 120px;
-                height: 120px;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-                box-shadow: 4px 4px 0px #000;
-            ">
-                <span style="font-size: 2rem;">📥</span>
-                <span style="font-family: 'Bangers', cursive; font-size: 0.9rem; color: #fff;">EXPORT</span>
-            </div>
+        <div style="display: flex; flex-wrap: wrap; gap: 15px; justify-content: center;">{steps}
         </div>
     </div>
-    """, unsafe_allow_html=True)
+""").strip().format(steps="".join(
+    _WELCOME_STEP_TEMPLATE.format(
+        background=background,
+        emoji=emoji,
+        label=label,
+        label_style=f' style="color: {color};"' if color else ""
+    )
+    for background, emoji, label, color in _WELCOME_STEPS
+))
+
+
+def display_welcome_screen() -> None:
+    """Display the welcome screen for new users."""
+    # Comic-style header and "how it works" panels in a single element
+    st.markdown(_WELCOME_HTML, unsafe_allow_html=True)
 
 
-def get_user_prompt() -> Optional[str]:
+def get_user_prompt() -> None:
     """
-    Get initial story prompt from user.
+    Render the story prompt input and start button.
     
-    Returns:
-        Optional[str]: User's story prompt or None
+    The story is started from the button's on_click callback (see
+    _on_start_clicked), so the rerun Streamlit performs after the click
+    already renders the new story.
     """
     st.markdown("""
     <div style="
@@ -561,75 +670,140 @@ def get_user_prompt() -> Optional[str]:
     </div>
     """, unsafe_allow_html=True)
     
-    prompt = st.text_area(
+    st.text_area(
         "Describe your story idea:",
         placeholder="Example: A brave knight discovers a dragon who just wants to be friends...",
         height=100,
         max_chars=500,
         help="Provide a brief description of the story you want to create (minimum 10 characters)",
-        label_visibility="collapsed"
+        label_visibility="collapsed",
+        key="story_prompt"
     )
     
     col1, col2, col3 = st.columns([1, 1, 2])
     
     with col1:
-        if st.button("💥 START ADVENTURE!", type="primary", width="stretch"):
-            if prompt and len(prompt.strip()) >= 10:
-                return prompt.strip()
-            else:
-                st.error("⚠️ POW! Enter at least 10 characters!")
+        st.button(
+            "💥 START ADVENTURE!",
+            type="primary",
+            width="stretch",
+            on_click=_on_start_clicked
+        )
+        if st.session_state.pop('prompt_too_short', False):
+            st.error("⚠️ POW! Enter at least 10 characters!")
+
+
+def _on_start_clicked() -> None:
+    """Validate the prompt and start the story (start button callback)."""
+    prompt = st.session_state.get('story_prompt', '')
+    if prompt and len(prompt.strip()) >= 10:
+        handle_story_start(prompt.strip())
+    else:
+        st.session_state.prompt_too_short = True
+
+
+def _read_generation_settings() -> Tuple[bool, str, bool, int]:
+    """
+    Read the story generation settings from session state.
     
-    return None
+    Returns:
+        Tuple[bool, str, bool, int]: comic_mode, art_style, page_mode, num_panels
+    """
+    state = st.session_state
+    return (
+        state.get('comic_mode', True),
+        state.get('art_style', 'western_comic'),
+        state.get('page_mode', False),
+        state.get('num_panels', 4)
+    )
+
+
+@st.cache_resource
+def _get_story_service(
+    generate_images: bool,
+    art_style: str,
+    page_mode: bool,
+    num_panels: int
+) -> StoryService:
+    """
+    Get a story service for the given generation settings.
+    
+    Cached with st.cache_resource so the service and its API clients are
+    built once per configuration instead of on every button click.
+    
+    Args:
+        generate_images: Whether to generate comic images
+        art_style: Art style for image generation
+        page_mode: Whether to generate multi-panel comic pages
+        num_panels: Number of panels per page in page mode
+        
+    Returns:
+        StoryService: Shared service instance for this configuration
+    """
+    return StoryService(
+        generate_images=generate_images,
+        art_style=art_style,
+        page_mode=page_mode,
+        num_panels=num_panels
+    )
 
 
 def handle_story_start(prompt: str) -> None:
     """
     Handle starting a new story.
     
+    Runs as a button callback, before the script reruns, so no explicit
+    st.rerun() is needed to show the result.
+    
     Args:
         prompt: User's initial story prompt
     """
+    # Animated loading panel, sent once and cleared when generation ends
+    loading_panel = st.empty()
     try:
         SessionManager.set_loading(True)
         SessionManager.clear_messages()
         
         # Get settings from session state
-        comic_mode = st.session_state.get('comic_mode', True)
-        art_style = st.session_state.get('art_style', 'western_comic')
-        page_mode = st.session_state.get('page_mode', False)
-        num_panels = st.session_state.get('num_panels', 4)
+        comic_mode, art_style, page_mode, num_panels = _read_generation_settings()
         
-        # Dynamic spinner message based on mode
+        # Dynamic status message based on mode
         spinner_msg = "📖 CREATING YOUR COMIC PAGE... KAPOW!" if page_mode else "💥 CREATING YOUR COMIC... KAPOW!"
         
-        with st.spinner(spinner_msg):
-            from services.story_service import StoryService
-            story_service = StoryService(
-                generate_images=comic_mode,
-                art_style=art_style,
-                page_mode=page_mode,
-                num_panels=num_panels
+        if comic_mode:
+            with loading_panel.container():
+                display_loading_panel()
+        
+        with st.status(spinner_msg, expanded=True) as status:
+            story_service = _get_story_service(comic_mode, art_style, page_mode, num_panels)
+            story = story_service.start_new_story(
+                prompt, on_progress=status.write, on_stream=status.write_stream
             )
-            story = story_service.start_new_story(prompt)
             SessionManager.set_story(story)
             
             success_msg = "📖 BOOM! Your comic page is ready!" if page_mode else "💥 BOOM! Your comic panel is ready!"
             SessionManager.set_success(success_msg)
+            status.update(label=success_msg, state="complete", expanded=False)
         
     except Exception as e:
         SessionManager.set_error(f"Failed to start story: {str(e)}")
     finally:
+        loading_panel.empty()
         SessionManager.set_loading(False)
-        st.rerun()
 
 
 def handle_choice_selection(choice_id: int) -> None:
     """
     Handle user's choice selection.
     
+    Runs as a choice button callback, before the script reruns, so no
+    explicit st.rerun() is needed to show the new scene.
+    
     Args:
         choice_id: ID of the selected choice
     """
+    # Animated loading panel, sent once and cleared when generation ends
+    loading_panel = st.empty()
     try:
         SessionManager.set_loading(True)
         SessionManager.clear_messages()
@@ -640,36 +814,71 @@ def handle_choice_selection(choice_id: int) -> None:
             return
         
         # Get settings from session state
-        comic_mode = st.session_state.get('comic_mode', True)
-        art_style = st.session_state.get('art_style', 'western_comic')
-        page_mode = st.session_state.get('page_mode', False)
-        num_panels = st.session_state.get('num_panels', 4)
+        comic_mode, art_style, page_mode, num_panels = _read_generation_settings()
         
-        # Dynamic spinner message based on mode
+        # Dynamic status message based on mode
         spinner_msg = "📖 CREATING NEXT PAGE... ZAP!" if page_mode else "⚡ CREATING NEXT PANEL... ZAP!"
         
-        with st.spinner(spinner_msg):
-            from services.story_service import StoryService
-            story_service = StoryService(
-                generate_images=comic_mode,
-                art_style=art_style,
-                page_mode=page_mode,
-                num_panels=num_panels
+        if comic_mode:
+            with loading_panel.container():
+                display_loading_panel()
+        
+        with st.status(spinner_msg, expanded=True) as status:
+            story_service = _get_story_service(comic_mode, art_style, page_mode, num_panels)
+            next_scene = story_service.continue_story(
+                story, choice_id, on_progress=status.write, on_stream=status.write_stream
             )
-            next_scene = story_service.continue_story(story, choice_id)
             
             # Check if this is the ending
             if not next_scene.choices:
-                SessionManager.set_success("🎬 THE END! Export your comic as PDF!")
+                success_msg = "🎬 THE END! Export your comic as PDF!"
             else:
                 success_msg = "📖 WHAM! New page created!" if page_mode else "💥 WHAM! New panel created!"
-                SessionManager.set_success(success_msg)
+            SessionManager.set_success(success_msg)
+            status.update(label=success_msg, state="complete", expanded=False)
         
     except Exception as e:
         SessionManager.set_error(f"Failed to continue story: {str(e)}")
     finally:
+        loading_panel.empty()
         SessionManager.set_loading(False)
-        st.rerun()
+
+
+def _scene_cache_key(scene: Scene) -> tuple:
+    """
+    Build a hashable key identifying a scene's rendered output.
+    
+    Args:
+        scene: Scene to fingerprint
+        
+    Returns:
+        tuple: Values that fully determine the scene's panel HTML
+    """
+    return (
+        scene.id,
+        scene.content,
+        scene.image_path,
+        scene.scene_title,
+        scene.is_page_mode
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _render_historic_scene_html(scene_key: tuple, comic_mode: bool, _scene: Scene) -> str:
+    """
+    Render a past scene to HTML, cached so its image is not re-encoded each rerun.
+    
+    Args:
+        scene_key: Cache key from _scene_cache_key
+        comic_mode: Whether to render as a comic panel or plain text
+        _scene: Scene to render (leading underscore: not hashed by Streamlit)
+        
+    Returns:
+        str: Rendered scene HTML
+    """
+    if comic_mode:
+        return build_comic_panel_html(_scene, _scene.id)
+    return build_scene_html(_scene, _scene.id)
 
 
 def display_story_interface(story: Story) -> None:
@@ -688,81 +897,228 @@ def display_story_interface(story: Story) -> None:
     # Check if comic mode is enabled
     comic_mode = st.session_state.get('comic_mode', True)
     
-    # Display all scenes in the story (full history)
-    for i, scene in enumerate(story.scenes):
-        is_current = (i == story.current_scene_index)
-        
-        # Display scene as comic panel or text
-        if not scene.choices:
-            # This is an ending scene
-            if comic_mode:
-                display_comic_panel_ending(scene, scene.id)
-            else:
-                display_ending_scene(scene, scene.id)
+    # Past scenes are read-only; only the current scene gets widgets
+    for scene in story.scenes[:story.current_scene_index]:
+        _render_scene_readonly(scene, comic_mode)
+    
+    _render_scene_interactive(current_scene, comic_mode)
+
+
+# "YOU CHOSE" banner with its trailing divider, emitted as one element
+_CHOSEN_TEMPLATE = textwrap.dedent("""
+    <div class="choice-banner">✓ YOU CHOSE: {text}</div>
+    <hr/>
+""").strip()
+
+
+def _render_selected_choice(scene: Scene) -> None:
+    """
+    Show the choice the user made for a scene, if any.
+    
+    Args:
+        scene: Scene whose selected choice should be shown
+    """
+    if scene.selected_choice_id is None:
+        return
+    
+    selected_choice = scene.get_selected_choice()
+    if selected_choice:
+        st.markdown(_CHOSEN_TEMPLATE.format(text=escape_scene_text(selected_choice.text)), unsafe_allow_html=True)
+
+
+def _render_scene_readonly(scene: Scene, comic_mode: bool) -> None:
+    """
+    Render a past scene from cached HTML, without any widgets.
+    
+    Args:
+        scene: Past scene to render
+        comic_mode: Whether to render as a comic panel or plain text
+    """
+    st.markdown(
+        _render_historic_scene_html(_scene_cache_key(scene), comic_mode, scene),
+        unsafe_allow_html=True
+    )
+    st.markdown("---")
+    _render_selected_choice(scene)
+
+
+def _render_scene_interactive(scene: Scene, comic_mode: bool) -> None:
+    """
+    Render the current scene along with its choice buttons.
+    
+    Args:
+        scene: Current scene to render
+        comic_mode: Whether to render as a comic panel or plain text
+    """
+    if not scene.choices:
+        # This is an ending scene
+        if comic_mode:
+            display_comic_panel_ending(scene, scene.id)
         else:
-            # Normal scene
-            if comic_mode:
-                display_comic_panel(scene, scene.id)
-            else:
-                display_scene(scene, scene.id)
-            
-            # Show selected choice if user has made one
-            if scene.selected_choice_id is not None:
-                selected_choice = scene.get_selected_choice()
-                if selected_choice:
-                    st.markdown(f"""
-                    <div style="
-                        background: linear-gradient(90deg, #c8e6c9 0%, #a5d6a7 100%);
-                        border: 3px solid #000;
-                        border-radius: 8px;
-                        padding: 12px 20px;
-                        margin: 10px 0;
-                        box-shadow: 4px 4px 0px #000;
-                        font-family: 'Bangers', cursive;
-                        font-size: 1.1rem;
-                    ">
-                        ✓ YOU CHOSE: {selected_choice.text}
-                    </div>
-                    """, unsafe_allow_html=True)
-                    st.markdown("---")
+            display_ending_scene(scene, scene.id)
+        return
+    
+    # Normal scene
+    if comic_mode:
+        display_comic_panel(scene, scene.id)
+    else:
+        display_scene(scene, scene.id)
+    
+    # Show selected choice if user has made one
+    _render_selected_choice(scene)
+    
+    # Only show choice buttons if choice not yet made
+    if scene.selected_choice_id is None:
+        # Comic-style choice prompt
+        st.markdown(
+            '<div class="cta-prompt"><span>⚡ WHAT DO YOU DO? ⚡</span></div>',
+            unsafe_allow_html=True
+        )
         
-        # Only show choice buttons for the current scene if choice not yet made
-        if is_current and scene.choices and scene.selected_choice_id is None:
-            # Comic-style choice prompt
-            st.markdown("""
-            <div style="
-                text-align: center;
-                margin: 20px 0;
-            ">
-                <span style="
-                    font-family: 'Bangers', cursive;
-                    font-size: 2rem;
-                    color: #d32f2f;
-                    text-shadow: 2px 2px 0px #ffeb3b, 4px 4px 0px #000;
-                    animation: pulse 1s ease-in-out infinite;
-                ">⚡ WHAT DO YOU DO? ⚡</span>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Choice buttons with callback
-            choice_id = display_choices(
-                scene,
-                disabled=SessionManager.is_loading()
-            )
-            
-            if choice_id:
-                handle_choice_selection(choice_id)
+        # Choice buttons with callback
+        display_choices(
+            scene,
+            on_choice_selected=handle_choice_selection,
+            disabled=SessionManager.is_loading()
+        )
 
 
-def display_sidebar_controls(story: Optional[Story]) -> None:
+def _story_signature(story: Story) -> tuple:
     """
-    Display sidebar with controls and story info.
+    Build a hashable signature that changes whenever the exported PDF would.
+    
+    The PDF cache is shared by every session in the process, so the key
+    identifies the story itself (creation time and prompt) and hashes the
+    text each page shows, not just scene and choice ids.
     
     Args:
-        story: Current story or None
+        story: Story to fingerprint
+        
+    Returns:
+        tuple: Creation time and prompt, plus (scene id, image path, text
+        digest) per scene
     """
-    # Comic-style sidebar title
-    st.sidebar.markdown("""
+    return (story.created_at, story.initial_prompt) + tuple(
+        (scene.id, scene.image_path, _scene_pdf_digest(scene))
+        for scene in story.scenes
+    )
+
+
+def _scene_pdf_digest(scene: Scene) -> str:
+    """
+    Hash the scene text and selected choice text that its PDF page prints.
+    
+    Args:
+        scene: Scene to fingerprint
+        
+    Returns:
+        str: Hex SHA-256 of the scene content and selected choice text
+    """
+    choice = scene.get_selected_choice() if scene.selected_choice_id is not None else None
+    payload = "\0".join((scene.content, choice.text if choice else ""))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@st.cache_resource(show_spinner=False, ttl=60 * 60, max_entries=8)
+def _cached_story_pdf(story_signature: tuple, _story: Story) -> Tuple[bytes, str]:
+    """
+    Export a story to PDF, reusing the bytes and file name while the story is unchanged.
+    
+    Uses st.cache_resource rather than st.cache_data: the result is immutable,
+    and cache_data would pickle the whole PDF on store and copy it on every hit.
+    
+    Args:
+        story_signature: Cache key from _story_signature
+        _story: Story to export (leading underscore: not hashed by Streamlit)
+        
+    Returns:
+        Tuple[bytes, str]: PDF content and download file name
+        
+    Raises:
+        RuntimeError: If the export fails (raising keeps the failure out of the cache)
+    """
+    pdf_bytes = export_story_pdf(_story)
+    if pdf_bytes is None:
+        raise RuntimeError("PDF export failed")
+    return pdf_bytes, get_pdf_download_name(_story)
+
+
+@st.cache_resource
+def _get_pdf_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared worker pool used for background PDF exports.
+    
+    Returns:
+        ThreadPoolExecutor: Process-wide PDF export pool
+    """
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf-export")
+
+
+@st.fragment
+def _render_pdf_export(story: Story) -> None:
+    """
+    Render the PDF export controls, building the PDF off the script thread.
+    
+    Runs as a fragment (call it inside ``with st.sidebar:``) so clicking
+    DOWNLOAD PDF only reruns these controls instead of re-rendering every
+    comic panel. The export is submitted to a worker pool and its future is
+    stored in session state; a polling fragment waits for it to finish.
+    
+    Args:
+        story: Story to export
+    """
+    signature = _story_signature(story)
+    
+    # Drop a finished or pending export that no longer matches the story
+    job = st.session_state.get('pdf_job')
+    if job and job[0] != signature:
+        job = None
+        st.session_state.pop('pdf_job', None)
+    
+    if st.button("DOWNLOAD PDF", width="stretch", type="primary") and job is None:
+        # Export a snapshot so later choices can't mutate the story mid-render
+        future = _get_pdf_executor().submit(
+            _cached_story_pdf, signature, story.model_copy(deep=True)
+        )
+        job = (signature, future)
+        st.session_state.pdf_job = job
+    
+    if job is None:
+        return
+    
+    future = job[1]
+    if not future.done():
+        _poll_pdf_export()
+        return
+    
+    try:
+        pdf_bytes, pdf_name = future.result()
+    except Exception:
+        # Forget the failed job so DOWNLOAD PDF can submit a new export
+        st.session_state.pop('pdf_job', None)
+        st.error("PDF export failed.")
+        return
+    
+    st.download_button(
+        label="SAVE PDF",
+        data=pdf_bytes,
+        file_name=pdf_name,
+        mime="application/pdf",
+        width="stretch"
+    )
+
+
+@st.fragment(run_every=1)
+def _poll_pdf_export() -> None:
+    """Show export progress and rerun the app once the PDF is ready."""
+    job = st.session_state.get('pdf_job')
+    if job is None or job[1].done():
+        st.rerun()
+    st.caption("⏳ Generating PDF...")
+
+
+# Static sidebar HTML blocks, combined where no widget sits between them
+_SIDEBAR_TITLE_HTML = textwrap.dedent("""
     <h2 style="
         font-family: 'Bangers', cursive;
         color: #fff;
@@ -770,99 +1126,122 @@ def display_sidebar_controls(story: Optional[Story]) -> None:
         text-align: center;
         margin-bottom: 20px;
     ">COMIC CONTROLS</h2>
-    """, unsafe_allow_html=True)
+""").strip()
+
+_EXPORT_HEADER_HTML = textwrap.dedent("""
+    <hr/>
+    <h3 style="
+        font-family: 'Bangers', cursive;
+        color: #ffeb3b;
+        text-shadow: 2px 2px 0px #000;
+    ">EXPORT COMIC</h3>
+""").strip()
+
+_ART_STYLE_LABEL_HTML = textwrap.dedent("""
+    <p style="
+        font-family: 'Bangers', cursive;
+        color: #ffeb3b;
+        text-shadow: 2px 2px 0px #000;
+        font-size: 1.2rem;
+        margin-bottom: 8px;
+    ">🎨 ART STYLE</p>
+""").strip()
+
+_START_HINT_HTML = textwrap.dedent("""
+    <p style="
+        background: rgba(255,255,255,0.2);
+        padding: 10px;
+        border-radius: 8px;
+        color: #fff;
+        font-family: 'Comic Neue', sans-serif;
+        text-align: center;
+        margin-top: 15px;
+    ">Start a story to begin your adventure!</p>
+""").strip()
+
+
+def display_sidebar_controls(story: Optional[Story]) -> None:
+    """
+    Display sidebar with controls and story info.
     
+    Args:
+        story: Current story or None
+    """
     if story:
+        # Comic-style sidebar title
+        st.sidebar.markdown(_SIDEBAR_TITLE_HTML, unsafe_allow_html=True)
+        
         # Display story stats and history
         display_stats_sidebar(story)
         display_story_history(story)
         
-        st.sidebar.markdown("---")
-        st.sidebar.markdown("""
-        <h3 style="
-            font-family: 'Bangers', cursive;
-            color: #ffeb3b;
-            text-shadow: 2px 2px 0px #000;
-        ">EXPORT COMIC</h3>
-        """, unsafe_allow_html=True)
+        st.sidebar.markdown(_EXPORT_HEADER_HTML, unsafe_allow_html=True)
         
-        # Export to PDF button
-        if st.sidebar.button("DOWNLOAD PDF", width="stretch", type="primary"):
-            with st.spinner("Generating PDF..."):
-                pdf_bytes = export_story_pdf(story)
-                if pdf_bytes:
-                    st.sidebar.download_button(
-                        label="SAVE PDF",
-                        data=pdf_bytes,
-                        file_name=get_pdf_download_name(story),
-                        mime="application/pdf",
-                        width="stretch"
-                    )
-                else:
-                    st.sidebar.error("PDF export failed.")
+        # Export to PDF button (the PDF is built on a background thread)
+        with st.sidebar:
+            _render_pdf_export(story)
         
         # Reset button
         st.sidebar.markdown("---")
         if st.sidebar.button("🆕 NEW STORY", use_container_width=True, type="secondary"):
             SessionManager.clear_story()
             st.rerun()
+        
+        # About section - always shown at the bottom
+        st.sidebar.markdown(_about_section_html(), unsafe_allow_html=True)
     else:
-        # Art style and settings when no story is active
+        # Title and art style settings when no story is active
+        st.sidebar.markdown(
+            _SIDEBAR_TITLE_HTML + "\n" + _ART_STYLE_LABEL_HTML,
+            unsafe_allow_html=True
+        )
         _render_art_style_selector()
         
-        st.sidebar.markdown("""
-        <p style="
-            background: rgba(255,255,255,0.2);
-            padding: 10px;
-            border-radius: 8px;
-            color: #fff;
-            font-family: 'Comic Neue', sans-serif;
-            text-align: center;
-            margin-top: 15px;
-        ">Start a story to begin your adventure!</p>
-        """, unsafe_allow_html=True)
-    
-    # About section - always shown at the bottom
-    _render_about_section()
+        st.sidebar.markdown(
+            _START_HINT_HTML + "\n" + _about_section_html(),
+            unsafe_allow_html=True
+        )
+
+
+# Art style options shown in the sidebar selector
+_ART_STYLE_LABELS = {
+    "western_comic": "🦸 Marvel/DC Style",
+    "manga": "🎌 Manga Style",
+    "cartoon": "🎨 Cartoon Style",
+    "graphic_novel": "📖 Graphic Novel",
+    "retro_comic": "📰 Retro Comics"
+}
+
+_ART_STYLE_INFO = {
+    "western_comic": "Bold outlines, dynamic action, vibrant colors",
+    "manga": "Japanese style, expressive characters, speed lines",
+    "cartoon": "Bright colors, exaggerated expressions",
+    "graphic_novel": "Realistic, moody atmosphere",
+    "retro_comic": "Vintage 60s style, halftone dots"
+}
+
+_GENERATION_MODE_LABELS = {
+    "panel": "🎯 Panel Mode (1 image per scene)",
+    "page": "📖 Page Mode (multi-panel comic page)"
+}
 
 
 def _render_art_style_selector() -> None:
-    """Render the art style selector with comic theme."""
-    # Art style selector with comic label
-    st.sidebar.markdown("""
-    <p style="
-        font-family: 'Bangers', cursive;
-        color: #ffeb3b;
-        text-shadow: 2px 2px 0px #000;
-        font-size: 1.2rem;
-        margin-bottom: 8px;
-    ">🎨 ART STYLE</p>
-    """, unsafe_allow_html=True)
+    """
+    Render the art style selector with comic theme.
     
+    The ART STYLE label is emitted by the caller together with the sidebar
+    title, so both ship as a single element.
+    """
     art_style = st.sidebar.selectbox(
         "Choose comic style:",
-        options=["western_comic", "manga", "cartoon", "graphic_novel", "retro_comic"],
-        format_func=lambda x: {
-            "western_comic": "🦸 Marvel/DC Style",
-            "manga": "🎌 Manga Style",
-            "cartoon": "🎨 Cartoon Style",
-            "graphic_novel": "📖 Graphic Novel",
-            "retro_comic": "📰 Retro Comics"
-        }.get(x, x),
+        options=list(_ART_STYLE_LABELS),
+        format_func=_ART_STYLE_LABELS.get,
         label_visibility="collapsed",
-        key="art_style_select"
+        key="art_style"
     )
-    st.session_state.art_style = art_style
     
     # Show selected style preview
-    style_info = {
-        "western_comic": "Bold outlines, dynamic action, vibrant colors",
-        "manga": "Japanese style, expressive characters, speed lines",
-        "cartoon": "Bright colors, exaggerated expressions",
-        "graphic_novel": "Realistic, moody atmosphere",
-        "retro_comic": "Vintage 60s style, halftone dots"
-    }
-    
     st.sidebar.markdown(f"""
     <div style="
         background: rgba(255,255,255,0.15);
@@ -877,26 +1256,22 @@ def _render_art_style_selector() -> None:
             font-family: 'Comic Neue', sans-serif;
             margin: 0;
             font-style: italic;
-        ">💡 {style_info.get(art_style, '')}</p>
+        ">💡 {_ART_STYLE_INFO.get(art_style, '')}</p>
     </div>
+    <div style='height: 10px;'></div>
     """, unsafe_allow_html=True)
     
-    st.sidebar.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
-    
     # Comic mode toggle
     comic_mode = st.sidebar.checkbox(
         "🖼️ Enable Comic Images",
-        value=st.session_state.get('comic_mode', True),
-        key="comic_mode_check",
+        key="comic_mode",
         help="When enabled, each scene will have an AI-generated comic image"
     )
-    st.session_state.comic_mode = comic_mode
     
     # Page Mode vs Panel Mode toggle (only show if comic mode is enabled)
     if comic_mode:
-        st.sidebar.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
-        
         st.sidebar.markdown("""
+        <div style='height: 10px;'></div>
         <p style="
             font-family: 'Bangers', cursive;
             color: #ffeb3b;
@@ -909,10 +1284,7 @@ def _render_art_style_selector() -> None:
         page_mode = st.sidebar.radio(
             "Choose generation mode:",
             options=["panel", "page"],
-            format_func=lambda x: {
-                "panel": "🎯 Panel Mode (1 image per scene)",
-                "page": "📖 Page Mode (multi-panel comic page)"
-            }.get(x, x),
+            format_func=_GENERATION_MODE_LABELS.get,
             index=0 if not st.session_state.get('page_mode', False) else 1,
             key="page_mode_radio",
             label_visibility="collapsed",
@@ -953,10 +1325,15 @@ def _render_art_style_selector() -> None:
             st.session_state.num_panels = 4  # Default
 
 
-def _render_about_section() -> None:
-    """Render the About section with comic theme."""
-    st.sidebar.markdown("---")
-    st.sidebar.markdown(f"""
+def _about_section_html() -> str:
+    """
+    Build the About section (with its leading divider) for the sidebar.
+    
+    Returns:
+        str: HTML for the About block
+    """
+    return textwrap.dedent(f"""
+    <hr/>
     <div style="
         background: rgba(255,255,255,0.15);
         border: 2px solid rgba(255,255,255,0.5);
@@ -980,7 +1357,7 @@ def _render_about_section() -> None:
             🖼️ Image: Imagen 4.0 Ultra
         </p>
     </div>
-    """, unsafe_allow_html=True)
+    """).strip()
 
 
 def display_messages() -> None:
@@ -1022,7 +1399,10 @@ def display_messages() -> None:
 
 def main() -> None:
     """Main application entry point."""
-    # Inject comic theme CSS
+    # Inject comic theme CSS. This must run on every rerun: Streamlit removes
+    # elements that a run does not re-emit, so a once-per-session guard would
+    # strip the theme after the first interaction. The HTML string itself is
+    # cached (see _get_theme_html).
     inject_comic_theme()
     
     # Initialize
@@ -1039,9 +1419,7 @@ def main() -> None:
         # No active story - show welcome screen
         display_welcome_screen()
         
-        prompt = get_user_prompt()
-        if prompt:
-            handle_story_start(prompt)
+        get_user_prompt()
     else:
         # Active story - show story interface
         st.markdown("""
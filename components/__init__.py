@@ -1,11 +1,17 @@
 """Components package initialization."""
 
-from .story_display import display_scene, display_compact_scene, display_ending_scene
+from .story_display import build_scene_html, display_scene, display_compact_scene, display_ending_scene
 from .choice_selector import display_choices, display_selected_choice, display_choice_prompt
 from .story_history import display_story_history, display_scene_timeline, display_stats_sidebar
-from .comic_display import display_comic_panel, display_comic_panel_ending, display_loading_panel
+from .comic_display import (
+    build_comic_panel_html, build_comic_panel_ending_html,
+    display_comic_panel, display_comic_panel_ending, display_loading_panel
+)
 
 __all__ = [
+    'build_scene_html',
+    'build_comic_panel_html',
+    'build_comic_panel_ending_html',
     'display_scene',
     'display_compact_scene', 
     'display_ending_scene',
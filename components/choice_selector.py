@@ -6,7 +6,33 @@ Handles user choice selection with interactive buttons.
 
 import streamlit as st
 from typing import Optional, Callable
-from models.story import Choice, Scene
+from models.story import Choice, Scene, escape_scene_text
+from components.comic_display import minify_html
+
+
+# Option label cards shown above the choice buttons; they never change, so
+# the markup is built once here rather than on every rerun
+_OPTION_CARD_TEMPLATE = minify_html("""
+    <div style="
+        background: linear-gradient(180deg, {start} 0%, {end} 100%);
+        border: 4px solid #000;
+        border-radius: 10px;
+        padding: 5px;
+        box-shadow: 5px 5px 0px #000;
+        text-align: center;
+        margin-bottom: 10px;
+    ">
+        <span style="
+            font-family: 'Bangers', cursive;
+            color: #fff;
+            font-size: 0.9rem;
+            text-shadow: 1px 1px 0px #000;
+        ">{label}</span>
+    </div>
+""")
+
+_OPTION_A_CARD = _OPTION_CARD_TEMPLATE.format(start="#4caf50", end="#388e3c", label="OPTION A")
+_OPTION_B_CARD = _OPTION_CARD_TEMPLATE.format(start="#2196f3", end="#1976d2", label="OPTION B")
 
 
 def display_choices(
@@ -19,7 +45,8 @@ def display_choices(
     
     Args:
         scene: The scene containing choices
-        on_choice_selected: Callback function when choice is selected
+        on_choice_selected: Callback run via on_click when a choice is selected,
+            before the script reruns
         disabled: Whether choices should be disabled
         
     Returns:
@@ -36,66 +63,32 @@ def display_choices(
     with col1:
         choice1 = scene.choices[0]
         # Custom styled button container
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(180deg, #4caf50 0%, #388e3c 100%);
-            border: 4px solid #000;
-            border-radius: 10px;
-            padding: 5px;
-            box-shadow: 5px 5px 0px #000;
-            text-align: center;
-            margin-bottom: 10px;
-        ">
-            <span style="
-                font-family: 'Bangers', cursive;
-                color: #fff;
-                font-size: 0.9rem;
-                text-shadow: 1px 1px 0px #000;
-            ">OPTION A</span>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_OPTION_A_CARD, unsafe_allow_html=True)
         if st.button(
             f"👈 {choice1.text}",
             key=f"choice_1_{scene.id}",
             disabled=disabled,
+            on_click=on_choice_selected,
+            args=(choice1.id,),
             width="stretch",
             type="primary"
         ):
             selected_choice_id = choice1.id
-            if on_choice_selected:
-                on_choice_selected(choice1.id)
     
     with col2:
         if len(scene.choices) > 1:
             choice2 = scene.choices[1]
-            st.markdown(f"""
-            <div style="
-                background: linear-gradient(180deg, #2196f3 0%, #1976d2 100%);
-                border: 4px solid #000;
-                border-radius: 10px;
-                padding: 5px;
-                box-shadow: 5px 5px 0px #000;
-                text-align: center;
-                margin-bottom: 10px;
-            ">
-                <span style="
-                    font-family: 'Bangers', cursive;
-                    color: #fff;
-                    font-size: 0.9rem;
-                    text-shadow: 1px 1px 0px #000;
-                ">OPTION B</span>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_OPTION_B_CARD, unsafe_allow_html=True)
             if st.button(
                 f"👉 {choice2.text}",
                 key=f"choice_2_{scene.id}",
                 disabled=disabled,
+                on_click=on_choice_selected,
+                args=(choice2.id,),
                 width="stretch",
                 type="secondary"
             ):
                 selected_choice_id = choice2.id
-                if on_choice_selected:
-                    on_choice_selected(choice2.id)
     
     return selected_choice_id
 
@@ -119,7 +112,7 @@ def display_selected_choice(choice: Choice) -> None:
             font-size: 1.1rem;
             box-shadow: 4px 4px 0px #000;
         ">
-            ✓ YOU CHOSE: {choice.text}
+            ✓ YOU CHOSE: {escape_scene_text(choice.text)}
         </div>
         """,
         unsafe_allow_html=True
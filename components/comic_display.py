@@ -4,209 +4,365 @@ Comic display component.
 Renders story scenes as comic book panels with images.
 """
 
+import os
+import re
 import streamlit as st
-import base64
+import textwrap
+from string import Template
+
+try:
+    # SIMD-accelerated, drop-in replacement for the stdlib encoder
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
 from pathlib import Path
-from typing import Optional
-from models.story import Scene
+from typing import Optional, Tuple
+from models.story import Scene, escape_scene_text
+from config.settings import settings
+
+# Absolute (not symlink-resolved) so the static-folder check needs no syscalls
+_SCENE_IMAGES_DIR = Path(os.path.abspath(settings.scene_images_dir))
+
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# MIME types for data URIs; new images are saved as WebP, older ones as PNG
+_IMAGE_MIME_TYPES = {
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png"
+}
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _encode_image_base64(image_path: str, mtime: float) -> Optional[str]:
+    """
+    Read and base64-encode an image file (cached per path and modification time).
+    
+    Args:
+        image_path: Path to the image file
+        mtime: File modification time, part of the cache key so edits re-encode
+        
+    Returns:
+        Optional[str]: Base64 string or None if the file cannot be read
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            return base64.b64encode(f.read()).decode('ascii')
+    except Exception:
+        return None
 
 
 def get_image_base64(image_path: str) -> Optional[str]:
     """Convert image file to base64 for embedding."""
     try:
-        with open(image_path, 'rb') as f:
-            return base64.b64encode(f.read()).decode('utf-8')
+        mtime = Path(image_path).stat().st_mtime
+    except OSError:
+        return None
+    return _encode_image_base64(image_path, mtime)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _read_image_size(image_path: str, mtime: float) -> Optional[Tuple[int, int]]:
+    """
+    Read an image's pixel dimensions from its header (cached per path and mtime).
+    
+    Args:
+        image_path: Path to the image file
+        mtime: File modification time, part of the cache key
+        
+    Returns:
+        Optional[Tuple[int, int]]: (width, height) or None if unreadable
+    """
+    if not PIL_AVAILABLE:
+        return None
+    try:
+        with Image.open(image_path) as img:
+            return img.size
     except Exception:
         return None
 
 
-def display_comic_panel(scene: Scene, scene_number: int) -> None:
+def _img_size_attrs(image_path: str) -> str:
     """
-    Display a story scene as a comic book panel.
+    Build width/height attributes so the browser can reserve the panel's space.
     
     Args:
-        scene: The scene to display
-        scene_number: The scene number
+        image_path: Path to the image file
+        
+    Returns:
+        str: ' width="W" height="H"' or an empty string if the size is unknown
     """
-    # Check if this is a page mode scene (multi-panel)
-    is_page_mode = getattr(scene, 'is_page_mode', False)
-    scene_title = getattr(scene, 'scene_title', None)
+    try:
+        mtime = Path(image_path).stat().st_mtime
+    except OSError:
+        return ""
+    size = _read_image_size(image_path, mtime)
+    if not size:
+        return ""
+    return f' width="{size[0]}" height="{size[1]}"'
+
+
+def get_image_src(image_path: str) -> Optional[str]:
+    """
+    Get an <img> src for a scene image.
     
-    # Panel/Page header with comic styling
-    if is_page_mode:
-        # Page mode header with title
-        header_text = f"📖 PAGE {scene_number}"
-        if scene_title:
-            header_text += f": {scene_title.upper()}"
+    Images under the static scenes folder are referenced by URL so the browser
+    fetches them once and caches them; anything else (e.g. older stories saved
+    elsewhere) falls back to an embedded base64 data URI.
+    
+    Args:
+        image_path: Path to the image file
+        
+    Returns:
+        Optional[str]: Static URL or data URI, or None if the file is unavailable
+    """
+    if not Path(image_path).is_file():
+        return None
+    return _existing_image_src(image_path)
+
+
+def _existing_image_src(image_path: str) -> Optional[str]:
+    """Build the <img> src for an image already known to exist on disk."""
+    path = Path(os.path.abspath(image_path))
+    if path.parent == _SCENE_IMAGES_DIR:
+        return f"{settings.scene_images_url}/{path.name}"
+    image_base64 = get_image_base64(image_path)
+    if not image_base64:
+        return None
+    mime = _IMAGE_MIME_TYPES.get(path.suffix.lower(), "image/png")
+    return f"data:{mime};base64,{image_base64}"
+
+
+def _scene_image_src(scene: Scene) -> Optional[str]:
+    """Get the <img> src for a scene, skipping the disk check once the image is known."""
+    return _existing_image_src(scene.image_path) if scene.has_image() else None
+
+
+def minify_html(html: str) -> str:
+    """
+    Collapse the indentation and newlines in a static HTML literal.
+    
+    Used at import time on the module's markup constants so each rerun
+    ships fewer bytes; template slots like $content are filled afterwards
+    and keep their own whitespace.
+    
+    Args:
+        html: HTML source, typically an indented triple-quoted string
         
-        st.markdown(f"""
+    Returns:
+        str: Single-line HTML without comments
+    """
+    html = _HTML_COMMENT_RE.sub("", html)
+    return _WHITESPACE_RE.sub(" ", html).strip()
+
+
+# Static panel markup, built once at import; only the small dynamic slots are
+# substituted per render. Animations (pulse, shake, popIn) are defined once in
+# the global comic theme injected by app.py.
+_PAGE_HEADER_TMPL = Template(minify_html("""
+    <div style="
+        display: inline-block;
+        background: linear-gradient(135deg, #9c27b0 0%, #673ab7 100%);
+        color: #fff;
+        padding: 10px 25px;
+        border: 3px solid #000;
+        border-radius: 5px;
+        font-family: 'Bangers', cursive;
+        font-size: 1.4rem;
+        box-shadow: 3px 3px 0px #000;
+        margin-bottom: 10px;
+    ">$header_text</div>
+    """))
+
+_PANEL_HEADER_TMPL = Template(minify_html("""
+    <div style="
+        display: inline-block;
+        background: linear-gradient(135deg, #ff5252 0%, #d32f2f 100%);
+        color: #fff;
+        padding: 8px 20px;
+        border: 3px solid #000;
+        border-radius: 5px;
+        font-family: 'Bangers', cursive;
+        font-size: 1.3rem;
+        box-shadow: 3px 3px 0px #000;
+        margin-bottom: 10px;
+    ">📖 PANEL $n</div>
+    """))
+
+_FRAME_TMPL = Template(minify_html("""
+    <div style="
+        border: 5px solid #000;
+        border-radius: 8px;
+        overflow: hidden;
+        box-shadow: 8px 8px 0px #000;
+        margin: 10px 0;
+        position: relative;
+    ">
+        <img src="$src" loading="lazy" decoding="async"$size_attrs style="
+            width: 100%;
+            height: auto;
+            display: block;
+        ">
+        <!-- Halftone overlay -->
         <div style="
-            display: inline-block;
-            background: linear-gradient(135deg, #9c27b0 0%, #673ab7 100%);
-            color: #fff;
-            padding: 10px 25px;
-            border: 3px solid #000;
-            border-radius: 5px;
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+            bottom: 0;
+            background: radial-gradient(circle, rgba(0,0,0,0.05) 1px, transparent 1px);
+            background-size: 4px 4px;
+            pointer-events: none;
+        "></div>
+    </div>
+    """))
+
+_PLACEHOLDER_TMPL = Template(minify_html("""
+    <div style="
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        height: 300px;
+        border: 5px solid #000;
+        border-radius: 8px;
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+        margin: 10px 0;
+        box-shadow: 8px 8px 0px #000;
+        position: relative;
+    ">
+        <span style="
+            font-size: 48px;
+            animation: pulse 1.5s ease-in-out infinite;
+        ">🎨</span>
+        <span style="
+            color: white;
             font-family: 'Bangers', cursive;
-            font-size: 1.4rem;
-            box-shadow: 3px 3px 0px #000;
-            margin-bottom: 10px;
-        ">{header_text}</div>
-        """, unsafe_allow_html=True)
-    else:
-        # Panel mode header
-        st.markdown(f"""
+            font-size: 1.5rem;
+            margin-top: 10px;
+            text-shadow: 2px 2px 0px #000;
+        ">$placeholder_text</span>
+    </div>
+    """))
+
+# Speech bubble style with tail at BOTTOM
+_SPEECH_TMPL = Template(minify_html("""
+    <div style="
+        background: #ffffff;
+        padding: 20px 25px;
+        border-radius: 20px;
+        border: 4px solid #000;
+        margin: 15px 0 30px 0;
+        font-size: 1.1rem;
+        color: #1a1a1a;
+        font-family: 'Comic Neue', cursive;
+        line-height: 1.7;
+        box-shadow: 6px 6px 0px #000;
+        position: relative;
+    ">
+        $content
+        <!-- Speech bubble tail at BOTTOM -->
         <div style="
-            display: inline-block;
-            background: linear-gradient(135deg, #ff5252 0%, #d32f2f 100%);
-            color: #fff;
-            padding: 8px 20px;
-            border: 3px solid #000;
-            border-radius: 5px;
-            font-family: 'Bangers', cursive;
-            font-size: 1.3rem;
-            box-shadow: 3px 3px 0px #000;
-            margin-bottom: 10px;
-        ">📖 PANEL {scene_number}</div>
-        """, unsafe_allow_html=True)
-    
-    # Display the comic panel image if available
-    if scene.image_path and Path(scene.image_path).exists():
-        # Create comic frame around image
-        image_base64 = get_image_base64(scene.image_path)
-        if image_base64:
-            st.markdown(f"""
-            <div style="
-                border: 5px solid #000;
-                border-radius: 8px;
-                overflow: hidden;
-                box-shadow: 8px 8px 0px #000;
-                margin: 10px 0;
-                position: relative;
-            ">
-                <img src="data:image/png;base64,{image_base64}" style="
-                    width: 100%;
-                    display: block;
-                ">
-                <!-- Halftone overlay -->
-                <div style="
-                    position: absolute;
-                    top: 0;
-                    left: 0;
-                    right: 0;
-                    bottom: 0;
-                    background: radial-gradient(circle, rgba(0,0,0,0.05) 1px, transparent 1px);
-                    background-size: 4px 4px;
-                    pointer-events: none;
-                "></div>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.image(scene.image_path, use_container_width=True, caption=None)
-    else:
-        # Placeholder if no image - comic style
-        placeholder_text = "GENERATING COMIC PAGE..." if is_page_mode else "GENERATING ARTWORK..."
-        st.markdown(
-            f"""
-            <div style="
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                height: 300px;
-                border: 5px solid #000;
-                border-radius: 8px;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-                margin: 10px 0;
-                box-shadow: 8px 8px 0px #000;
-                position: relative;
-            ">
-                <span style="
-                    font-size: 48px;
-                    animation: pulse 1.5s ease-in-out infinite;
-                ">🎨</span>
-                <span style="
-                    color: white;
-                    font-family: 'Bangers', cursive;
-                    font-size: 1.5rem;
-                    margin-top: 10px;
-                    text-shadow: 2px 2px 0px #000;
-                ">{placeholder_text}</span>
-            </div>
-            <style>
-                @keyframes pulse {{{{
-                    0%, 100% {{{{ transform: scale(1); }}}}
-                    50% {{{{ transform: scale(1.1); }}}}
-                }}}}
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
-    
-    # Display caption/narration box - speech bubble style with tail at BOTTOM
-    st.markdown(
-        f"""
+            position: absolute;
+            bottom: -20px;
+            left: 30px;
+            width: 0;
+            height: 0;
+            border-left: 15px solid transparent;
+            border-right: 15px solid transparent;
+            border-top: 20px solid #000;
+        "></div>
         <div style="
-            background: #ffffff;
-            padding: 20px 25px;
-            border-radius: 20px;
-            border: 4px solid #000;
-            margin: 15px 0 30px 0;
-            font-size: 1.1rem;
-            color: #1a1a1a;
-            font-family: 'Comic Neue', cursive;
-            line-height: 1.7;
-            box-shadow: 6px 6px 0px #000;
+            position: absolute;
+            bottom: -14px;
+            left: 33px;
+            width: 0;
+            height: 0;
+            border-left: 12px solid transparent;
+            border-right: 12px solid transparent;
+            border-top: 17px solid #fff;
+        "></div>
+    </div>
+    """))
+
+
+# "THE END" starburst badge; fully static, so it is built once at import.
+_THE_END_HTML = minify_html("""
+    <div style="
+        text-align: center;
+        margin: 30px 0;
+        animation: popIn 0.5s ease-out;
+    ">
+        <div style="
+            display: inline-block;
             position: relative;
         ">
-            {scene.content}
-            <!-- Speech bubble tail at BOTTOM -->
+            <!-- Starburst background -->
             <div style="
                 position: absolute;
-                bottom: -20px;
-                left: 30px;
-                width: 0;
-                height: 0;
-                border-left: 15px solid transparent;
-                border-right: 15px solid transparent;
-                border-top: 20px solid #000;
-            "></div>
-            <div style="
-                position: absolute;
-                bottom: -14px;
-                left: 33px;
-                width: 0;
-                height: 0;
-                border-left: 12px solid transparent;
-                border-right: 12px solid transparent;
-                border-top: 17px solid #fff;
+                top: 50%;
+                left: 50%;
+                transform: translate(-50%, -50%);
+                width: 250px;
+                height: 250px;
+                background: 
+                    conic-gradient(
+                        from 0deg,
+                        #ffeb3b 0deg 20deg,
+                        #ff5252 20deg 40deg,
+                        #ffeb3b 40deg 60deg,
+                        #ff5252 60deg 80deg,
+                        #ffeb3b 80deg 100deg,
+                        #ff5252 100deg 120deg,
+                        #ffeb3b 120deg 140deg,
+                        #ff5252 140deg 160deg,
+                        #ffeb3b 160deg 180deg,
+                        #ff5252 180deg 200deg,
+                        #ffeb3b 200deg 220deg,
+                        #ff5252 220deg 240deg,
+                        #ffeb3b 240deg 260deg,
+                        #ff5252 260deg 280deg,
+                        #ffeb3b 280deg 300deg,
+                        #ff5252 300deg 320deg,
+                        #ffeb3b 320deg 340deg,
+                        #ff5252 340deg 360deg
+                    );
+                clip-path: polygon(
+                    50% 0%, 61% 35%, 98% 35%, 68% 57%, 79% 91%,
+                    50% 70%, 21% 91%, 32% 57%, 2% 35%, 39% 35%
+                );
+                z-index: 0;
             "></div>
+            <span style="
+                position: relative;
+                z-index: 1;
+                display: inline-block;
+                background: linear-gradient(180deg, #1a1a1a 0%, #333 100%);
+                color: #ffd700;
+                padding: 15px 40px;
+                border-radius: 10px;
+                font-size: 2.5rem;
+                font-weight: bold;
+                font-family: 'Bangers', cursive;
+                letter-spacing: 5px;
+                border: 4px solid #ffd700;
+                box-shadow: 6px 6px 0px #000;
+                text-shadow: 2px 2px 0px #000;
+            ">THE END</span>
         </div>
-        """,
-        unsafe_allow_html=True
-    )
-    
-    st.markdown("---")
-
+    </div>
+    """)
 
-def display_comic_panel_ending(scene: Scene, scene_number: int) -> None:
-    """
-    Display the final scene as a special ending panel.
-    
-    Args:
-        scene: The ending scene
-        scene_number: The scene number
-    """
-    # Check if this is a page mode scene
-    is_page_mode = getattr(scene, 'is_page_mode', False)
-    scene_title = getattr(scene, 'scene_title', 'The End')
-    
-    # Ending header with dramatic styling
-    header_text = "🎬 FINAL PAGE 🎬" if is_page_mode else "🎬 FINAL PANEL 🎬"
-    if scene_title and scene_title != "The End":
-        header_text = f"🎬 {scene_title.upper()} 🎬"
-    
-    st.markdown(f"""
+_ENDING_HEADER_TMPL = Template(minify_html("""
     <div style="
         text-align: center;
         margin: 20px 0;
@@ -222,226 +378,257 @@ def display_comic_panel_ending(scene: Scene, scene_number: int) -> None:
             font-size: 1.8rem;
             box-shadow: 5px 5px 0px #000;
             text-shadow: 1px 1px 0px #fff;
-        ">{header_text}</span>
+        ">$header_text</span>
+    </div>
+    """))
+
+_ENDING_FRAME_TMPL = Template(minify_html("""
+    <div style="
+        border: 6px solid #ffd700;
+        border-radius: 10px;
+        overflow: hidden;
+        box-shadow: 0 0 20px rgba(255,215,0,0.5), 10px 10px 0px #000;
+        margin: 15px 0;
+        position: relative;
+    ">
+        <img src="$src" loading="lazy" decoding="async"$size_attrs style="
+            width: 100%;
+            height: auto;
+            display: block;
+        ">
     </div>
-    """, unsafe_allow_html=True)
+    """))
+
+_ENDING_PLACEHOLDER_HTML = minify_html("""
+    <div style="
+        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+        height: 300px;
+        border: 5px solid #ffd700;
+        border-radius: 10px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        margin: 10px 0;
+        box-shadow: 0 0 20px rgba(255,215,0,0.5), 8px 8px 0px #000;
+    ">
+        <span style="
+            color: white;
+            font-family: 'Bangers', cursive;
+            font-size: 2rem;
+            text-shadow: 3px 3px 0px #000;
+        ">🎬 FINAL SCENE 🎬</span>
+    </div>
+    """)
+
+# Ending narration box with special styling
+_ENDING_NARRATION_TMPL = Template(minify_html("""
+    <div style="
+        background: linear-gradient(180deg, #fffef0 0%, #fff8dc 100%);
+        padding: 25px 30px;
+        border-radius: 15px;
+        border: 4px solid #ffd700;
+        margin: 15px 0;
+        font-size: 1.15rem;
+        color: #1a1a1a;
+        font-family: 'Comic Neue', cursive;
+        line-height: 1.8;
+        box-shadow: 0 0 15px rgba(255,215,0,0.3), 6px 6px 0px #000;
+    ">
+        $content
+    </div>
+    """))
+
+# Loading panel shown while artwork is generated; also fully static.
+_LOADING_PANEL_HTML = minify_html("""
+    <div style="
+        background: linear-gradient(45deg, #1a1a2e, #16213e);
+        height: 350px;
+        border-radius: 10px;
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+        margin: 10px 0;
+        border: 5px solid #000;
+        box-shadow: 8px 8px 0px #000;
+        position: relative;
+        overflow: hidden;
+    ">
+        <!-- Animated action words -->
+        <div style="
+            position: absolute;
+            top: 20px;
+            left: 20px;
+            font-family: 'Bangers', cursive;
+            font-size: 1.5rem;
+            color: #ff5252;
+            text-shadow: 2px 2px 0px #000;
+            animation: shake 0.5s ease-in-out infinite;
+        ">POW!</div>
+        <div style="
+            position: absolute;
+            bottom: 20px;
+            right: 20px;
+            font-family: 'Bangers', cursive;
+            font-size: 1.5rem;
+            color: #ffeb3b;
+            text-shadow: 2px 2px 0px #000;
+            animation: shake 0.5s ease-in-out infinite 0.25s;
+        ">ZAP!</div>
+        <div style="
+            font-size: 64px;
+            animation: pulseFade 1s ease-in-out infinite;
+        ">🎨</div>
+        <span style="
+            color: #fff;
+            font-family: 'Bangers', cursive;
+            font-size: 1.5rem;
+            margin-top: 15px;
+            text-shadow: 2px 2px 0px #000;
+        ">CREATING YOUR PANEL...</span>
+        <span style="
+            color: #aaa;
+            font-family: 'Comic Neue', cursive;
+            font-size: 1rem;
+            margin-top: 8px;
+        ">This may take a few seconds</span>
+    </div>
+    """)
+
+
+def _comic_panel_header_html(scene: Scene, scene_number: int) -> str:
+    """Build the PAGE/PANEL header badge for a comic panel."""
+    # Check if this is a page mode scene (multi-panel)
+    is_page_mode = getattr(scene, 'is_page_mode', False)
+    scene_title = getattr(scene, 'scene_title', None)
     
-    # Display the image if available
-    if scene.image_path and Path(scene.image_path).exists():
-        image_base64 = get_image_base64(scene.image_path)
-        if image_base64:
-            st.markdown(f"""
-            <div style="
-                border: 6px solid #ffd700;
-                border-radius: 10px;
-                overflow: hidden;
-                box-shadow: 0 0 20px rgba(255,215,0,0.5), 10px 10px 0px #000;
-                margin: 15px 0;
-                position: relative;
-            ">
-                <img src="data:image/png;base64,{image_base64}" style="
-                    width: 100%;
-                    display: block;
-                ">
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.image(scene.image_path, width="stretch", caption=None)
+    if is_page_mode:
+        # Page mode header with title
+        header_text = f"📖 PAGE {scene_number}"
+        if scene_title:
+            header_text += f": {escape_scene_text(scene_title.upper())}"
+        return _PAGE_HEADER_TMPL.substitute(header_text=header_text)
+    
+    return _PANEL_HEADER_TMPL.substitute(n=scene_number)
+
+
+def _comic_panel_image_html(image_src: str, size_attrs: str = "") -> str:
+    """Build the framed comic image with halftone overlay."""
+    return _FRAME_TMPL.substitute(src=image_src, size_attrs=size_attrs)
+
+
+def _comic_panel_placeholder_html(scene: Scene) -> str:
+    """Build the placeholder shown while a panel has no image."""
+    is_page_mode = getattr(scene, 'is_page_mode', False)
+    placeholder_text = "GENERATING COMIC PAGE..." if is_page_mode else "GENERATING ARTWORK..."
+    return _PLACEHOLDER_TMPL.substitute(placeholder_text=placeholder_text)
+
+
+def _comic_panel_caption_html(scene: Scene) -> str:
+    """Build the speech-bubble narration box for a comic panel."""
+    return _SPEECH_TMPL.substitute(content=scene.get_html_content())
+
+
+def _join_html(*blocks: str) -> str:
+    """
+    Join HTML blocks into a single markdown-safe string.
+    
+    Each block is dedented and stripped so it starts at column 0; otherwise
+    Markdown would render indented blocks after the first as code.
+    """
+    return "\n".join(textwrap.dedent(block).strip() for block in blocks)
+
+
+def build_comic_panel_html(scene: Scene, scene_number: int) -> str:
+    """
+    Build the complete HTML for a comic panel (header, image, caption).
+    
+    Args:
+        scene: The scene to render
+        scene_number: The scene number
+        
+    Returns:
+        str: HTML suitable for a single st.markdown call
+    """
+    image_src = _scene_image_src(scene)
+    
+    if image_src:
+        image_html = _comic_panel_image_html(image_src, _img_size_attrs(scene.image_path))
     else:
-        st.markdown(
-            """
-            <div style="
-                background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                height: 300px;
-                border: 5px solid #ffd700;
-                border-radius: 10px;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                margin: 10px 0;
-                box-shadow: 0 0 20px rgba(255,215,0,0.5), 8px 8px 0px #000;
-            ">
-                <span style="
-                    color: white;
-                    font-family: 'Bangers', cursive;
-                    font-size: 2rem;
-                    text-shadow: 3px 3px 0px #000;
-                ">🎬 FINAL SCENE 🎬</span>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+        image_html = _comic_panel_placeholder_html(scene)
     
-    # Ending narration box with special styling
-    st.markdown(
-        f"""
-        <div style="
-            background: linear-gradient(180deg, #fffef0 0%, #fff8dc 100%);
-            padding: 25px 30px;
-            border-radius: 15px;
-            border: 4px solid #ffd700;
-            margin: 15px 0;
-            font-size: 1.15rem;
-            color: #1a1a1a;
-            font-family: 'Comic Neue', cursive;
-            line-height: 1.8;
-            box-shadow: 0 0 15px rgba(255,215,0,0.3), 6px 6px 0px #000;
-        ">
-            {scene.content}
-        </div>
-        """,
-        unsafe_allow_html=True
+    return _join_html(
+        _comic_panel_header_html(scene, scene_number),
+        image_html,
+        _comic_panel_caption_html(scene)
     )
+
+
+def display_comic_panel(scene: Scene, scene_number: int) -> None:
+    """
+    Display a story scene as a comic book panel.
     
-    # THE END badge - comic book style
+    Args:
+        scene: The scene to display
+        scene_number: The scene number
+    """
+    # One element per panel: header, frame, speech bubble and divider
     st.markdown(
-        """
-        <div style="
-            text-align: center;
-            margin: 30px 0;
-            animation: popIn 0.5s ease-out;
-        ">
-            <div style="
-                display: inline-block;
-                position: relative;
-            ">
-                <!-- Starburst background -->
-                <div style="
-                    position: absolute;
-                    top: 50%;
-                    left: 50%;
-                    transform: translate(-50%, -50%);
-                    width: 250px;
-                    height: 250px;
-                    background: 
-                        conic-gradient(
-                            from 0deg,
-                            #ffeb3b 0deg 20deg,
-                            #ff5252 20deg 40deg,
-                            #ffeb3b 40deg 60deg,
-                            #ff5252 60deg 80deg,
-                            #ffeb3b 80deg 100deg,
-                            #ff5252 100deg 120deg,
-                            #ffeb3b 120deg 140deg,
-                            #ff5252 140deg 160deg,
-                            #ffeb3b 160deg 180deg,
-                            #ff5252 180deg 200deg,
-                            #ffeb3b 200deg 220deg,
-                            #ff5252 220deg 240deg,
-                            #ffeb3b 240deg 260deg,
-                            #ff5252 260deg 280deg,
-                            #ffeb3b 280deg 300deg,
-                            #ff5252 300deg 320deg,
-                            #ffeb3b 320deg 340deg,
-                            #ff5252 340deg 360deg
-                        );
-                    clip-path: polygon(
-                        50% 0%, 61% 35%, 98% 35%, 68% 57%, 79% 91%,
-                        50% 70%, 21% 91%, 32% 57%, 2% 35%, 39% 35%
-                    );
-                    z-index: 0;
-                "></div>
-                <span style="
-                    position: relative;
-                    z-index: 1;
-                    display: inline-block;
-                    background: linear-gradient(180deg, #1a1a1a 0%, #333 100%);
-                    color: #ffd700;
-                    padding: 15px 40px;
-                    border-radius: 10px;
-                    font-size: 2.5rem;
-                    font-weight: bold;
-                    font-family: 'Bangers', cursive;
-                    letter-spacing: 5px;
-                    border: 4px solid #ffd700;
-                    box-shadow: 6px 6px 0px #000;
-                    text-shadow: 2px 2px 0px #000;
-                ">THE END</span>
-            </div>
-        </div>
-        <style>
-            @keyframes popIn {
-                0% { transform: scale(0); opacity: 0; }
-                70% { transform: scale(1.1); }
-                100% { transform: scale(1); opacity: 1; }
-            }
-        </style>
-        """,
+        _join_html(build_comic_panel_html(scene, scene_number), "<hr/>"),
         unsafe_allow_html=True
     )
 
 
+def build_comic_panel_ending_html(scene: Scene, scene_number: int) -> str:
+    """
+    Build the complete HTML for the final panel (header, image, narration, THE END).
+    
+    Args:
+        scene: The ending scene
+        scene_number: The scene number
+        
+    Returns:
+        str: HTML suitable for a single st.markdown call
+    """
+    # Check if this is a page mode scene
+    is_page_mode = getattr(scene, 'is_page_mode', False)
+    scene_title = getattr(scene, 'scene_title', 'The End')
+    
+    # Ending header with dramatic styling
+    header_text = "🎬 FINAL PAGE 🎬" if is_page_mode else "🎬 FINAL PANEL 🎬"
+    if scene_title and scene_title != "The End":
+        header_text = f"🎬 {escape_scene_text(scene_title.upper())} 🎬"
+    
+    image_src = _scene_image_src(scene)
+    if image_src:
+        image_html = _ENDING_FRAME_TMPL.substitute(
+            src=image_src, size_attrs=_img_size_attrs(scene.image_path)
+        )
+    else:
+        image_html = _ENDING_PLACEHOLDER_HTML
+    
+    return _join_html(
+        _ENDING_HEADER_TMPL.substitute(header_text=header_text),
+        image_html,
+        _ENDING_NARRATION_TMPL.substitute(content=scene.get_html_content()),
+        _THE_END_HTML
+    )
+
+
+def display_comic_panel_ending(scene: Scene, scene_number: int) -> None:
+    """
+    Display the final scene as a special ending panel.
+    
+    Args:
+        scene: The ending scene
+        scene_number: The scene number
+    """
+    st.markdown(build_comic_panel_ending_html(scene, scene_number), unsafe_allow_html=True)
+
+
 def display_loading_panel() -> None:
     """Display a loading placeholder for panel generation."""
-    st.markdown(
-        """
-        <div style="
-            background: linear-gradient(45deg, #1a1a2e, #16213e);
-            height: 350px;
-            border-radius: 10px;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            margin: 10px 0;
-            border: 5px solid #000;
-            box-shadow: 8px 8px 0px #000;
-            position: relative;
-            overflow: hidden;
-        ">
-            <!-- Animated action words -->
-            <div style="
-                position: absolute;
-                top: 20px;
-                left: 20px;
-                font-family: 'Bangers', cursive;
-                font-size: 1.5rem;
-                color: #ff5252;
-                text-shadow: 2px 2px 0px #000;
-                animation: shake 0.5s ease-in-out infinite;
-            ">POW!</div>
-            <div style="
-                position: absolute;
-                bottom: 20px;
-                right: 20px;
-                font-family: 'Bangers', cursive;
-                font-size: 1.5rem;
-                color: #ffeb3b;
-                text-shadow: 2px 2px 0px #000;
-                animation: shake 0.5s ease-in-out infinite 0.25s;
-            ">ZAP!</div>
-            
-            <div style="
-                font-size: 64px;
-                animation: pulse 1s ease-in-out infinite;
-            ">🎨</div>
-            <span style="
-                color: #fff;
-                font-family: 'Bangers', cursive;
-                font-size: 1.5rem;
-                margin-top: 15px;
-                text-shadow: 2px 2px 0px #000;
-            ">CREATING YOUR PANEL...</span>
-            <span style="
-                color: #aaa;
-                font-family: 'Comic Neue', cursive;
-                font-size: 1rem;
-                margin-top: 8px;
-            ">This may take a few seconds</span>
-        </div>
-        <style>
-            @keyframes pulse {
-                0%, 100% { transform: scale(1); opacity: 1; }
-                50% { transform: scale(1.15); opacity: 0.8; }
-            }
-            @keyframes shake {
-                0%, 100% { transform: translateX(0) rotate(-5deg); }
-                50% { transform: translateX(5px) rotate(5deg); }
-            }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+    st.markdown(_LOADING_PANEL_HTML, unsafe_allow_html=True)
 
 
 def display_comic_page_number(current: int, total: int) -> None:
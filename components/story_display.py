@@ -5,23 +5,22 @@ Renders the current story scene with beautiful formatting.
 """
 
 import streamlit as st
-from models.story import Scene
+import textwrap
+from models.story import Scene, escape_scene_text
 
 
-def display_scene(scene: Scene, scene_number: int) -> None:
+def build_scene_html(scene: Scene, scene_number: int) -> str:
     """
-    Display a story scene with formatted styling.
+    Build the markdown/HTML for a text-mode scene (header and content box).
     
     Args:
-        scene: The scene to display
+        scene: The scene to render
         scene_number: The scene number for display
+        
+    Returns:
+        str: Markdown suitable for a single st.markdown call
     """
-    # Scene header
-    st.markdown(f"### 📖 Scene {scene_number}")
-    
-    # Scene content with nice styling
-    st.markdown(
-        f"""
+    content_html = textwrap.dedent(f"""
         <div style="
             background-color: #ffffff;
             padding: 20px;
@@ -34,22 +33,33 @@ def display_scene(scene: Scene, scene_number: int) -> None:
             font-weight: 400;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
         ">
-            {scene.content}
+            {scene.get_html_content()}
         </div>
-        """,
-        unsafe_allow_html=True
-    )
-    
-    st.markdown("---")
+        """).strip()
+    return f"### 📖 Scene {scene_number}\n\n{content_html}"
 
 
-def display_compact_scene(scene: Scene, is_current: bool = False) -> None:
+def display_scene(scene: Scene, scene_number: int) -> None:
     """
-    Display a compact version of a scene for history.
+    Display a story scene with formatted styling.
     
     Args:
         scene: The scene to display
+        scene_number: The scene number for display
+    """
+    st.markdown(f"{build_scene_html(scene, scene_number)}\n\n---", unsafe_allow_html=True)
+
+
+def _build_compact_html(scene: Scene, is_current: bool) -> str:
+    """
+    Build the compact history card for a scene, including the choice made.
+    
+    Args:
+        scene: The scene to render
         is_current: Whether this is the current scene
+        
+    Returns:
+        str: HTML suitable for a single st.markdown call
     """
     border_color = "#4CAF50" if is_current else "#9E9E9E"
     bg_color = "#E8F5E9" if is_current else "#000000"
@@ -57,8 +67,7 @@ def display_compact_scene(scene: Scene, is_current: bool = False) -> None:
     # Truncate content for compact display
     content_preview = scene.content[:150] + "..." if len(scene.content) > 150 else scene.content
     
-    st.markdown(
-        f"""
+    html = textwrap.dedent(f"""
         <div style="
             background-color: {bg_color};
             padding: 12px;
@@ -69,20 +78,38 @@ def display_compact_scene(scene: Scene, is_current: bool = False) -> None:
             color: #1f1f1f;
         ">
             <strong>Scene {scene.id}</strong><br/>
-            {content_preview}
+            {escape_scene_text(content_preview)}
         </div>
-        """,
-        unsafe_allow_html=True
-    )
+        """).strip()
     
     # Show selected choice if any
     if scene.selected_choice_id:
         selected = scene.get_selected_choice()
         if selected:
-            st.markdown(
-                f"<small>✓ <em>Chose: {selected.text}</em></small>",
-                unsafe_allow_html=True
-            )
+            html += f"\n<small>✓ <em>Chose: {escape_scene_text(selected.text)}</em></small>"
+    
+    return html
+
+
+def display_compact_scene(scene: Scene, is_current: bool = False) -> None:
+    """
+    Display a compact version of a scene for history.
+    
+    The card is cached per session, keyed on everything it shows, so
+    unchanged history entries are not rebuilt on every rerun.
+    
+    Args:
+        scene: The scene to display
+        is_current: Whether this is the current scene
+    """
+    cache = st.session_state.setdefault('compact_scene_html', {})
+    key = (scene.id, scene.selected_choice_id, is_current, scene.content)
+    html = cache.get(key)
+    if html is None:
+        html = _build_compact_html(scene, is_current)
+        cache[key] = html
+    
+    st.markdown(html, unsafe_allow_html=True)
 
 
 def display_ending_scene(scene: Scene, scene_number: int) -> None:
@@ -109,7 +136,7 @@ def display_ending_scene(scene: Scene, scene_number: int) -> None:
             font-weight: 400;
             box-shadow: 0 3px 6px rgba(0,0,0,0.15);
         ">
-            {scene.content}
+            {scene.get_html_content()}
         </div>
         """,
         unsafe_allow_html=True
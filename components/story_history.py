@@ -4,9 +4,116 @@ Story history component.
 Displays the story's progression and path taken.
 """
 
+import hashlib
 import streamlit as st
-from typing import List
-from models.story import Story, Scene
+import textwrap
+from typing import List, Tuple
+from models.story import Story, Scene, escape_scene_text
+
+
+# Static sidebar headings and card markup, built once at import. Their
+# styling lives in the app theme CSS (see the story-* classes in app.py).
+_PROGRESS_HEADER_HTML = '<h3 class="story-sidebar-heading">STORY PROGRESS</h3>'
+
+_STATS_HEADER_HTML = '<h3 class="story-sidebar-heading">STORY STATS</h3>'
+
+_SCENE_COUNT_TEMPLATE = '<p class="story-scene-count"><strong>Scenes:</strong> {scenes}</p>'
+
+_STATS_CARD_TEMPLATE = textwrap.dedent("""
+    <div class="story-stats-card">
+        <p><span>Total Scenes:</span> <span class="stat-scenes">{scenes}</span></p>
+        <p><span>Choices Made:</span> <span class="stat-choices">{choices}</span></p>
+        <p><span>Current Scene:</span> <span class="stat-current">{current}</span></p>
+    </div>
+""").strip()
+
+
+def _history_signature(story: Story) -> tuple:
+    """
+    Build a cache key that changes whenever the sidebar history would.
+    
+    The HTML cache is shared by every session in the process, so the key
+    identifies the story itself (creation time and prompt) and hashes the
+    scene and choice texts, like the PDF cache key in app.py.
+    
+    Args:
+        story: The story to fingerprint
+        
+    Returns:
+        tuple: Creation time, prompt, current index, and (scene id,
+        selected choice id, text digest) per scene
+    """
+    return (story.created_at, story.initial_prompt, story.current_scene_index) + tuple(
+        (scene.id, scene.selected_choice_id, _scene_text_digest(scene))
+        for scene in story.scenes
+    )
+
+
+def _scene_text_digest(scene: Scene) -> str:
+    """
+    Hash the scene text and selected choice text.
+    
+    Args:
+        scene: Scene to fingerprint
+        
+    Returns:
+        str: Hex SHA-256 of the scene content and selected choice text
+    """
+    choice = scene.get_selected_choice()
+    payload = "\0".join((scene.content, choice.text if choice else ""))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_stats_html(story: Story) -> str:
+    """
+    Build the story statistics card.
+    
+    Args:
+        story: The story to build stats for
+        
+    Returns:
+        str: Stats card HTML
+    """
+    return _STATS_CARD_TEMPLATE.format(
+        scenes=story.get_scene_count(),
+        choices=len(story.get_story_path()),
+        current=story.current_scene_index + 1
+    )
+
+
+def build_journey_html(story: Story) -> str:
+    """
+    Build the numbered list of choices made so far.
+    
+    Args:
+        story: The story to build the journey for
+        
+    Returns:
+        str: Journey HTML, or an empty string if no choices were made
+    """
+    return "\n".join(
+        f"<p style='color:#1a1a1a;'>{i}. {escape_scene_text(choice_text)}</p>"
+        for i, choice_text in enumerate(story.get_story_path(), 1)
+    )
+
+
+# The sidebar renderers are deliberately not st.fragment: they hold no
+# widgets that trigger reruns (expanders are client-side), a full app rerun
+# still executes every fragment, and fragments may not write to st.sidebar.
+# Caching the HTML per story state below is what keeps them cheap.
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_history_html(signature: tuple, _story: Story) -> Tuple[str, str]:
+    """
+    Build the sidebar stats and journey HTML, reused while the story is unchanged.
+    
+    Args:
+        signature: Cache key from _history_signature
+        _story: The story (leading underscore: not hashed by Streamlit)
+        
+    Returns:
+        Tuple[str, str]: Stats card HTML and journey HTML
+    """
+    return build_stats_html(_story), build_journey_html(_story)
 
 
 def display_story_history(story: Story) -> None:
@@ -16,31 +123,23 @@ def display_story_history(story: Story) -> None:
     Args:
         story: The story to display history for
     """
-    st.sidebar.markdown("""
-    <h3 style="
-        font-family: 'Bangers', cursive;
-        color: #ffeb3b;
-        text-shadow: 2px 2px 0px #000;
-        margin-bottom: 10px;
-    ">STORY PROGRESS</h3>
-    """, unsafe_allow_html=True)
-    
-    st.sidebar.markdown(f"""
-    <p style="color: #fff; font-family: 'Comic Neue', sans-serif; font-size: 1rem;">
-        <strong>Scenes:</strong> {story.get_scene_count()}
-    </p>
-    """, unsafe_allow_html=True)
+    st.sidebar.markdown(
+        _PROGRESS_HEADER_HTML + "\n" + _SCENE_COUNT_TEMPLATE.format(scenes=story.get_scene_count()),
+        unsafe_allow_html=True
+    )
     
     # Display initial prompt - simple text without emojis
     with st.sidebar.expander("Initial Prompt", expanded=False):
-        st.markdown(f"<p style='color:#1a1a1a;'>{story.initial_prompt}</p>", unsafe_allow_html=True)
+        st.markdown(
+            f"<p style='color:#1a1a1a;'>{escape_scene_text(story.initial_prompt)}</p>",
+            unsafe_allow_html=True
+        )
     
     # Display story path
-    story_path = story.get_story_path()
-    if story_path:
+    _, journey_html = _cached_history_html(_history_signature(story), story)
+    if journey_html:
         with st.sidebar.expander("Your Journey", expanded=False):
-            for i, choice_text in enumerate(story_path, 1):
-                st.markdown(f"<p style='color:#1a1a1a;'>{i}. {choice_text}</p>", unsafe_allow_html=True)
+            st.markdown(journey_html, unsafe_allow_html=True)
     
     st.sidebar.markdown("---")
 
@@ -81,40 +180,8 @@ def display_stats_sidebar(story: Story) -> None:
     Args:
         story: The story to display stats for
     """
-    st.sidebar.markdown("""
-    <h3 style="
-        font-family: 'Bangers', cursive;
-        color: #ffeb3b;
-        text-shadow: 2px 2px 0px #000;
-        margin-bottom: 10px;
-    ">STORY STATS</h3>
-    """, unsafe_allow_html=True)
-    
-    stats_html = f"""
-    <div style="
-        background-color: #ffffff !important;
-        padding: 15px;
-        border-radius: 8px;
-        border: 3px solid #000;
-        margin: 10px 0;
-        box-shadow: 4px 4px 0px #000;
-    ">
-        <p style="margin: 8px 0 !important; color: #1a1a1a !important; font-family: 'Comic Neue', sans-serif !important; font-size: 0.95rem !important;">
-            <span style="color: #1a1a1a !important; font-weight: bold;">Total Scenes:</span> 
-            <span style="color: #d32f2f !important; font-weight: bold;">{story.get_scene_count()}</span>
-        </p>
-        <p style="margin: 8px 0 !important; color: #1a1a1a !important; font-family: 'Comic Neue', sans-serif !important; font-size: 0.95rem !important;">
-            <span style="color: #1a1a1a !important; font-weight: bold;">Choices Made:</span> 
-            <span style="color: #1976d2 !important; font-weight: bold;">{len(story.get_story_path())}</span>
-        </p>
-        <p style="margin: 8px 0 !important; color: #1a1a1a !important; font-family: 'Comic Neue', sans-serif !important; font-size: 0.95rem !important;">
-            <span style="color: #1a1a1a !important; font-weight: bold;">Current Scene:</span> 
-            <span style="color: #388e3c !important; font-weight: bold;">{story.current_scene_index + 1}</span>
-        </p>
-    </div>
-    """
-    
-    st.sidebar.markdown(stats_html, unsafe_allow_html=True)
+    stats_html, _ = _cached_history_html(_history_signature(story), story)
+    st.sidebar.markdown(_STATS_HEADER_HTML + "\n" + stats_html, unsafe_allow_html=True)
 
 
 def display_compact_history(story: Story, max_scenes: int = 5) -> None:
@@ -132,9 +199,10 @@ def display_compact_history(story: Story, max_scenes: int = 5) -> None:
     
     # Get recent scenes
     recent_scenes = story.scenes[-max_scenes:] if len(story.scenes) > max_scenes else story.scenes
+    current_id = story.get_current_scene().id
     
     for scene in recent_scenes:
-        is_current = scene.id == story.get_current_scene().id
+        is_current = scene.id == current_id
         
         if is_current:
             st.markdown(f"**🔵 Scene {scene.id} (Current)**")
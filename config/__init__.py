@@ -1,5 +1,5 @@
 """Config package initialization."""
 
-from .settings import settings, Settings
+from .settings import settings, Settings, get_settings
 
-__all__ = ['settings', 'Settings']
+__all__ = ['settings', 'Settings', 'get_settings']
@@ -5,7 +5,9 @@ Loads environment variables and provides application settings.
 """
 
 import os
-from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -15,7 +17,7 @@ class Settings:
     
     def __init__(self):
         """Initialize settings and load environment variables."""
-        # Load .env file
+        # Load .env file (variables already set in the environment take precedence)
         env_path = Path(__file__).parent.parent / '.env'
         load_dotenv(env_path)
         
@@ -32,14 +34,49 @@ class Settings:
         # Story Configuration
         self.max_story_length: int = int(os.getenv('MAX_STORY_LENGTH', '20'))
         self.context_scenes: int = int(os.getenv('CONTEXT_SCENES', '3'))
+        self.context_max_chars: int = int(os.getenv('CONTEXT_MAX_CHARS', '4000'))
         self.num_choices: int = 2  # Always 2 choices as per requirements
         
+        # Worker threads per shared pool for concurrent Gemini / image requests;
+        # also caps how many such requests a process has in flight per pool
+        self.io_parallelism: int = max(1, int(os.getenv('IO_PARALLELISM', '4')))
+        # Process-wide caps on requests in flight to each provider, so bursts
+        # (prefetching, several sessions) queue here instead of hitting 429s
+        self.max_concurrent_image_gens: int = max(1, int(os.getenv('MAX_CONCURRENT_IMAGE_GENS', '2')))
+        self.max_concurrent_text_requests: int = max(1, int(os.getenv('MAX_CONCURRENT_TEXT_REQUESTS', '8')))
+        self.speculative_prefetch: bool = os.getenv('SPECULATIVE_PREFETCH', 'false').lower() in ('1', 'true', 'yes')
+        
+        # LLM response cache (see utils/llm_cache.py). Always on at temperature 0;
+        # at higher temperatures only if deterministic-only is turned off.
+        self.cache_deterministic_only: bool = os.getenv('LLM_CACHE_DETERMINISTIC_ONLY', 'true').lower() in ('1', 'true', 'yes')
+        self.llm_cache_ttl: int = int(os.getenv('LLM_CACHE_TTL', '600'))
+        self.llm_cache_path: Path = Path(__file__).parent.parent / 'data' / 'llm_cache.db'
+        
         # UI Configuration
         self.app_title: str = "🎭 Interactive Story Generator"
         self.app_icon: str = "📖"
         
+        # Scene images live under Streamlit's static folder so the browser
+        # can fetch and cache them by URL (requires server.enableStaticServing)
+        self.scene_images_dir: Path = Path(__file__).parent.parent / 'static' / 'scenes'
+        self.scene_images_url: str = 'app/static/scenes'
+        # In-progress image downloads, kept outside static/ so partial files
+        # are never served; on the same filesystem, so finished ones are renamed into place
+        self.image_download_dir: Path = Path(__file__).parent.parent / 'data' / 'downloads'
+        # Generated images keyed by prompt hash, also kept out of static/ so
+        # they are only reachable through the scene files linked from them
+        self.image_cache_dir: Path = Path(__file__).parent.parent / 'data' / 'image_cache'
+        
         # Validate required settings
         self._validate()
+        
+        # Read-only generation config, built once and shared by all callers
+        self._generation_config: Mapping[str, Any] = MappingProxyType({
+            'temperature': self.temperature,
+            'top_p': self.top_p,
+            'top_k': self.top_k,
+            'max_output_tokens': self.max_tokens,
+        })
     
     def _validate(self) -> None:
         """Validate that required settings are present."""
@@ -49,19 +86,14 @@ class Settings:
                 "Please add it to your .env file."
             )
     
-    def get_generation_config(self) -> dict:
+    def get_generation_config(self) -> Mapping[str, Any]:
         """
         Get the generation configuration for Gemini API.
         
         Returns:
-            dict: Generation configuration parameters
+            Mapping[str, Any]: Read-only generation configuration parameters
         """
-        return {
-            'temperature': self.temperature,
-            'top_p': self.top_p,
-            'top_k': self.top_k,
-            'max_output_tokens': self.max_tokens,
-        }
+        return self._generation_config
     
     def __repr__(self) -> str:
         """String representation of settings (without exposing API key)."""
@@ -72,5 +104,16 @@ class Settings:
         )
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, created once per process.
+    
+    Returns:
+        Settings: The shared settings instance
+    """
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
@@ -4,12 +4,19 @@ Comic book models for managing comic pages and export.
 Provides structures for organizing story scenes into a comic book format.
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from bisect import insort
+from operator import attrgetter
+from typing import List, Optional, Dict, Any, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
 from models.story import Scene, Story
 
 
+def _short_caption(caption: str, limit: int = 50) -> str:
+    """Cut a caption to the first `limit` characters, adding an ellipsis if cut."""
+    return caption[:limit] + "..." if len(caption) > limit else caption
+
+
 class ComicPanel(BaseModel):
     """Represents a single panel in the comic."""
     
@@ -62,7 +69,7 @@ class ComicBook(BaseModel):
     """Manages the complete comic book structure."""
     
     title: str = Field("My Comic Story", description="Title of the comic book")
-    pages: List[ComicPage] = Field(default_factory=list, description="All pages in order")
+    pages: List[ComicPage] = Field(default_factory=list, description="All pages, kept sorted by page number")
     cover_image: Optional[str] = Field(None, description="Cover image path")
     created_at: datetime = Field(default_factory=datetime.now)
     art_style: str = Field("western_comic", description="Art style used")
@@ -71,6 +78,9 @@ class ComicBook(BaseModel):
     initial_prompt: str = Field("", description="Original story prompt")
     total_scenes: int = Field(0, description="Total number of scenes")
     
+    # Pages keyed by number, with the list and page count it was built from
+    _page_index: Optional[Tuple[List[ComicPage], int, Dict[int, ComicPage]]] = PrivateAttr(default=None)
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -81,8 +91,8 @@ class ComicBook(BaseModel):
         }
     
     def add_page(self, page: ComicPage) -> None:
-        """Add a page to the comic book."""
-        self.pages.append(page)
+        """Add a page to the comic book, keeping pages in page-number order."""
+        insort(self.pages, page, key=attrgetter('page_number'))
     
     def get_page_count(self) -> int:
         """Get total number of pages."""
@@ -94,20 +104,29 @@ class ComicBook(BaseModel):
     
     def get_page(self, page_number: int) -> Optional[ComicPage]:
         """Get a specific page by number."""
-        for page in self.pages:
-            if page.page_number == page_number:
-                return page
-        return None
+        return self._get_page_index().get(page_number)
+    
+    def _get_page_index(self) -> Dict[int, ComicPage]:
+        """
+        Get the pages keyed by page number.
+        
+        Rebuilt only when pages were added or the pages list was replaced.
+        
+        Returns:
+            Dict[int, ComicPage]: Page lookup table
+        """
+        index = self._page_index
+        if index is None or index[0] is not self.pages or index[1] != len(self.pages):
+            # Reversed so the first page with a given number wins, as in a scan
+            pages_by_number = {page.page_number: page for page in reversed(self.pages)}
+            self._page_index = (self.pages, len(self.pages), pages_by_number)
+        return self._page_index[2]
     
     def get_all_image_paths(self) -> List[str]:
         """Get all image paths in page order."""
-        paths = []
+        paths = [panel.image_path for page in self.pages for panel in page.panels if panel.image_path]
         if self.cover_image:
-            paths.append(self.cover_image)
-        for page in sorted(self.pages, key=lambda p: p.page_number):
-            for panel in page.panels:
-                if panel.image_path:
-                    paths.append(panel.image_path)
+            return [self.cover_image, *paths]
         return paths
     
     def to_tree_structure(self) -> Dict[str, Any]:
@@ -124,14 +143,14 @@ class ComicBook(BaseModel):
             "pages": []
         }
         
-        for page in sorted(self.pages, key=lambda p: p.page_number):
+        for page in self.pages:
             page_node = {
                 "page_number": page.page_number,
                 "is_cover": page.is_cover,
                 "panels": [
                     {
                         "panel_id": panel.panel_id,
-                        "caption": panel.caption[:50] + "..." if len(panel.caption) > 50 else panel.caption,
+                        "caption": _short_caption(panel.caption),
                         "has_image": panel.image_path is not None
                     }
                     for panel in page.panels
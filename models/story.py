@@ -6,11 +6,32 @@ This module defines the core data structures:
 - Story: Manages the complete story with all scenes
 """
 
-from typing import List, Optional
-from pydantic import BaseModel, Field
+import html
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
 
 
+@lru_cache(maxsize=256)
+def escape_scene_text(text: str) -> str:
+    """
+    Escape story text for HTML display, turning line breaks into <br/>.
+    
+    Cached on the text itself, so re-rendering an unchanged scene is a lookup.
+    
+    Args:
+        text: Raw scene or narration text
+        
+    Returns:
+        str: HTML-safe text
+    """
+    return html.escape(text).replace('\r\n', '\n').replace('\n', '<br/>')
+
+
 class Choice(BaseModel):
     """Represents a choice option for the user."""
     
@@ -45,6 +66,11 @@ class Scene(BaseModel):
     scene_title: Optional[str] = Field(None, description="Short title for the scene/page")
     is_page_mode: bool = Field(False, description="Whether this scene uses page mode (multi-panel)")
     
+    # Image path already confirmed on disk (not serialized)
+    _verified_image_path: Optional[str] = PrivateAttr(default=None)
+    # Choices keyed by id, paired with the list it was built from
+    _choice_index: Optional[Tuple[List[Choice], Dict[int, Choice]]] = PrivateAttr(default=None)
+    
     class Config:
         """Pydantic configuration."""
         json_schema_extra = {
@@ -64,6 +90,34 @@ class Scene(BaseModel):
             }
         }
     
+    def get_html_content(self) -> str:
+        """
+        Get the scene text escaped for embedding in HTML.
+        
+        Returns:
+            str: HTML-safe scene content
+        """
+        return escape_scene_text(self.content)
+    
+    def has_image(self) -> bool:
+        """
+        Check whether the scene's image file exists.
+        
+        Generated images are written once and never removed, so a positive
+        result is remembered and later calls skip the filesystem check.
+        
+        Returns:
+            bool: True if image_path points to an existing file
+        """
+        if not self.image_path:
+            return False
+        if self._verified_image_path == self.image_path:
+            return True
+        if Path(self.image_path).is_file():
+            self._verified_image_path = self.image_path
+            return True
+        return False
+    
     def select_choice(self, choice_id: int) -> bool:
         """
         Mark a choice as selected.
@@ -74,7 +128,7 @@ class Scene(BaseModel):
         Returns:
             bool: True if selection was successful, False otherwise
         """
-        if any(choice.id == choice_id for choice in self.choices):
+        if choice_id in self._get_choice_index():
             self.selected_choice_id = choice_id
             return True
         return False
@@ -88,7 +142,20 @@ class Scene(BaseModel):
         """
         if self.selected_choice_id is None:
             return None
-        return next((choice for choice in self.choices if choice.id == self.selected_choice_id), None)
+        return self._get_choice_index().get(self.selected_choice_id)
+    
+    def _get_choice_index(self) -> Dict[int, Choice]:
+        """
+        Get the scene's choices keyed by id.
+        
+        Built on first use and rebuilt only if the choices list is replaced.
+        
+        Returns:
+            Dict[int, Choice]: Choice lookup table
+        """
+        if self._choice_index is None or self._choice_index[0] is not self.choices:
+            self._choice_index = (self.choices, {choice.id: choice for choice in self.choices})
+        return self._choice_index[1]
 
 
 class Story(BaseModel):
@@ -99,6 +166,11 @@ class Story(BaseModel):
     current_scene_index: int = Field(0, description="Index of the current scene")
     created_at: datetime = Field(default_factory=datetime.now, description="Story creation timestamp")
     
+    # Last computed story path, keyed by the selections it was built from
+    _story_path_cache: Optional[Tuple[tuple, List[str]]] = PrivateAttr(default=None)
+    # Formatted context block per scene with running lengths, keyed by (id, selection)
+    _context_cache: Optional[Tuple[List[tuple], List[str], List[int]]] = PrivateAttr(default=None)
+    
     class Config:
         """Pydantic configuration."""
         json_schema_extra = {
@@ -139,12 +211,15 @@ class Story(BaseModel):
         """
         return len(self.scenes)
     
-    def get_story_context(self, max_scenes: int = 3) -> str:
+    def get_story_context(self, max_scenes: int = 3, max_chars: Optional[int] = None) -> str:
         """
         Get recent story context for AI generation.
         
         Args:
             max_scenes: Maximum number of recent scenes to include
+            max_chars: Optional budget for the scene text; older scenes are
+                       dropped whole until the rest fits (the latest scene is
+                       always kept)
             
         Returns:
             str: Formatted story context
@@ -152,21 +227,56 @@ class Story(BaseModel):
         if not self.scenes:
             return f"Story Prompt: {self.initial_prompt}"
         
-        # Get the last N scenes
-        recent_scenes = self.scenes[-max_scenes:] if len(self.scenes) > max_scenes else self.scenes
+        blocks, offsets = self._get_context_blocks()
+        start = max(0, len(blocks) - max_scenes)
         
-        context_parts = [f"Story Prompt: {self.initial_prompt}\n\nStory so far:"]
+        if max_chars is not None:
+            # offsets[i] is the length of blocks[:i], so the first start whose
+            # remaining blocks fit the budget can be found by bisection
+            start = max(start, bisect_left(offsets, offsets[-1] - max_chars))
+            start = min(start, len(blocks) - 1)
         
-        for i, scene in enumerate(recent_scenes, 1):
-            context_parts.append(f"\nScene {scene.id}:")
-            context_parts.append(scene.content)
-            
-            if scene.selected_choice_id is not None:
-                selected = scene.get_selected_choice()
-                if selected:
-                    context_parts.append(f"[User chose: {selected.text}]")
+        header = f"Story Prompt: {self.initial_prompt}\n\nStory so far:"
+        return "\n".join([header, *blocks[start:]])
+    
+    def _get_context_blocks(self) -> Tuple[List[str], List[int]]:
+        """
+        Get each scene's formatted context block and their running lengths.
         
-        return "\n".join(context_parts)
+        Blocks are reused across calls; only scenes that were added or had a
+        choice made since the last call are formatted again.
+        
+        Returns:
+            Tuple of (context block per scene, cumulative lengths starting at 0)
+        """
+        keys = [(scene.id, scene.selected_choice_id) for scene in self.scenes]
+        if self._context_cache is None or self._context_cache[0] != keys:
+            previous = dict(zip(*self._context_cache[:2])) if self._context_cache else {}
+            blocks = [
+                previous.get(key) or self._format_context_block(scene)
+                for key, scene in zip(keys, self.scenes)
+            ]
+            # +1 for the newline each block is joined with
+            offsets = [0, *accumulate(len(block) + 1 for block in blocks)]
+            self._context_cache = (keys, blocks, offsets)
+        return self._context_cache[1], self._context_cache[2]
+    
+    @staticmethod
+    def _format_context_block(scene: Scene) -> str:
+        """
+        Format one scene (and the choice made in it) for the story context.
+        
+        Args:
+            scene: Scene to format
+            
+        Returns:
+            str: Context block for the scene
+        """
+        block = f"\nScene {scene.id}:\n{scene.content}"
+        selected = scene.get_selected_choice()
+        if selected:
+            block += f"\n[User chose: {selected.text}]"
+        return block
     
     def can_continue(self) -> bool:
         """
@@ -185,10 +295,14 @@ class Story(BaseModel):
         Returns:
             List[str]: List of choice texts selected by the user
         """
-        path = []
-        for scene in self.scenes:
-            if scene.selected_choice_id is not None:
-                selected = scene.get_selected_choice()
-                if selected:
-                    path.append(selected.text)
-        return path
+        # Rebuilt only when a scene is added or a choice is made
+        selections = tuple(scene.selected_choice_id for scene in self.scenes)
+        if self._story_path_cache is None or self._story_path_cache[0] != selections:
+            path = []
+            for scene in self.scenes:
+                if scene.selected_choice_id is not None:
+                    selected = scene.get_selected_choice()
+                    if selected:
+                        path.append(selected.text)
+            self._story_path_cache = (selections, path)
+        return list(self._story_path_cache[1])
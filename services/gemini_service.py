@@ -4,10 +4,119 @@ Gemini API service for AI-powered story generation.
 Handles all interactions with Google's Gemini API.
 """
 
+import json
+import logging
+import random
+import threading
 import time
-from typing import Optional, Tuple
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Mapping, NamedTuple, Optional, Tuple
 from config.settings import settings
+from utils.llm_cache import create_llm_cache
+from utils.prompt_templates import PromptTemplates, PromptFormatter
+
+try:
+    import streamlit as st
+except ImportError:
+    # Allow the service to be used outside the Streamlit app
+    st = None
+
+logger = logging.getLogger(__name__)
+
+
+class ChoicePair(NamedTuple):
+    """The two choice texts offered at the end of a scene."""
+    
+    first: str
+    second: str
+
+
+_MAX_RETRY_DELAY = 8.0
+_RETRY_BUDGET = 15.0
+
+# Runs independent text requests alongside the calling thread
+_text_executor = ThreadPoolExecutor(max_workers=settings.io_parallelism, thread_name_prefix="gemini-text")
+
+# Limits text requests in flight across all threads and sessions; held for
+# the request itself (a stream until it is exhausted or closed), not while
+# backing off between retries
+_text_slots = threading.BoundedSemaphore(settings.max_concurrent_text_requests)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether a failed attempt is worth retrying."""
+    # Imported here like genai (see GeminiService._initialize); by the time
+    # a request has failed the module is already loaded
+    from google.api_core import exceptions as google_exceptions
+    
+    # API errors are retried only for rate limits (429) and 5xx failures;
+    # others (bad key, invalid request...) fail on the first attempt
+    if isinstance(error, google_exceptions.GoogleAPICallError):
+        return isinstance(error, (google_exceptions.TooManyRequests, google_exceptions.ServerError))
+    # Empty or malformed responses and connection errors
+    return True
+
+
+def _backoff(retry_delay: float, deadline: float) -> Optional[float]:
+    """
+    Sleep before the next attempt, using decorrelated jitter.
+    
+    Args:
+        retry_delay: The previous delay in seconds
+        deadline: time.monotonic() value all retries must finish by
+        
+    Returns:
+        Optional[float]: The delay slept (base for the next one), or None
+        if another attempt would overrun the deadline
+    """
+    delay = min(_MAX_RETRY_DELAY, random.uniform(retry_delay, retry_delay * 3))
+    if time.monotonic() + delay > deadline:
+        return None
+    time.sleep(delay)
+    return delay
+
+
+# Structured-output overrides for generate_scene_bundle
+_SCENE_BUNDLE_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': {
+        'type': 'object',
+        'properties': {
+            'scene': {'type': 'string'},
+            'choices': {'type': 'array', 'items': {'type': 'string'}},
+            'title': {'type': 'string'},
+        },
+        'required': ['scene', 'choices', 'title'],
+    },
+}
+
+# Structured output for generate_panel_breakdown (see get_panel_breakdown_prompt).
+# Up to 5 detailed panels plus JSON syntax overrun the MAX_TOKENS default,
+# and a truncated object cannot be parsed, so this call gets its own cap.
+_PANEL_BREAKDOWN_CONFIG = {
+    'max_output_tokens': 2048,
+    'response_mime_type': 'application/json',
+    'response_schema': {
+        'type': 'object',
+        'properties': {
+            'panels': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'visual': {'type': 'string'},
+                        'action': {'type': 'string'},
+                        'camera': {'type': 'string'},
+                        'emotion': {'type': 'string'},
+                        'dialogue': {'type': 'string'},
+                    },
+                    'required': ['visual', 'action', 'camera', 'emotion', 'dialogue'],
+                },
+            },
+        },
+        'required': ['panels'],
+    },
+}
 
 
 class GeminiService:
@@ -17,11 +126,20 @@ class GeminiService:
         """Initialize the Gemini service."""
         self.model = None
         self.is_initialized = False
+        self._llm_cache = create_llm_cache()
         self._initialize()
     
     def _initialize(self) -> None:
-        """Initialize the Gemini API client."""
+        """
+        Initialize the Gemini API client.
+        
+        The SDK is imported here rather than at module level: it pulls in
+        grpc, protobuf and google.auth, which would otherwise slow down the
+        app's first paint even though no request is made until a story starts.
+        """
         try:
+            import google.generativeai as genai
+            
             genai.configure(api_key=settings.gemini_api_key)
             
             self.model = genai.GenerativeModel(
@@ -30,17 +148,41 @@ class GeminiService:
             )
             
             self.is_initialized = True
-            print(f"✓ Gemini service initialized with model: {settings.model_name}")
+            logger.info("✓ Gemini service initialized with model: %s", settings.model_name)
             
         except Exception as e:
-            print(f"✗ Failed to initialize Gemini service: {str(e)}")
+            logger.error("✗ Failed to initialize Gemini service: %s", e)
             raise
     
+    def _cached(self, op: str, prompt: str, generate: Callable[[], Any]) -> Any:
+        """
+        Run a validated generation through the LLM response cache, if enabled.
+        
+        Args:
+            op: Kind of request, part of the cache key
+            prompt: Prompt the result was generated from
+            generate: Function performing the request and validating its result
+            
+        Returns:
+            Any: The cached or freshly generated result
+        """
+        if self._llm_cache is None:
+            return generate()
+        
+        key = self._llm_cache.make_key(op, prompt, settings.model_name)
+        hits = self._llm_cache.hits
+        result = self._llm_cache.get_or_compute(key, generate, op=op, model=settings.model_name)
+        if self._llm_cache.hits > hits:
+            logger.debug("LLM cache hit for %s request (%s)", op, self._llm_cache.stats())
+        return result
+    
     def generate_text(
         self, 
         prompt: str, 
         max_retries: int = 3,
-        retry_delay: float = 2.0
+        retry_delay: float = 2.0,
+        generation_config: Optional[Mapping[str, Any]] = None,
+        retry_budget: float = _RETRY_BUDGET
     ) -> str:
         """
         Generate text using Gemini API with retry logic.
@@ -48,7 +190,9 @@ class GeminiService:
         Args:
             prompt: The prompt to send to the API
             max_retries: Maximum number of retry attempts
-            retry_delay: Delay between retries in seconds
+            retry_delay: Base delay between retries in seconds (jittered)
+            generation_config: Optional per-call overrides for the model's config
+            retry_budget: Maximum total seconds to spend waiting between retries
             
         Returns:
             str: Generated text from the API
@@ -59,11 +203,12 @@ class GeminiService:
         if not self.is_initialized:
             raise RuntimeError("Gemini service not initialized")
         
-        last_error = None
+        deadline = time.monotonic() + retry_budget
         
         for attempt in range(max_retries):
             try:
-                response = self.model.generate_content(prompt)
+                with _text_slots:
+                    response = self.model.generate_content(prompt, generation_config=generation_config)
                 
                 # Check if response has text
                 if not response.text:
@@ -72,14 +217,71 @@ class GeminiService:
                 return response.text.strip()
                 
             except Exception as e:
-                last_error = e
-                print(f"Attempt {attempt + 1}/{max_retries} failed: {str(e)}")
+                logger.warning("Attempt %d/%d failed: %s", attempt + 1, max_retries, e)
+                
+                if attempt < max_retries - 1 and _is_retryable(e):
+                    retry_delay = _backoff(retry_delay, deadline)
+                    if retry_delay is not None:
+                        continue
+                
+                raise Exception(f"Failed to generate text after {attempt + 1} attempts: {str(e)}")
+    
+    def generate_text_stream(
+        self,
+        prompt: str,
+        max_retries: int = 3,
+        retry_delay: float = 2.0,
+        retry_budget: float = _RETRY_BUDGET
+    ) -> Iterator[str]:
+        """
+        Stream generated text chunk by chunk as Gemini produces it.
+        
+        Only opening the stream (up to the first chunk) is retried; once text
+        has been handed to the caller a failure is raised as-is, since the
+        partial output cannot be taken back. A text request slot is held from
+        opening the stream until it is exhausted, fails or is closed.
+        
+        Args:
+            prompt: The prompt to send to the API
+            max_retries: Maximum number of attempts to open the stream
+            retry_delay: Base delay between retries in seconds (jittered)
+            retry_budget: Maximum total seconds to spend waiting between retries
+        
+        Yields:
+            str: Successive pieces of the generated text
+        
+        Raises:
+            Exception: If the stream cannot be opened after all retries
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Gemini service not initialized")
+        
+        deadline = time.monotonic() + retry_budget
+        
+        for attempt in range(max_retries):
+            _text_slots.acquire()
+            try:
+                chunks = (chunk.text for chunk in self.model.generate_content(prompt, stream=True))
+                first_chunk = next(chunks, "")
+                if not first_chunk:
+                    raise ValueError("Empty response from API")
+                break
+            except Exception as e:
+                _text_slots.release()
+                logger.warning("Attempt %d/%d failed: %s", attempt + 1, max_retries, e)
+                
+                if attempt < max_retries - 1 and _is_retryable(e):
+                    retry_delay = _backoff(retry_delay, deadline)
+                    if retry_delay is not None:
+                        continue
                 
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    retry_delay *= 1.5  # Exponential backoff
+                raise Exception(f"Failed to stream text after {attempt + 1} attempts: {str(e)}")
         
-        raise Exception(f"Failed to generate text after {max_retries} attempts: {str(last_error)}")
+        try:
+            yield first_chunk.lstrip()
+            yield from chunks
+        finally:
+            _text_slots.release()
     
     def generate_scene(
         self, 
@@ -96,7 +298,7 @@ class GeminiService:
         Returns:
             str: Generated scene text
         """
-        try:
+        def generate() -> str:
             scene_text = self.generate_text(prompt)
             
             # Basic validation
@@ -104,13 +306,16 @@ class GeminiService:
                 raise ValueError(f"Generated scene too short: {len(scene_text)} characters")
             
             return scene_text
+        
+        try:
+            return self._cached('scene', prompt, generate)
             
         except Exception as e:
             error_msg = f"Failed to generate scene: {str(e)}"
-            print(f"✗ {error_msg}")
+            logger.error("✗ %s", error_msg)
             raise Exception(error_msg)
     
-    def generate_choices(self, prompt: str) -> Tuple[str, str]:
+    def generate_choices(self, prompt: str) -> ChoicePair:
         """
         Generate two story choices.
         
@@ -118,16 +323,15 @@ class GeminiService:
             prompt: The formatted prompt for choice generation
             
         Returns:
-            Tuple[str, str]: Two choice texts
+            ChoicePair: Two choice texts
             
         Raises:
             Exception: If choices cannot be generated or parsed
         """
-        try:
+        def generate() -> ChoicePair:
             response = self.generate_text(prompt)
             
             # Parse the choices from response
-            from utils.prompt_templates import PromptFormatter
             choice1, choice2 = PromptFormatter.extract_choices(response)
             
             # Validate choices
@@ -137,11 +341,62 @@ class GeminiService:
             if choice1.lower() == choice2.lower():
                 raise ValueError("Generated choices are identical")
             
-            return choice1, choice2
+            return ChoicePair(choice1, choice2)
+        
+        try:
+            # Cached entries come back from JSON as plain lists
+            return ChoicePair(*self._cached('choices', prompt, generate))
             
         except Exception as e:
             error_msg = f"Failed to generate choices: {str(e)}"
-            print(f"✗ {error_msg}")
+            logger.error("✗ %s", error_msg)
+            raise Exception(error_msg)
+    
+    def generate_scene_bundle(self, prompt: str) -> Dict[str, Any]:
+        """
+        Generate a scene, its two choices and a title in a single API call.
+        
+        The model is asked for structured JSON output, saving the separate
+        round-trips for choices and title.
+        
+        Args:
+            prompt: Prompt from PromptTemplates.get_scene_bundle_prompt
+            
+        Returns:
+            Dict[str, Any]: 'scene' (str), 'choices' (ChoicePair) and 'title' (str)
+            
+        Raises:
+            Exception: If the response is missing or fails validation
+        """
+        def generate() -> Dict[str, Any]:
+            response = self.generate_text(prompt, generation_config=_SCENE_BUNDLE_CONFIG)
+            data = json.loads(response)
+            
+            scene_text = str(data.get('scene', '')).strip()
+            choices = [str(choice).strip() for choice in data.get('choices', [])]
+            title = str(data.get('title', '')).strip().strip('"\'')
+            
+            # Same checks as generate_scene / generate_choices
+            if len(scene_text) < 50:
+                raise ValueError(f"Generated scene too short: {len(scene_text)} characters")
+            if len(choices) != 2 or len(choices[0]) < 8 or len(choices[1]) < 8:
+                raise ValueError("Expected two choices of at least 8 characters")
+            if choices[0].lower() == choices[1].lower():
+                raise ValueError("Generated choices are identical")
+            
+            return {
+                'scene': scene_text,
+                'choices': ChoicePair(choices[0], choices[1]),
+                'title': title or "The Story Continues"
+            }
+        
+        try:
+            bundle = self._cached('scene_bundle', prompt, generate)
+            return {**bundle, 'choices': ChoicePair(*bundle['choices'])}
+            
+        except Exception as e:
+            error_msg = f"Failed to generate scene bundle: {str(e)}"
+            logger.error("✗ %s", error_msg)
             raise Exception(error_msg)
     
     def generate_panel_breakdown(
@@ -163,27 +418,32 @@ class GeminiService:
             Exception: If panel breakdown cannot be generated or parsed
         """
         try:
-            from utils.prompt_templates import PromptTemplates, PromptFormatter
-            
             # Get the prompt for panel breakdown
             prompt = PromptTemplates.get_panel_breakdown_prompt(scene_content, num_panels)
             
-            # Generate the breakdown
-            response = self.generate_text(prompt)
-            
-            # Parse the panels
-            panels = PromptFormatter.extract_panel_breakdown(response)
-            
-            # Validate we got reasonable panels
-            if len(panels) < 2:
-                raise ValueError(f"Expected {num_panels} panels, got {len(panels)}")
+            def generate() -> list[dict]:
+                # Generate the breakdown as structured JSON
+                response = self.generate_text(prompt, generation_config=_PANEL_BREAKDOWN_CONFIG)
+                
+                # Parse the panels, accepting the plain "PANEL_N / VISUAL:" format
+                # when the model answers in text despite the JSON mode
+                try:
+                    panels = PromptFormatter.parse_panel_breakdown_json(response)
+                except ValueError:
+                    panels = PromptFormatter.extract_panel_breakdown(response)
+                
+                # Validate we got reasonable panels
+                if len(panels) < 2:
+                    raise ValueError(f"Expected {num_panels} panels, got {len(panels)}")
+                return panels
             
-            print(f"✓ Generated {len(panels)} panel breakdown")
+            panels = self._cached('panels', prompt, generate)
+            logger.info("✓ Generated %d panel breakdown", len(panels))
             return panels
             
         except Exception as e:
             error_msg = f"Failed to generate panel breakdown: {str(e)}"
-            print(f"✗ {error_msg}")
+            logger.error("✗ %s", error_msg)
             raise Exception(error_msg)
     
     def generate_scene_title(self, scene_content: str) -> str:
@@ -197,17 +457,41 @@ class GeminiService:
             str: Short scene title
         """
         try:
-            from utils.prompt_templates import PromptTemplates, PromptFormatter
-            
             prompt = PromptTemplates.get_scene_title_prompt(scene_content)
-            response = self.generate_text(prompt, max_retries=2)
-            
-            return PromptFormatter.extract_scene_title(response)
+            return self._cached(
+                'title', prompt,
+                lambda: PromptFormatter.extract_scene_title(self.generate_text(prompt, max_retries=2))
+            )
             
         except Exception as e:
-            print(f"⚠ Could not generate scene title: {e}")
+            logger.warning("⚠ Could not generate scene title: %s", e)
             return "The Story Continues"
     
+    def generate_title_and_panels(
+        self,
+        scene_content: str,
+        num_panels: int = 4
+    ) -> Tuple[str, list[dict]]:
+        """
+        Generate a scene title and its panel breakdown concurrently.
+        
+        The two requests are independent, so the title is fetched on a
+        worker thread while the breakdown is generated on this one.
+        
+        Args:
+            scene_content: The scene narrative
+            num_panels: Number of panels to create (3-5 recommended)
+            
+        Returns:
+            Tuple[str, list[dict]]: Scene title and panel descriptions
+            
+        Raises:
+            Exception: If the panel breakdown cannot be generated or parsed
+        """
+        title_future = _text_executor.submit(self.generate_scene_title, scene_content)
+        panels = self.generate_panel_breakdown(scene_content, num_panels)
+        return title_future.result(), panels
+    
     def health_check(self) -> bool:
         """
         Check if the Gemini service is working properly.
@@ -234,20 +518,32 @@ class GeminiService:
         return f"GeminiService(model={settings.model_name}, status={status})"
 
 
-# Global service instance
+# Global service instance (used when Streamlit is not available)
 _gemini_service: Optional[GeminiService] = None
+_gemini_service_lock = threading.Lock()
 
 
 def get_gemini_service() -> GeminiService:
     """
     Get or create the global Gemini service instance.
     
+    Inside a Streamlit app this is wrapped in st.cache_resource (below), so
+    one instance is shared by every rerun and session and genai.configure()
+    runs once per process.
+    
     Returns:
         GeminiService: The global service instance
     """
     global _gemini_service
     
     if _gemini_service is None:
-        _gemini_service = GeminiService()
+        # Checked again under the lock so concurrent first calls build one instance
+        with _gemini_service_lock:
+            if _gemini_service is None:
+                _gemini_service = GeminiService()
     
     return _gemini_service
+
+
+if st is not None:
+    get_gemini_service = st.cache_resource(show_spinner=False)(get_gemini_service)
@@ -4,23 +4,269 @@ Image generation service for comic panels.
 Uses Imagen 4.0 Ultra for primary generation with Pollinations.ai as fallback.
 """
 
+import io
 import os
 import base64
+import hashlib
+import heapq
+import itertools
+import random
+import re
+import shutil
+import tempfile
+import threading
 import urllib.parse
+from functools import lru_cache
 import requests
 import time
-from typing import Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 from config.settings import settings
+from utils.comic_prompt_builder import ComicPagePromptBuilder
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Panels are shown at most ~1000px wide, so larger renders are downscaled
+# and stored as WebP before they are ever sent to the browser
+MAX_IMAGE_SIZE = (1024, 1024)
+WEBP_QUALITY = 85
+
+# Downloads of this size or smaller are error pages, not images
+MIN_IMAGE_BYTES = 1000
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# (connect, read) seconds; the read timeout bounds each wait for the next bytes
+DOWNLOAD_TIMEOUT = (5, 60)
+# Multiple of 3 so base64 pieces join without padding
+BASE64_CHUNK_SIZE = 57 * 1024
+
+# Sent with every Pollinations request
+POLLINATIONS_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+# Pollinations endpoints, formatted with the URL-encoded prompt
+POLLINATIONS_URL = "https://pollinations.ai/p/{prompt}?width=1024&height=576&nologo=true&model=flux"
+POLLINATIONS_ALT_URL = "https://image.pollinations.ai/prompt/{prompt}"
+
+# Limits image requests in flight across all threads and sessions; held per
+# provider call, so retry backoff and fallbacks don't occupy a slot
+_image_slots = threading.BoundedSemaphore(settings.max_concurrent_image_gens)
 
 # Import the new Google GenAI SDK
 try:
+    import httpx
     from google import genai
+    from google.genai import errors as genai_errors
     GENAI_AVAILABLE = True
 except ImportError:
     GENAI_AVAILABLE = False
     print("⚠ google-genai package not installed. Run: pip install google-genai")
 
+# Imagen calls are retried on transient failures before falling back
+IMAGEN_MAX_ATTEMPTS = 3
+IMAGEN_RETRY_DELAY = 1.0
+IMAGEN_MAX_RETRY_DELAY = 15.0
+
+
+def _is_transient_imagen_error(error: Exception) -> bool:
+    """
+    Check whether an Imagen failure is worth retrying.
+    
+    Args:
+        error: Exception raised by the google-genai client
+        
+    Returns:
+        bool: True for timeouts, rate limits, server errors and connection failures
+    """
+    if isinstance(error, genai_errors.APIError):
+        return isinstance(error, genai_errors.ServerError) or error.code in (408, 429)
+    return isinstance(error, (httpx.TransportError, TimeoutError, ConnectionError))
+
+
+# Art-style descriptions for single-panel prompts (unknown styles use western_comic)
+_STYLE_INSTRUCTIONS = {
+    "western_comic": (
+        "rendered in American comic book style with bold black ink outlines, "
+        "dynamic action poses, cel-shading with vibrant saturated colors, "
+        "dramatic shadows, and heroic proportions like Marvel or DC comics"
+    ),
+    "manga": (
+        "rendered in Japanese manga style with expressive large eyes, "
+        "speed lines for motion, screentone shading patterns, emotional expressions, "
+        "black and white with gray tones, dynamic panel energy"
+    ),
+    "cartoon": (
+        "rendered in modern animated cartoon style with bright cheerful colors, "
+        "rounded friendly shapes, exaggerated fun expressions, clean bold outlines, "
+        "playful and energetic like Pixar or Disney animation"
+    ),
+    "graphic_novel": (
+        "rendered in graphic novel style with realistic proportions, "
+        "moody atmospheric lighting, muted sophisticated color palette, "
+        "detailed textured backgrounds, cinematic noir composition"
+    ),
+    "retro_comic": (
+        "rendered in vintage 1960s comic book style with visible halftone dot patterns, "
+        "limited primary color palette (red, blue, yellow), classic bold outlines, "
+        "nostalgic silver age aesthetic with slightly faded colors"
+    ),
+    "watercolor": (
+        "rendered in poetic watercolor-ink illustration style with fine delicate ink outlines, "
+        "soft bleeding watercolor washes, visible paper grain texture, "
+        "muted greys and blues with occasional vivid color accents, expressive brushwork"
+    )
+}
+
+_COMIC_PANEL_PROMPT = """Create a stunning single comic book panel illustration, {style_desc}.
+
+SCENE TO ILLUSTRATE:
+{scene_description}
+
+VISUAL REQUIREMENTS:
+- Capture the KEY DRAMATIC MOMENT from the scene
+- Show clear character poses and expressions that convey emotion
+- Use dynamic camera angle (low angle for power, high angle for vulnerability, dutch angle for tension)
+- Include relevant environment/background details mentioned in the scene
+- Dramatic lighting that enhances the mood (rim lighting, shadows, highlights)
+- Professional comic book illustration quality with polished finish
+- Characters should be the focal point with clear silhouettes
+
+COMPOSITION:
+- Single cohesive panel, NO borders or panel frames
+- 16:9 landscape cinematic aspect ratio
+- Rule of thirds composition for visual impact
+- Depth with foreground, midground, background elements
+- Leading lines drawing eye to the action
+
+STRICT RESTRICTIONS:
+- Absolutely NO text, words, letters, or writing of any kind
+- NO speech bubbles or caption boxes
+- NO watermarks, signatures, or logos
+- NO UI elements or borders
+- Characters should NOT be looking directly at camera unless scene requires it"""
+
+# Static pieces around the two placeholders, split once so building a
+# prompt is a plain join rather than a format-string parse
+_PANEL_PROMPT_HEAD, _, _rest = _COMIC_PANEL_PROMPT.partition("{style_desc}")
+_PANEL_PROMPT_MIDDLE, _, _PANEL_PROMPT_TAIL = _rest.partition("{scene_description}")
+del _rest
+
+
+@lru_cache(maxsize=512)
+def _build_comic_prompt_cached(scene_description: str, style: str) -> str:
+    """
+    Build the single-panel image prompt, memoized on (scene, style).
+    
+    Args:
+        scene_description: The scene to visualize
+        style: Art style preference
+        
+    Returns:
+        str: Formatted prompt for image generation
+    """
+    style_desc = _STYLE_INSTRUCTIONS.get(style, _STYLE_INSTRUCTIONS["western_comic"])
+    return "".join((_PANEL_PROMPT_HEAD, style_desc, _PANEL_PROMPT_MIDDLE, scene_description, _PANEL_PROMPT_TAIL))
+
+
+@lru_cache(maxsize=64)
+def _encode_prompt(prompt: str, max_length: int) -> str:
+    """URL-encode a prompt cut to max_length, reused across Pollinations retries and fallbacks."""
+    return urllib.parse.quote(prompt[:max_length])
+
+
+# Leading bytes of the image formats the generators return
+_IMAGE_SIGNATURES = (
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"\xff\xd8\xff",         # JPEG
+    b"GIF87a",
+    b"GIF89a",
+)
+
+
+def _is_image_data(head: bytes) -> bool:
+    """Check whether data starts with a PNG, JPEG, GIF or WebP signature."""
+    if head.startswith(_IMAGE_SIGNATURES):
+        return True
+    return head[:4] == b"RIFF" and head[8:12] == b"WEBP"
+
+
+# Runs of anything that is not a letter or digit
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def _prompt_cache_key(prompt: str) -> str:
+    """
+    Hash a prompt for the image cache, ignoring case, spacing and punctuation.
+    
+    Prompts that differ only in those details describe the same picture, so
+    they share a cached image.
+    
+    Args:
+        prompt: The image generation prompt
+        
+    Returns:
+        str: SHA-256 hex digest of the normalized prompt
+    """
+    normalized = _NON_WORD_RE.sub(" ", prompt.casefold()).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _get_page_builder(style: str) -> ComicPagePromptBuilder:
+    """Get the shared page prompt builder for an art style."""
+    return ComicPagePromptBuilder(art_style=style)
+
+
+def _oldest_files(
+    directory: Path,
+    keep_count: int,
+    suffixes: Optional[Tuple[str, ...]] = None
+) -> List[str]:
+    """
+    List the files in a directory beyond the keep_count most recently modified.
+    
+    Uses os.scandir, whose entries carry their own stat results, and a heap
+    for the newest keep_count instead of sorting every file.
+    
+    Args:
+        directory: Directory to scan (not recursive)
+        keep_count: Number of most recent files to keep
+        suffixes: Only consider files with one of these suffixes
+        
+    Returns:
+        List[str]: Paths of the older files
+    """
+    with os.scandir(directory) as it:
+        entries = [
+            (entry.stat().st_mtime, entry.path) for entry in it
+            if entry.is_file() and (suffixes is None or entry.name.endswith(suffixes))
+        ]
+    if len(entries) <= keep_count:
+        return []
+    keep = {path for _, path in heapq.nlargest(keep_count, entries)}
+    return [path for _, path in entries if path not in keep]
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """
+    Hard-link source to destination, copying where links are unsupported.
+    
+    The destination's mtime is refreshed either way, so cleanup_old_images
+    treats a reused image as new.
+    """
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+    os.utime(destination)
+
 
 class ImageService:
     """Service for generating comic-style images."""
@@ -28,10 +274,49 @@ class ImageService:
     def __init__(self):
         """Initialize the image service."""
         self.client = None
-        self.images_dir = Path(__file__).parent.parent / 'generated_images'
-        self.images_dir.mkdir(exist_ok=True)
+        self.images_dir = settings.scene_images_dir
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        # Generated images keyed by prompt hash, reused when a prompt repeats
+        self.cache_dir = settings.image_cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache_index: Dict[str, Path] = {}
+        self.download_dir = settings.image_download_dir
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        # Unique, sortable image filenames: process start time + pid + sequence
+        self._started_at = int(time.time())
+        self._pid = os.getpid()
+        self._image_seq = itertools.count(1)
+        self._session = self._create_http_session()
         self._initialize_imagen()
     
+    @staticmethod
+    def _create_http_session() -> requests.Session:
+        """
+        Create the HTTP session used for image downloads.
+        
+        Reusing one session keeps connections alive between scenes, so only
+        the first Pollinations request pays for the TCP and TLS handshake.
+        Connection failures, rate limits and server errors are retried with a
+        short backoff. Read timeouts are not: the server may still be
+        rendering, and a retry would start a second generation.
+        
+        Returns:
+            requests.Session: Session with pooled, retrying HTTPS connections
+        """
+        retry = Retry(
+            total=2,
+            connect=2,
+            read=0,
+            status=2,
+            backoff_factor=0.5,
+            status_forcelist=[408, 429, 500, 502, 503, 504],
+            raise_on_status=False  # Hand the last response back for the status checks
+        )
+        session = requests.Session()
+        session.headers.update(POLLINATIONS_HEADERS)
+        session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry))
+        return session
+    
     def _initialize_imagen(self) -> None:
         """Initialize Imagen 4.0 Ultra for image generation."""
         if not GENAI_AVAILABLE:
@@ -64,15 +349,89 @@ class ImageService:
         # Build the comic art prompt
         image_prompt = self._build_comic_prompt(scene_description, style)
         
-        # Try Gemini first
-        image_path = self._generate_with_gemini(image_prompt, scene_id)
+        # Imagen first, then Pollinations (or a cached image for this prompt)
+        image_path = self._generate_image(image_prompt, scene_id)
         
-        # Fallback to Pollinations if Gemini fails
+        return image_path, image_prompt
+    
+    def _generate_image(
+        self,
+        prompt: str,
+        scene_id: int,
+        fallback_notice: str = "⚠ Gemini failed, trying Pollinations fallback..."
+    ) -> Optional[str]:
+        """
+        Generate an image with Imagen, falling back to Pollinations.
+        
+        A prompt that was already rendered is served from the on-disk cache
+        instead of paying for another generation.
+        
+        Args:
+            prompt: The image generation prompt
+            scene_id: Scene identifier for filename
+            fallback_notice: Message printed when falling back to Pollinations
+            
+        Returns:
+            Optional[str]: Path to saved image or None if every generator failed
+        """
+        cache_key = _prompt_cache_key(prompt)
+        
+        image_path = self._get_cached_image(cache_key, scene_id)
+        if image_path:
+            print(f"✓ Reused cached image for matching prompt: {image_path}")
+            return image_path
+        
+        image_path = self._generate_with_gemini(prompt, scene_id)
         if not image_path:
-            print("⚠ Gemini failed, trying Pollinations fallback...")
-            image_path = self._generate_with_pollinations(image_prompt, scene_id)
+            print(fallback_notice)
+            image_path = self._generate_with_pollinations(prompt, scene_id)
         
-        return image_path, image_prompt
+        if image_path:
+            self._add_to_cache(cache_key, Path(image_path))
+        return image_path
+    
+    def _get_cached_image(self, cache_key: str, scene_id: int) -> Optional[str]:
+        """
+        Copy a cached image to a new scene file, if this prompt was rendered before.
+        
+        Args:
+            cache_key: Cache key from _prompt_cache_key
+            scene_id: Scene identifier for the new filename
+            
+        Returns:
+            Optional[str]: Path of the scene's image, or None on a cache miss
+        """
+        cached = self._cache_index.get(cache_key)
+        if cached is None:
+            # First lookup of this key in this process: check the disk once
+            cached = next(self.cache_dir.glob(f"{cache_key}.*"), None)
+            if cached is None:
+                return None
+            self._cache_index[cache_key] = cached
+        
+        image_path = self.images_dir / f"{self._new_image_stem(scene_id)}{cached.suffix}"
+        try:
+            _link_or_copy(cached, image_path)
+        except OSError:
+            # Cache file was removed by cleanup
+            self._cache_index.pop(cache_key, None)
+            return None
+        return str(image_path)
+    
+    def _add_to_cache(self, cache_key: str, image_path: Path) -> None:
+        """
+        Remember a generated image under its prompt hash.
+        
+        Args:
+            cache_key: Cache key from _prompt_cache_key
+            image_path: The freshly generated scene image
+        """
+        cached = self.cache_dir / f"{cache_key}{image_path.suffix}"
+        try:
+            _link_or_copy(image_path, cached)
+            self._cache_index[cache_key] = cached
+        except OSError as e:
+            print(f"⚠ Could not cache image: {e}")
     
     def _build_comic_prompt(self, scene_description: str, style: str) -> str:
         """
@@ -85,71 +444,115 @@ class ImageService:
         Returns:
             str: Formatted prompt for image generation
         """
-        style_instructions = {
-            "western_comic": (
-                "rendered in American comic book style with bold black ink outlines, "
-                "dynamic action poses, cel-shading with vibrant saturated colors, "
-                "dramatic shadows, and heroic proportions like Marvel or DC comics"
-            ),
-            "manga": (
-                "rendered in Japanese manga style with expressive large eyes, "
-                "speed lines for motion, screentone shading patterns, emotional expressions, "
-                "black and white with gray tones, dynamic panel energy"
-            ),
-            "cartoon": (
-                "rendered in modern animated cartoon style with bright cheerful colors, "
-                "rounded friendly shapes, exaggerated fun expressions, clean bold outlines, "
-                "playful and energetic like Pixar or Disney animation"
-            ),
-            "graphic_novel": (
-                "rendered in graphic novel style with realistic proportions, "
-                "moody atmospheric lighting, muted sophisticated color palette, "
-                "detailed textured backgrounds, cinematic noir composition"
-            ),
-            "retro_comic": (
-                "rendered in vintage 1960s comic book style with visible halftone dot patterns, "
-                "limited primary color palette (red, blue, yellow), classic bold outlines, "
-                "nostalgic silver age aesthetic with slightly faded colors"
-            ),
-            "watercolor": (
-                "rendered in poetic watercolor-ink illustration style with fine delicate ink outlines, "
-                "soft bleeding watercolor washes, visible paper grain texture, "
-                "muted greys and blues with occasional vivid color accents, expressive brushwork"
-            )
-        }
-        
-        style_desc = style_instructions.get(style, style_instructions["western_comic"])
-        
-        # Extract key visual elements from the scene
-        prompt = f"""Create a stunning single comic book panel illustration, {style_desc}.
-
-SCENE TO ILLUSTRATE:
-{scene_description}
-
-VISUAL REQUIREMENTS:
-- Capture the KEY DRAMATIC MOMENT from the scene
-- Show clear character poses and expressions that convey emotion
-- Use dynamic camera angle (low angle for power, high angle for vulnerability, dutch angle for tension)
-- Include relevant environment/background details mentioned in the scene
-- Dramatic lighting that enhances the mood (rim lighting, shadows, highlights)
-- Professional comic book illustration quality with polished finish
-- Characters should be the focal point with clear silhouettes
-
-COMPOSITION:
-- Single cohesive panel, NO borders or panel frames
-- 16:9 landscape cinematic aspect ratio
-- Rule of thirds composition for visual impact
-- Depth with foreground, midground, background elements
-- Leading lines drawing eye to the action
-
-STRICT RESTRICTIONS:
-- Absolutely NO text, words, letters, or writing of any kind
-- NO speech bubbles or caption boxes
-- NO watermarks, signatures, or logos
-- NO UI elements or borders
-- Characters should NOT be looking directly at camera unless scene requires it"""
+        return _build_comic_prompt_cached(scene_description, style)
+    
+    def _new_image_stem(self, scene_id: int) -> str:
+        """
+        Get a unique filename stem for a new scene image.
+        
+        A per-process counter instead of the current second keeps images that
+        finish in the same second (e.g. in concurrent sessions) from overwriting
+        each other. The process id separates workers that started in the
+        same second and share the images directory.
+        
+        Args:
+            scene_id: Scene identifier
+            
+        Returns:
+            str: Filename without extension
+        """
+        return f"scene_{scene_id}_{self._started_at}_{self._pid}_{next(self._image_seq):04d}"
+    
+    def _save_image(self, image_data: Union[bytes, Path], scene_id: int) -> Path:
+        """
+        Save generated image bytes, downscaled and recompressed as WebP.
+        
+        Falls back to keeping the original image as PNG if Pillow is not
+        installed or cannot process the image.
+        
+        Args:
+            image_data: Raw image bytes from the generator, or a downloaded
+                        file (consumed: removed or moved into place)
+            scene_id: Scene identifier for filename
+            
+        Returns:
+            Path: Path of the saved image
+        """
+        stem = self._new_image_stem(scene_id)
+        
+        if PIL_AVAILABLE:
+            try:
+                source = image_data if isinstance(image_data, Path) else io.BytesIO(image_data)
+                with Image.open(source) as img:
+                    img.thumbnail(MAX_IMAGE_SIZE)
+                    if img.mode not in ("RGB", "RGBA"):
+                        img = img.convert("RGB")
+                    image_path = self.images_dir / f"{stem}.webp"
+                    img.save(image_path, "WEBP", quality=WEBP_QUALITY, method=6)
+                if isinstance(image_data, Path):
+                    image_data.unlink()
+                return image_path
+            except Exception as e:
+                print(f"⚠ Image optimization failed, saving original: {e}")
+        
+        image_path = self.images_dir / f"{stem}.png"
+        if isinstance(image_data, Path):
+            image_data.replace(image_path)
+        else:
+            with open(image_path, 'wb') as f:
+                f.write(image_data)
+        return image_path
+    
+    def _download_image(self, url: str, **kwargs) -> Tuple[int, Optional[Path]]:
+        """
+        Stream an image download to a temporary file in the download directory.
+        
+        The body is written to disk in chunks instead of being held in memory.
+        Responses that declare a too-small Content-Length are rejected without
+        reading the body, and bodies that don't start with an image signature
+        are rejected after the first chunk.
         
-        return prompt
+        Args:
+            url: Image URL
+            **kwargs: Extra arguments for the session's get()
+            
+        Returns:
+            Tuple of (HTTP status, downloaded file or None if not a usable image)
+        """
+        with _image_slots:
+            return self._stream_download(url, **kwargs)
+    
+    def _stream_download(self, url: str, **kwargs) -> Tuple[int, Optional[Path]]:
+        """Download body of _download_image, run while holding an image slot."""
+        with self._session.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True, **kwargs) as response:
+            declared_size = response.headers.get("Content-Length")
+            if response.status_code != 200 or (declared_size and int(declared_size) <= MIN_IMAGE_BYTES):
+                return response.status_code, None
+            
+            # Check the file signature before writing anything: error pages
+            # can come back as 200 with an HTML body
+            chunks = response.iter_content(DOWNLOAD_CHUNK_SIZE)
+            first_chunk = next(chunks, b"")
+            if not _is_image_data(first_chunk):
+                print("⚠ Response is not an image, discarding it")
+                return response.status_code, None
+            
+            with tempfile.NamedTemporaryFile(dir=self.download_dir, suffix=".part", delete=False) as f:
+                download_path = Path(f.name)
+                try:
+                    f.write(first_chunk)
+                    for chunk in chunks:
+                        f.write(chunk)
+                except Exception:
+                    f.close()
+                    download_path.unlink()
+                    raise
+                size = f.tell()
+        
+        if size <= MIN_IMAGE_BYTES:
+            download_path.unlink()
+            return response.status_code, None
+        return response.status_code, download_path
     
     def _generate_with_gemini(self, prompt: str, scene_id: int) -> Optional[str]:
         """
@@ -167,25 +570,14 @@ STRICT RESTRICTIONS:
         
         try:
             # Generate with Imagen 4.0 Ultra model
-            response = self.client.models.generate_images(
-                model="imagen-4.0-ultra-generate-001",
-                prompt=prompt,
-                config={
-                    "number_of_images": 1,
-                    "aspect_ratio": "16:9",
-                    "safety_filter_level": "BLOCK_LOW_AND_ABOVE",
-                }
-            )
+            response = self._request_imagen(prompt)
             
             # Check if response contains images
             if response.generated_images:
                 for idx, generated_image in enumerate(response.generated_images):
                     # Get image data
                     image_data = generated_image.image.image_bytes
-                    image_path = self.images_dir / f"scene_{scene_id}_{int(time.time())}.png"
-                    
-                    with open(image_path, 'wb') as f:
-                        f.write(image_data)
+                    image_path = self._save_image(image_data, scene_id)
                     
                     print(f"✓ Generated image with Imagen 4.0 Ultra: {image_path}")
                     return str(image_path)
@@ -197,6 +589,40 @@ STRICT RESTRICTIONS:
             print(f"⚠ Imagen 4.0 image generation failed: {e}")
             return None
     
+    def _request_imagen(self, prompt: str):
+        """
+        Call Imagen 4.0 Ultra, retrying transient failures with jittered backoff.
+        
+        Permanent errors (bad request, safety rejection, auth) are raised
+        immediately so the caller can fall back without waiting.
+        
+        Args:
+            prompt: The image generation prompt
+            
+        Returns:
+            The google-genai generate_images response
+        """
+        delay = IMAGEN_RETRY_DELAY
+        for attempt in range(IMAGEN_MAX_ATTEMPTS):
+            try:
+                # The slot is held for the request only, never while backing off
+                with _image_slots:
+                    return self.client.models.generate_images(
+                        model="imagen-4.0-ultra-generate-001",
+                        prompt=prompt,
+                        config={
+                            "number_of_images": 1,
+                            "aspect_ratio": "16:9",
+                            "safety_filter_level": "BLOCK_LOW_AND_ABOVE",
+                        }
+                    )
+            except Exception as e:
+                if attempt == IMAGEN_MAX_ATTEMPTS - 1 or not _is_transient_imagen_error(e):
+                    raise
+                delay = min(IMAGEN_MAX_RETRY_DELAY, random.uniform(delay, delay * 3))
+                print(f"⚠ Imagen attempt {attempt + 1}/{IMAGEN_MAX_ATTEMPTS} failed: {e}. Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+    
     def _generate_with_pollinations(self, prompt: str, scene_id: int) -> Optional[str]:
         """
         Generate image using Pollinations.ai (free fallback).
@@ -211,30 +637,22 @@ STRICT RESTRICTIONS:
         try:
             # Pollinations API endpoint - use simpler prompt encoding
             # Shorten prompt to avoid URL length issues
-            short_prompt = prompt[:500] if len(prompt) > 500 else prompt
-            encoded_prompt = urllib.parse.quote(short_prompt)
+            encoded_prompt = _encode_prompt(prompt, 500)
             
-            # Updated Pollinations URL format
-            url = f"https://pollinations.ai/p/{encoded_prompt}?width=1024&height=576&nologo=true&model=flux"
+            url = POLLINATIONS_URL.format(prompt=encoded_prompt)
             
             print(f"⏳ Generating image with Pollinations...")
             
-            # Download the image with headers
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, timeout=120, headers=headers)
+            # Download the image (session sends the headers)
+            status_code, download_path = self._download_image(url)
             
-            if response.status_code == 200 and len(response.content) > 1000:
-                image_path = self.images_dir / f"scene_{scene_id}_{int(time.time())}.png"
-                
-                with open(image_path, 'wb') as f:
-                    f.write(response.content)
+            if download_path:
+                image_path = self._save_image(download_path, scene_id)
                 
                 print(f"✓ Generated image with Pollinations: {image_path}")
                 return str(image_path)
             else:
-                print(f"⚠ Pollinations returned status: {response.status_code}")
+                print(f"⚠ Pollinations returned status: {status_code}")
                 # Try alternative endpoint
                 return self._generate_with_pollinations_alt(prompt, scene_id)
                 
@@ -248,22 +666,15 @@ STRICT RESTRICTIONS:
         """
         try:
             # Try the image.pollinations.ai endpoint
-            short_prompt = prompt[:300] if len(prompt) > 300 else prompt
-            encoded_prompt = urllib.parse.quote(short_prompt)
-            url = f"https://image.pollinations.ai/prompt/{encoded_prompt}"
+            encoded_prompt = _encode_prompt(prompt, 300)
+            url = POLLINATIONS_ALT_URL.format(prompt=encoded_prompt)
             
             print(f"⏳ Trying alternative Pollinations endpoint...")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, timeout=120, headers=headers, allow_redirects=True)
+            _, download_path = self._download_image(url, allow_redirects=True)
             
-            if response.status_code == 200 and len(response.content) > 1000:
-                image_path = self.images_dir / f"scene_{scene_id}_{int(time.time())}.png"
-                
-                with open(image_path, 'wb') as f:
-                    f.write(response.content)
+            if download_path:
+                image_path = self._save_image(download_path, scene_id)
                 
                 print(f"✓ Generated image with Pollinations (alt): {image_path}")
                 return str(image_path)
@@ -275,6 +686,25 @@ STRICT RESTRICTIONS:
             print(f"⚠ Alternative Pollinations also failed: {e}")
             return None
     
+    @staticmethod
+    def iter_image_base64(image_path: str) -> Iterator[bytes]:
+        """
+        Encode an image file to base64 piece by piece.
+        
+        Reads in chunks whose size is a multiple of 3, so the encoded pieces
+        concatenate without padding in between and the whole file is never
+        held in memory at once.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Yields:
+            bytes: Consecutive base64 (ASCII) pieces of the file
+        """
+        with open(image_path, 'rb') as f:
+            while chunk := f.read(BASE64_CHUNK_SIZE):
+                yield base64.b64encode(chunk)
+    
     def get_image_as_base64(self, image_path: str) -> Optional[str]:
         """
         Convert an image file to base64 string for embedding.
@@ -286,8 +716,10 @@ STRICT RESTRICTIONS:
             Optional[str]: Base64 encoded image string
         """
         try:
-            with open(image_path, 'rb') as f:
-                return base64.b64encode(f.read()).decode('utf-8')
+            encoded = io.BytesIO()
+            for piece in self.iter_image_base64(image_path):
+                encoded.write(piece)
+            return encoded.getvalue().decode('ascii')
         except Exception as e:
             print(f"⚠ Failed to encode image: {e}")
             return None
@@ -300,11 +732,13 @@ STRICT RESTRICTIONS:
             keep_count: Number of recent images to keep
         """
         try:
-            images = sorted(self.images_dir.glob("*.png"), key=os.path.getmtime, reverse=True)
+            for old_image in _oldest_files(self.images_dir, keep_count, (".png", ".webp")):
+                os.unlink(old_image)
+                print(f"🗑️ Cleaned up: {os.path.basename(old_image)}")
             
-            for old_image in images[keep_count:]:
-                old_image.unlink()
-                print(f"🗑️ Cleaned up: {old_image.name}")
+            # The prompt cache is bounded the same way
+            for old_image in _oldest_files(self.cache_dir, keep_count):
+                os.unlink(old_image)
                 
         except Exception as e:
             print(f"⚠ Cleanup failed: {e}")
@@ -333,10 +767,8 @@ STRICT RESTRICTIONS:
         Returns:
             Tuple[image_path, image_prompt]: Path to saved image and the prompt used
         """
-        from utils.comic_prompt_builder import ComicPagePromptBuilder
-        
-        # Initialize the prompt builder
-        builder = ComicPagePromptBuilder(art_style=style)
+        # Prompt builder for this style (stateless, shared across calls)
+        builder = _get_page_builder(style)
         
         # Build the structured comic page prompt
         image_prompt = builder.build_from_scene_and_panels(
@@ -349,13 +781,8 @@ STRICT RESTRICTIONS:
         
         print(f"📄 Generating comic page with {len(panel_breakdown)} panels...")
         
-        # Try Imagen first (best for multi-panel comics)
-        image_path = self._generate_with_gemini(image_prompt, scene_id)
-        
-        # Fallback to Pollinations if Gemini fails
-        if not image_path:
-            print("⚠ Imagen failed for page mode, trying Pollinations...")
-            image_path = self._generate_with_pollinations(image_prompt, scene_id)
+        # Imagen first, then Pollinations (or a cached image for this prompt)
+        image_path = self._generate_image(image_prompt, scene_id, "⚠ Imagen failed for page mode, trying Pollinations...")
         
         return image_path, image_prompt
     
@@ -380,9 +807,7 @@ STRICT RESTRICTIONS:
         Returns:
             Tuple[image_path, image_prompt]: Path to saved image and the prompt used
         """
-        from utils.comic_prompt_builder import ComicPagePromptBuilder
-        
-        builder = ComicPagePromptBuilder(art_style=style)
+        builder = _get_page_builder(style)
         image_prompt = builder.build_simple_prompt(
             scene_content=scene_content,
             art_style=style,
@@ -391,12 +816,8 @@ STRICT RESTRICTIONS:
         
         print(f"📄 Generating simple {num_panels}-panel comic page...")
         
-        # Try Imagen first
-        image_path = self._generate_with_gemini(image_prompt, scene_id)
-        
-        if not image_path:
-            print("⚠ Imagen failed, trying Pollinations...")
-            image_path = self._generate_with_pollinations(image_prompt, scene_id)
+        # Imagen first, then Pollinations (or a cached image for this prompt)
+        image_path = self._generate_image(image_prompt, scene_id, "⚠ Imagen failed, trying Pollinations...")
         
         return image_path, image_prompt
     
@@ -419,9 +840,7 @@ STRICT RESTRICTIONS:
         Returns:
             Tuple[image_path, image_prompt]: Path to saved image and the prompt used
         """
-        from utils.comic_prompt_builder import ComicPagePromptBuilder
-        
-        builder = ComicPagePromptBuilder(art_style=style)
+        builder = _get_page_builder(style)
         image_prompt = builder.build_cover_prompt(
             story_title=story_title,
             story_theme=story_theme,
@@ -431,18 +850,15 @@ STRICT RESTRICTIONS:
         
         print(f"📕 Generating comic cover: {story_title}...")
         
-        # Try Imagen first
-        image_path = self._generate_with_gemini(image_prompt, 0)
-        
-        if not image_path:
-            print("⚠ Imagen failed for cover, trying Pollinations...")
-            image_path = self._generate_with_pollinations(image_prompt, 0)
+        # Imagen first, then Pollinations (or a cached image for this prompt)
+        image_path = self._generate_image(image_prompt, 0, "⚠ Imagen failed for cover, trying Pollinations...")
         
         return image_path, image_prompt
 
 
 # Global service instance
 _image_service: Optional[ImageService] = None
+_image_service_lock = threading.Lock()
 
 
 def get_image_service() -> ImageService:
@@ -455,6 +871,9 @@ def get_image_service() -> ImageService:
     global _image_service
     
     if _image_service is None:
-        _image_service = ImageService()
+        # Checked again under the lock so concurrent first calls build one instance
+        with _image_service_lock:
+            if _image_service is None:
+                _image_service = ImageService()
     
     return _image_service
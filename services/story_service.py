@@ -5,15 +5,55 @@ Orchestrates the story creation process using Gemini API and image generation.
 Supports both Panel Mode (single image per scene) and Page Mode (multi-panel comic pages).
 """
 
-from typing import Tuple, Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
 from models.story import Story, Scene, Choice
-from services.gemini_service import get_gemini_service
+from services.gemini_service import ChoicePair, get_gemini_service
 from services.image_service import get_image_service
 from utils.prompt_templates import PromptTemplates, PromptFormatter
-from utils.image_prompts import ComicPromptTemplates
 from config.settings import settings
 
 
+# Renders a stream of text chunks (e.g. st.write_stream) and returns the full text
+TextStreamCallback = Callable[[Iterator[str]], str]
+
+# (image_path, image_prompt, panel_breakdown, scene_title) for a scene's artwork
+SceneImage = Tuple[Optional[str], Optional[str], Optional[list], Optional[str]]
+
+# (scene_id, scene_content, choices future or None for an ending, title, default title)
+# for a written scene whose artwork has not been generated yet
+SceneDraft = Tuple[int, str, Optional["Future[ChoicePair]"], Optional[str], Optional[str]]
+
+# Runs a scene's choices request while its image is being generated
+_choices_executor = ThreadPoolExecutor(max_workers=settings.io_parallelism, thread_name_prefix="story-choices")
+
+# Writes the scenes behind a scene's choices while the user is reading it.
+# Kept separate from the choices pool, which these jobs submit to themselves.
+_prefetch_executor = ThreadPoolExecutor(max_workers=settings.io_parallelism, thread_name_prefix="story-prefetch")
+
+# Upper bound on pending prefetched scenes across all stories sharing a service
+_MAX_PREFETCHED = 16
+
+
+def _build_choices(choice_texts: ChoicePair) -> List[Choice]:
+    """Turn generated choice texts into the scene's Choice objects (ids 1 and 2)."""
+    return [Choice(id=i, text=text) for i, text in enumerate(choice_texts, 1)]
+
+
+def _completed(value: ChoicePair) -> "Future[ChoicePair]":
+    """Wrap choices that are already known in a finished Future."""
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _report_progress(on_progress: Optional[Callable[[str], None]], label: str) -> None:
+    """Send a progress label to the caller's callback, if one was given."""
+    if on_progress:
+        on_progress(label)
+
+
 class StoryService:
     """Service for managing story generation and flow."""
     
@@ -22,7 +62,8 @@ class StoryService:
         generate_images: bool = True, 
         art_style: str = "western_comic",
         page_mode: bool = False,
-        num_panels: int = 4
+        num_panels: int = 4,
+        enable_speculative: Optional[bool] = None
     ):
         """
         Initialize the story service.
@@ -33,22 +74,57 @@ class StoryService:
             page_mode: If True, generates full comic pages with multiple panels.
                       If False (default), generates single panel per scene.
             num_panels: Number of panels per page in page mode (3-5)
+            enable_speculative: If True, writes the next scene's text for both
+                      choices in the background while the user reads the
+                      current one (up to twice the text API usage per turn).
+                      Artwork is only generated for the chosen branch.
+                      Defaults to the SPECULATIVE_PREFETCH setting (off).
         """
         self.gemini_service = get_gemini_service()
         self.image_service = get_image_service()
-        self.prompt_templates = PromptTemplates()
-        self.comic_prompts = ComicPromptTemplates()
         self.generate_images = generate_images
         self.art_style = art_style
         self.page_mode = page_mode
         self.num_panels = max(3, min(5, num_panels))  # Clamp between 3-5
+        self.enable_speculative = (
+            settings.speculative_prefetch if enable_speculative is None else enable_speculative
+        )
+        
+        # Prefetched next scene drafts keyed by (id(story), scene id, choice id). The
+        # service is shared between sessions, so each entry keeps its story to
+        # confirm the id still refers to the same object.
+        self._prefetch: Dict[Tuple[int, int, int], Tuple[Story, "Future[SceneDraft]"]] = {}
+        self._prefetch_lock = threading.Lock()
     
-    def start_new_story(self, initial_prompt: str) -> Story:
+    @classmethod
+    def warmup(cls) -> None:
+        """
+        Build the shared Gemini and image services ahead of the first request.
+        
+        Meant to run on a background thread at startup, so the first story
+        doesn't pay for the SDK import and client setup. Failures are only
+        reported here; they surface again when a story is started.
+        """
+        try:
+            get_gemini_service()
+            get_image_service()
+            print("✓ Story services warmed up")
+        except Exception as e:
+            print(f"⚠ Service warm-up failed: {e}")
+    
+    def start_new_story(
+        self,
+        initial_prompt: str,
+        on_progress: Optional[Callable[[str], None]] = None,
+        on_stream: Optional[TextStreamCallback] = None
+    ) -> Story:
         """
         Start a new story from user's initial prompt.
         
         Args:
             initial_prompt: User's story idea
+            on_progress: Optional callback receiving a label for each generation step
+            on_stream: Optional callback that renders scene text as it streams
             
         Returns:
             Story: New story instance with first scene
@@ -67,101 +143,232 @@ class StoryService:
         story = Story(initial_prompt=initial_prompt)
         
         # Generate first scene
-        first_scene = self._generate_first_scene(initial_prompt)
+        first_scene = self._generate_first_scene(initial_prompt, on_progress, on_stream)
         story.add_scene(first_scene)
+        self._prefetch_next_scenes(story, first_scene)
         
         return story
     
-    def _generate_first_scene(self, user_prompt: str) -> Scene:
+    def _generate_first_scene(
+        self,
+        user_prompt: str,
+        on_progress: Optional[Callable[[str], None]] = None,
+        on_stream: Optional[TextStreamCallback] = None
+    ) -> Scene:
         """
         Generate the first scene of the story.
         
         Args:
             user_prompt: User's initial story prompt
+            on_progress: Optional callback receiving a label for each generation step
+            on_stream: Optional callback that renders scene text as it streams
             
         Returns:
             Scene: Generated first scene with choices
         """
-        # Generate scene content
-        scene_prompt = self.prompt_templates.get_initial_scene_prompt(user_prompt)
-        scene_content = self.gemini_service.generate_scene(scene_prompt, is_first_scene=True)
+        # Generate scene content and choices
+        _report_progress(on_progress, "✍️ Writing the opening scene...")
+        scene_prompt = PromptTemplates.get_initial_scene_prompt(user_prompt)
+        scene_content, choices_future, bundle_title = self._write_scene_with_choices(
+            scene_prompt,
+            story_context=f"Initial prompt: {user_prompt}",
+            is_first_scene=True,
+            on_progress=on_progress,
+            on_stream=on_stream
+        )
+        
+        # Generate image based on mode while any pending choices finish
+        image = self._generate_scene_image(
+            scene_content=scene_content,
+            scene_id=1,
+            scene_title=bundle_title,
+            on_progress=on_progress
+        )
+        choices = _build_choices(choices_future.result())
+        
+        return self._build_scene(1, scene_content, choices, image)
+    
+    def _write_scene_with_choices(
+        self,
+        scene_prompt: str,
+        story_context: str,
+        is_first_scene: bool,
+        on_progress: Optional[Callable[[str], None]] = None,
+        on_stream: Optional[TextStreamCallback] = None
+    ) -> Tuple[str, "Future[ChoicePair]", Optional[str]]:
+        """
+        Write a scene together with its two choices and a title.
+        
+        Tries a single structured Gemini call first and falls back to the
+        separate scene and choice calls if that response is unusable. The
+        fallback choices request is started in the background so the caller
+        can generate the scene image while it runs.
+        
+        Args:
+            scene_prompt: Initial or continuation scene prompt
+            story_context: Story context for the fallback choices prompt
+            is_first_scene: Whether this is the opening scene
+            on_progress: Optional callback receiving a label for each generation step
+            on_stream: Optional callback that renders the fallback scene as it streams
+            
+        Returns:
+            Tuple of (cleaned scene text, Future of the choice texts, title or None)
+        """
+        try:
+            bundle = self.gemini_service.generate_scene_bundle(
+                PromptTemplates.get_scene_bundle_prompt(scene_prompt)
+            )
+            scene_content = PromptFormatter.clean_scene_text(bundle['scene'])
+            return scene_content, _completed(bundle['choices']), bundle['title']
+        except Exception as e:
+            print(f"⚠ Single-call scene generation failed, using separate calls: {e}")
         
-        # Clean the scene content
-        scene_content = PromptFormatter.clean_scene_text(scene_content)
+        scene_content = self._write_scene(scene_prompt, is_first_scene, on_stream)
         
-        # Generate choices for the scene
-        choices_prompt = self.prompt_templates.get_choices_prompt(
+        _report_progress(on_progress, "🔀 Coming up with your choices...")
+        choices_prompt = PromptTemplates.get_choices_prompt(
             scene_content=scene_content,
-            story_context=f"Initial prompt: {user_prompt}"
+            story_context=story_context
         )
-        choice1_text, choice2_text = self.gemini_service.generate_choices(choices_prompt)
-        
-        # Create choice objects
-        choices = [
-            Choice(id=1, text=choice1_text),
-            Choice(id=2, text=choice2_text)
-        ]
-        
-        # Generate image based on mode
-        image_path = None
-        image_prompt = None
-        panel_breakdown = None
-        scene_title = None
-        
-        if self.generate_images:
-            if self.page_mode:
-                # PAGE MODE: Generate multi-panel comic page
-                image_path, image_prompt, panel_breakdown, scene_title = self._generate_comic_page(
-                    scene_content=scene_content,
-                    scene_id=1
-                )
-            else:
-                # PANEL MODE: Generate single comic panel
-                image_path, image_prompt = self.image_service.generate_comic_panel(
-                    scene_description=scene_content,
-                    scene_id=1,
-                    style=self.art_style
-                )
+        choices_future = _choices_executor.submit(self.gemini_service.generate_choices, choices_prompt)
+        return scene_content, choices_future, None
+    
+    def _write_scene(
+        self,
+        scene_prompt: str,
+        is_first_scene: bool,
+        on_stream: Optional[TextStreamCallback] = None
+    ) -> str:
+        """
+        Write a plain-prose scene, streaming it to the caller when possible.
+        
+        Args:
+            scene_prompt: Scene prompt to send to Gemini
+            is_first_scene: Whether this is the opening scene
+            on_stream: Optional callback that renders text chunks as they arrive
+                       and returns the full text (e.g. st.write_stream)
+            
+        Returns:
+            str: Cleaned scene text
+        """
+        if on_stream:
+            scene_content = on_stream(self.gemini_service.generate_text_stream(scene_prompt)).strip()
+            if len(scene_content) < 50:
+                raise ValueError(f"Generated scene too short: {len(scene_content)} characters")
+        else:
+            scene_content = self.gemini_service.generate_scene(scene_prompt, is_first_scene=is_first_scene)
+        return PromptFormatter.clean_scene_text(scene_content)
+    
+    def _image_progress_label(self) -> str:
+        """Get the progress label for the image generation step."""
+        if self.page_mode:
+            return "📖 Drawing your comic page..."
+        return "🎨 Drawing your comic panel..."
+    
+    def _generate_scene_image(
+        self,
+        scene_content: str,
+        scene_id: int,
+        scene_title: Optional[str] = None,
+        on_progress: Optional[Callable[[str], None]] = None
+    ) -> SceneImage:
+        """
+        Generate the scene's comic panel or page, depending on the mode.
         
-        # Create and return scene
-        scene = Scene(
-            id=1,
+        Args:
+            scene_content: The scene narrative
+            scene_id: Scene identifier
+            scene_title: Title already generated with the scene, if any
+            on_progress: Optional callback receiving a label for each generation step
+            
+        Returns:
+            Tuple of (image_path, image_prompt, panel_breakdown, scene_title);
+            all None when image generation is disabled
+        """
+        if not self.generate_images:
+            return None, None, None, None
+        
+        _report_progress(on_progress, self._image_progress_label())
+        if self.page_mode:
+            # PAGE MODE: Generate multi-panel comic page
+            return self._generate_comic_page(
+                scene_content=scene_content,
+                scene_id=scene_id,
+                scene_title=scene_title
+            )
+        
+        # PANEL MODE: Generate single comic panel
+        image_path, image_prompt = self.image_service.generate_comic_panel(
+            scene_description=scene_content,
+            scene_id=scene_id,
+            style=self.art_style
+        )
+        return image_path, image_prompt, None, None
+    
+    def _build_scene(
+        self,
+        scene_id: int,
+        scene_content: str,
+        choices: List[Choice],
+        image: SceneImage,
+        default_title: Optional[str] = None
+    ) -> Scene:
+        """
+        Assemble a Scene from its text, choices and generated artwork.
+        
+        Args:
+            scene_id: Scene identifier
+            scene_content: Cleaned scene text
+            choices: The scene's choices (empty for an ending)
+            image: Result of _generate_scene_image
+            default_title: Title to use if none was generated
+            
+        Returns:
+            Scene: The assembled scene
+        """
+        image_path, image_prompt, panel_breakdown, scene_title = image
+        return Scene(
+            id=scene_id,
             content=scene_content,
             choices=choices,
             image_path=image_path,
             image_prompt=image_prompt,
             panel_breakdown=panel_breakdown,
-            scene_title=scene_title,
+            scene_title=scene_title or default_title,
             is_page_mode=self.page_mode
         )
-        
-        return scene
     
     def _generate_comic_page(
         self, 
         scene_content: str, 
-        scene_id: int
-    ) -> Tuple[Optional[str], Optional[str], Optional[list], Optional[str]]:
+        scene_id: int,
+        scene_title: Optional[str] = None
+    ) -> SceneImage:
         """
         Generate a full comic page with multiple panels (Page Mode).
         
         Args:
             scene_content: The scene narrative
             scene_id: Scene identifier
+            scene_title: Title already generated with the scene, if any
             
         Returns:
             Tuple of (image_path, image_prompt, panel_breakdown, scene_title)
         """
         try:
-            # 1. Generate scene title
-            scene_title = self.gemini_service.generate_scene_title(scene_content)
+            # 1-2. Generate panel breakdown, plus the scene title in parallel
+            #      unless it came with the scene
+            if scene_title:
+                panel_breakdown = self.gemini_service.generate_panel_breakdown(
+                    scene_content=scene_content,
+                    num_panels=self.num_panels
+                )
+            else:
+                scene_title, panel_breakdown = self.gemini_service.generate_title_and_panels(
+                    scene_content=scene_content,
+                    num_panels=self.num_panels
+                )
             print(f"📖 Scene title: {scene_title}")
-            
-            # 2. Generate panel breakdown
-            panel_breakdown = self.gemini_service.generate_panel_breakdown(
-                scene_content=scene_content,
-                num_panels=self.num_panels
-            )
             print(f"🎬 Generated {len(panel_breakdown)} panels")
             
             # 3. Generate the comic page image
@@ -192,13 +399,21 @@ class StoryService:
                 print(f"⚠ Simple page mode also failed: {e2}")
                 return None, None, None, None
     
-    def continue_story(self, story: Story, selected_choice_id: int) -> Scene:
+    def continue_story(
+        self,
+        story: Story,
+        selected_choice_id: int,
+        on_progress: Optional[Callable[[str], None]] = None,
+        on_stream: Optional[TextStreamCallback] = None
+    ) -> Scene:
         """
         Continue the story based on user's choice.
         
         Args:
             story: Current story instance
             selected_choice_id: ID of the choice user selected
+            on_progress: Optional callback receiving a label for each generation step
+            on_stream: Optional callback that renders scene text as it streams
             
         Returns:
             Scene: Next scene in the story
@@ -220,122 +435,204 @@ class StoryService:
         if not selected_choice:
             raise ValueError("Could not retrieve selected choice")
         
-        # Generate next scene
-        next_scene = self._generate_next_scene(story, selected_choice.text)
+        # Use the scene text prefetched for this choice, or write it now
+        draft = None
+        prefetched = self._take_prefetched(story, current_scene.id, selected_choice_id)
+        if prefetched is not None and prefetched.cancel():
+            # Still queued behind other prefetches: waiting for it would only
+            # add queue time, so drop it and write the scene here
+            prefetched = None
+        if prefetched is not None:
+            _report_progress(on_progress, "⏩ Picking up the scene prepared for this choice...")
+            try:
+                draft = prefetched.result()
+            except Exception as e:
+                print(f"⚠ Prefetched scene failed, generating it now: {e}")
+        
+        if draft is None:
+            draft = self._write_next_scene(
+                self._get_context(story),
+                story.get_scene_count(),
+                selected_choice.text,
+                on_progress,
+                on_stream
+            )
+        next_scene = self._finish_scene(draft, on_progress)
         story.add_scene(next_scene)
+        self._prefetch_next_scenes(story, next_scene)
         
         return next_scene
     
-    def _generate_next_scene(self, story: Story, selected_choice_text: str) -> Scene:
+    def _prefetch_next_scenes(self, story: Story, scene: Scene) -> None:
+        """
+        Start writing the scene behind each of a scene's choices in the background.
+        
+        Only the text is prefetched; the artwork for the chosen branch is
+        generated when it is claimed, so the unused branch costs no image.
+        Each job gets its branch's context string, built here as if the
+        choice had been made, rather than the live Story: that keeps the
+        prompt identical to the one continue_story would build and keeps
+        the workers off the story the session keeps changing.
+        
+        Args:
+            story: Story the scene was just added to
+            scene: Scene whose choices to prefetch
+        """
+        if not self.enable_speculative or not scene.choices:
+            return
+        
+        scene_count = story.get_scene_count()
+        branches = [(choice, self._get_branch_context(story, choice.id)) for choice in scene.choices]
+        
+        with self._prefetch_lock:
+            for choice, story_context in branches:
+                future = _prefetch_executor.submit(self._write_next_scene, story_context, scene_count, choice.text)
+                self._prefetch[(id(story), scene.id, choice.id)] = (story, future)
+            
+            # Drop the oldest entries, e.g. from stories that were abandoned
+            while len(self._prefetch) > _MAX_PREFETCHED:
+                _, stale = self._prefetch.pop(next(iter(self._prefetch)))
+                stale.cancel()
+    
+    def _take_prefetched(
+        self,
+        story: Story,
+        scene_id: int,
+        choice_id: int
+    ) -> Optional["Future[SceneDraft]"]:
+        """
+        Claim the prefetched next scene draft for a choice and discard the others.
+        
+        Args:
+            story: Current story instance
+            scene_id: ID of the scene the choice was made in
+            choice_id: ID of the selected choice
+            
+        Returns:
+            Optional[Future[SceneDraft]]: The pending or finished draft, or None if
+            nothing was prefetched for this choice
+        """
+        claimed = None
+        with self._prefetch_lock:
+            for key in [key for key in self._prefetch if key[0] == id(story)]:
+                owner, future = self._prefetch.pop(key)
+                if owner is story and key[1:] == (scene_id, choice_id):
+                    claimed = future
+                else:
+                    # Only stops jobs that have not started; running ones finish unused
+                    future.cancel()
+        return claimed
+    
+    @staticmethod
+    def _get_context(story: Story) -> str:
+        """Get the story context sent with next-scene prompts."""
+        return story.get_story_context(
+            max_scenes=settings.context_scenes,
+            max_chars=settings.context_max_chars
+        )
+    
+    @classmethod
+    def _get_branch_context(cls, story: Story, choice_id: int) -> str:
         """
-        Generate the next scene based on story context and choice.
+        Get the story context as it will be once a choice in the current scene is made.
+        
+        Works on shallow copies, so the story itself is left unchanged.
         
         Args:
             story: Current story instance
+            choice_id: ID of the choice in the current scene
+            
+        Returns:
+            str: Formatted story context for that branch
+        """
+        index = story.current_scene_index
+        chosen = story.scenes[index].model_copy(update={'selected_choice_id': choice_id})
+        branch = story.model_copy(update={'scenes': [*story.scenes[:index], chosen, *story.scenes[index + 1:]]})
+        return cls._get_context(branch)
+    
+    def _write_next_scene(
+        self,
+        story_context: str,
+        scene_count: int,
+        selected_choice_text: str,
+        on_progress: Optional[Callable[[str], None]] = None,
+        on_stream: Optional[TextStreamCallback] = None
+    ) -> SceneDraft:
+        """
+        Write the text of the next scene based on story context and choice.
+        
+        Takes the context and scene count rather than the Story, so it can
+        run on a prefetch thread without touching the session's story.
+        
+        Args:
+            story_context: Story context including the selected choice
+            scene_count: Number of scenes in the story so far
             selected_choice_text: Text of the selected choice
+            on_progress: Optional callback receiving a label for each generation step
+            on_stream: Optional callback that renders scene text as it streams
             
         Returns:
-            Scene: Generated next scene with choices and comic panel/page
+            SceneDraft: The written scene, ready for _finish_scene
         """
-        # Get story context
-        story_context = story.get_story_context(max_scenes=settings.context_scenes)
-        scene_id = story.get_scene_count() + 1
+        scene_id = scene_count + 1
         
         # Check if this should be a final scene
-        is_ending = story.get_scene_count() >= settings.max_story_length - 1
+        is_ending = scene_count >= settings.max_story_length - 1
         
         if is_ending:
             # Generate ending scene
-            scene_prompt = self.prompt_templates.get_story_ending_prompt(
+            _report_progress(on_progress, "🎬 Writing the grand finale...")
+            scene_prompt = PromptTemplates.get_story_ending_prompt(
                 story_context=story_context,
                 selected_choice=selected_choice_text
             )
-            scene_content = self.gemini_service.generate_scene(scene_prompt, is_first_scene=False)
-            scene_content = PromptFormatter.clean_scene_text(scene_content)
-            
-            # Generate image based on mode
-            image_path = None
-            image_prompt = None
-            panel_breakdown = None
-            scene_title = None
-            
-            if self.generate_images:
-                if self.page_mode:
-                    image_path, image_prompt, panel_breakdown, scene_title = self._generate_comic_page(
-                        scene_content=scene_content,
-                        scene_id=scene_id
-                    )
-                else:
-                    image_path, image_prompt = self.image_service.generate_comic_panel(
-                        scene_description=scene_content,
-                        scene_id=scene_id,
-                        style=self.art_style
-                    )
+            scene_content = self._write_scene(scene_prompt, is_first_scene=False, on_stream=on_stream)
             
             # No choices for ending scene
-            scene = Scene(
-                id=scene_id,
-                content=scene_content,
-                choices=[],
-                image_path=image_path,
-                image_prompt=image_prompt,
-                panel_breakdown=panel_breakdown,
-                scene_title=scene_title or "The End",
-                is_page_mode=self.page_mode
-            )
+            return scene_id, scene_content, None, None, "The End"
         else:
             # Generate continuation scene
-            scene_prompt = self.prompt_templates.get_continuation_prompt(
+            _report_progress(on_progress, "✍️ Writing the next scene...")
+            scene_prompt = PromptTemplates.get_continuation_prompt(
                 story_context=story_context,
                 selected_choice=selected_choice_text
             )
-            scene_content = self.gemini_service.generate_scene(scene_prompt, is_first_scene=False)
-            scene_content = PromptFormatter.clean_scene_text(scene_content)
-            
-            # Generate choices
-            choices_prompt = self.prompt_templates.get_choices_prompt(
-                scene_content=scene_content,
-                story_context=story_context
+            scene_content, choices_future, bundle_title = self._write_scene_with_choices(
+                scene_prompt,
+                story_context=story_context,
+                is_first_scene=False,
+                on_progress=on_progress,
+                on_stream=on_stream
             )
-            choice1_text, choice2_text = self.gemini_service.generate_choices(choices_prompt)
-            
-            # Create choice objects
-            choices = [
-                Choice(id=1, text=choice1_text),
-                Choice(id=2, text=choice2_text)
-            ]
-            
-            # Generate image based on mode
-            image_path = None
-            image_prompt = None
-            panel_breakdown = None
-            scene_title = None
-            
-            if self.generate_images:
-                if self.page_mode:
-                    image_path, image_prompt, panel_breakdown, scene_title = self._generate_comic_page(
-                        scene_content=scene_content,
-                        scene_id=scene_id
-                    )
-                else:
-                    image_path, image_prompt = self.image_service.generate_comic_panel(
-                        scene_description=scene_content,
-                        scene_id=scene_id,
-                        style=self.art_style
-                    )
+            return scene_id, scene_content, choices_future, bundle_title, None
+    
+    def _finish_scene(
+        self,
+        draft: SceneDraft,
+        on_progress: Optional[Callable[[str], None]] = None
+    ) -> Scene:
+        """
+        Generate the artwork for a written scene and assemble it.
+        
+        Args:
+            draft: Result of _write_next_scene
+            on_progress: Optional callback receiving a label for each generation step
             
-            scene = Scene(
-                id=scene_id,
-                content=scene_content,
-                choices=choices,
-                image_path=image_path,
-                image_prompt=image_prompt,
-                panel_breakdown=panel_breakdown,
-                scene_title=scene_title,
-                is_page_mode=self.page_mode
-            )
+        Returns:
+            Scene: Generated next scene with choices and comic panel/page
+        """
+        scene_id, scene_content, choices_future, bundle_title, default_title = draft
+        
+        # Generate image based on mode while any pending choices finish
+        image = self._generate_scene_image(
+            scene_content=scene_content,
+            scene_id=scene_id,
+            scene_title=bundle_title,
+            on_progress=on_progress
+        )
+        choices = _build_choices(choices_future.result()) if choices_future else []
         
-        return scene
+        return self._build_scene(scene_id, scene_content, choices, image, default_title=default_title)
     
     def validate_story_state(self, story: Story) -> Tuple[bool, str]:
         """
@@ -373,19 +670,22 @@ class StoryService:
             dict: Story summary information
         """
         current_scene = story.get_current_scene()
+        scene_count = story.get_scene_count()
         
         return {
-            'total_scenes': story.get_scene_count(),
+            'total_scenes': scene_count,
             'current_scene_id': current_scene.id if current_scene else None,
-            'has_choices': len(current_scene.choices) > 0 if current_scene else False,
-            'can_continue': story.can_continue(),
-            'is_ending': story.get_scene_count() >= settings.max_story_length,
+            'has_choices': bool(current_scene and current_scene.choices),
+            # Same as story.can_continue(), reusing the scene looked up above
+            'can_continue': current_scene is not None and current_scene.selected_choice_id is not None,
+            'is_ending': scene_count >= settings.max_story_length,
             'story_path': story.get_story_path()
         }
 
 
 # Global service instance
 _story_service: Optional[StoryService] = None
+_story_service_lock = threading.Lock()
 
 
 def get_story_service() -> StoryService:
@@ -398,6 +698,9 @@ def get_story_service() -> StoryService:
     global _story_service
     
     if _story_service is None:
-        _story_service = StoryService()
+        # Checked again under the lock so concurrent first calls build one instance
+        with _story_service_lock:
+            if _story_service is None:
+                _story_service = StoryService()
     
     return _story_service
@@ -1,13 +1,15 @@
 """Utils package initialization."""
 
 from .prompt_templates import PromptTemplates, PromptFormatter
-from .session_manager import SessionManager
+from .session_manager import SessionManager, AppState
 from .image_prompts import ComicPromptTemplates
 from .comic_exporter import export_story_pdf, get_pdf_download_name
+from .llm_cache import LLMCache, create_llm_cache
 
 __all__ = [
     'PromptTemplates', 'PromptFormatter',
-    'SessionManager',
+    'SessionManager', 'AppState',
     'ComicPromptTemplates',
-    'export_story_pdf', 'get_pdf_download_name'
+    'export_story_pdf', 'get_pdf_download_name',
+    'LLMCache', 'create_llm_cache'
 ]
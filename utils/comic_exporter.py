@@ -5,17 +5,18 @@ Exports the comic story as a downloadable PDF file.
 """
 
 import io
+import os
 import re
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional, List, BinaryIO
 from pathlib import Path
 from datetime import datetime
 
-try:
+# fpdf2 is imported on first export (see write_story_to_pdf): it takes a
+# few hundred ms to load and most sessions never export a PDF
+if TYPE_CHECKING:
     from fpdf import FPDF
-    FPDF_AVAILABLE = True
-except ImportError:
-    FPDF_AVAILABLE = False
-    print("⚠ fpdf2 not installed. PDF export will be limited.")
 
 try:
     from PIL import Image
@@ -25,57 +26,78 @@ except ImportError:
     print("⚠ Pillow not installed. Image processing will be limited.")
 
 from models.story import Story
-from models.comic import ComicBook, create_comic_from_story
 
 
+# Unicode characters Helvetica can't draw, mapped to ASCII equivalents.
+# str.translate accepts multi-character replacements, so one pass applies
+# them all.
+_PDF_TRANSLATION = str.maketrans({
+    '\u2026': '...',   # Ellipsis
+    '\u201c': '"',     # Left double quote
+    '\u201d': '"',     # Right double quote
+    '\u2018': "'",     # Left single quote
+    '\u2019': "'",     # Right single quote / apostrophe
+    '\u2013': '-',     # En dash
+    '\u2014': '-',     # Em dash
+    '\u2022': '*',     # Bullet
+    '\u2192': '->',
+    '\u2190': '<-',
+    '\u00a9': '(c)',
+    '\u00ae': '(R)',
+    '\u2122': '(TM)',
+    '\u00b0': ' degrees',
+    '\u00d7': 'x',
+    '\u00f7': '/',
+    '\u2248': '~',
+    '\u2260': '!=',
+    '\u2264': '<=',
+    '\u2265': '>=',
+    '\u00b1': '+/-',
+    '\u20ac': 'EUR',
+    '\u00a3': 'GBP',
+    '\u00a5': 'JPY',
+    '\u20b9': 'INR',
+    '\u200b': '',      # Zero-width space
+    '\u00a0': ' ',     # Non-breaking space
+})
+
+# Characters dropped from the story prompt when building download filenames
+_FILENAME_UNSAFE_RE = re.compile(r'[^A-Za-z0-9 ]+')
+
+# Resolution panel images are embedded at; anything finer is invisible in print
+_PANEL_DPI = 150
+
+# Shared pool for decoding panel images; Pillow releases the GIL while
+# decoding and resampling, so loads run in parallel
+_image_executor = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1),
+    thread_name_prefix="pdf-images"
+)
+
+
+@lru_cache(maxsize=4096)
 def sanitize_text_for_pdf(text: str) -> str:
     """
     Sanitize text to remove/replace Unicode characters not supported by Helvetica.
     
+    Memoized: re-exporting a story sanitizes the same scene texts, choices
+    and titles again.
+    
     Args:
         text: The text to sanitize
         
     Returns:
         str: Sanitized text safe for PDF
     """
-    # Replace common Unicode characters with ASCII equivalents
-    replacements = {
-        '…': '...',
-        '"': '"',
-        '"': '"',
-        ''': "'",
-        ''': "'",
-        '–': '-',
-        '—': '-',
-        '•': '*',
-        '→': '->',
-        '←': '<-',
-        '©': '(c)',
-        '®': '(R)',
-        '™': '(TM)',
-        '°': ' degrees',
-        '×': 'x',
-        '÷': '/',
-        '≈': '~',
-        '≠': '!=',
-        '≤': '<=',
-        '≥': '>=',
-        '±': '+/-',
-        '€': 'EUR',
-        '£': 'GBP',
-        '¥': 'JPY',
-        '₹': 'INR',
-        '\u200b': '',  # Zero-width space
-        '\u00a0': ' ',  # Non-breaking space
-    }
+    # Most generated text is plain ASCII already; isascii() is a fast C scan
+    if text.isascii():
+        return text
     
-    for unicode_char, ascii_char in replacements.items():
-        text = text.replace(unicode_char, ascii_char)
+    # Replace common Unicode characters with ASCII equivalents
+    text = text.translate(_PDF_TRANSLATION)
     
     # Remove any remaining non-ASCII characters
-    text = text.encode('ascii', 'ignore').decode('ascii')
-    
-    return text
+    return text.encode('ascii', 'ignore').decode('ascii')
 
 
 class ComicPDFExporter:
@@ -86,6 +108,8 @@ class ComicPDFExporter:
         self.page_width = 210  # A4 width in mm
         self.page_height = 297  # A4 height in mm
         self.margin = 10  # Page margin in mm
+        self.panel_width = self.page_width - (2 * self.margin)
+        self.panel_height = 160  # Scene panel height in mm
     
     def export_story_to_pdf(
         self, 
@@ -102,9 +126,33 @@ class ComicPDFExporter:
         Returns:
             bytes: PDF file content or None if export fails
         """
-        if not FPDF_AVAILABLE:
-            print("⚠ Cannot export PDF: fpdf2 not installed")
+        buffer = io.BytesIO()
+        if not self.write_story_to_pdf(story, buffer, title):
             return None
+        return buffer.getvalue()
+    
+    def write_story_to_pdf(
+        self,
+        story: Story,
+        target: BinaryIO,
+        title: Optional[str] = None
+    ) -> bool:
+        """
+        Render a story as PDF directly into a writable binary stream.
+        
+        Args:
+            story: The story to export
+            target: Binary stream (BytesIO, open file) to write the PDF to
+            title: Optional custom title
+            
+        Returns:
+            bool: True if the PDF was written, False if export fails
+        """
+        try:
+            from fpdf import FPDF
+        except ImportError:
+            print("⚠ Cannot export PDF: fpdf2 not installed")
+            return False
         
         try:
             # Create PDF
@@ -115,23 +163,28 @@ class ComicPDFExporter:
             comic_title = title or f"Comic: {story.initial_prompt[:40]}..."
             
             # Add cover page
-            self._add_cover_page(pdf, comic_title, story)
+            created = datetime.now().strftime('%B %d, %Y')
+            self._add_cover_page(pdf, comic_title, story, created)
             
-            # Add each scene as a page
+            # Decode all panel images up front, then lay the pages out in order
+            images = self._load_panel_images(story.scenes)
             for i, scene in enumerate(story.scenes):
-                self._add_comic_page(pdf, scene, i + 1, len(story.scenes))
+                self._add_comic_page(
+                    pdf, scene, i + 1, len(story.scenes), images.get(scene.image_path)
+                )
             
             # Add ending page
             self._add_end_page(pdf)
             
-            # Output to bytes (convert bytearray to bytes for Streamlit compatibility)
-            return bytes(pdf.output())
+            # Write straight into the target stream
+            pdf.output(target)
+            return True
             
         except Exception as e:
             print(f"⚠ PDF export failed: {e}")
-            return None
+            return False
     
-    def _add_cover_page(self, pdf: FPDF, title: str, story: Story) -> None:
+    def _add_cover_page(self, pdf: "FPDF", title: str, story: Story, created: str) -> None:
         """Add cover page to PDF."""
         pdf.add_page()
         
@@ -158,7 +211,7 @@ class ComicPDFExporter:
         pdf.set_font('Helvetica', '', 12)
         pdf.set_text_color(150, 150, 150)
         pdf.cell(0, 8, f"Scenes: {story.get_scene_count()}", align='C', ln=True)
-        pdf.cell(0, 8, f"Created: {datetime.now().strftime('%B %d, %Y')}", align='C', ln=True)
+        pdf.cell(0, 8, f"Created: {created}", align='C', ln=True)
         
         # Initial prompt
         pdf.set_y(220)
@@ -169,18 +222,16 @@ class ComicPDFExporter:
     
     def _add_comic_page(
         self, 
-        pdf: FPDF, 
+        pdf: "FPDF", 
         scene, 
         page_num: int, 
-        total_pages: int
+        total_pages: int,
+        image: Any = None
     ) -> None:
-        """Add a comic page with panel and text."""
+        """Add a comic page with panel and text, using the preloaded image if given."""
+        # Pages are white by default; no background fill needed
         pdf.add_page()
         
-        # White background
-        pdf.set_fill_color(255, 255, 255)
-        pdf.rect(0, 0, self.page_width, self.page_height, 'F')
-        
         # Page number header
         pdf.set_font('Helvetica', '', 10)
         pdf.set_text_color(100, 100, 100)
@@ -190,14 +241,14 @@ class ComicPDFExporter:
         # Panel border
         panel_x = self.margin
         panel_y = 15
-        panel_width = self.page_width - (2 * self.margin)
-        panel_height = 160
+        panel_width = self.panel_width
+        panel_height = self.panel_height
         
         # Add image if available
-        if scene.image_path and Path(scene.image_path).exists():
+        if image is not None:
             try:
                 pdf.image(
-                    scene.image_path,
+                    image,
                     x=panel_x,
                     y=panel_y,
                     w=panel_width,
@@ -237,9 +288,64 @@ class ComicPDFExporter:
                 choice_text = sanitize_text_for_pdf(f"Choice: {choice.text}")
                 pdf.cell(0, 5, choice_text, align='C')
     
+    def _load_panel_images(self, scenes: list) -> Dict[str, Any]:
+        """
+        Load every scene's panel image concurrently.
+        
+        Args:
+            scenes: Scenes being exported
+            
+        Returns:
+            Dict[str, Any]: Image path to loaded image (or path) for each
+            image that exists and could be read
+        """
+        paths = list(dict.fromkeys(
+            scene.image_path for scene in scenes
+            if scene.image_path and Path(scene.image_path).exists()
+        ))
+        if not paths:
+            return {}
+        
+        def load(path: str) -> Any:
+            try:
+                return self._load_panel_image(path, self.panel_width, self.panel_height)
+            except Exception as e:
+                print(f"⚠ Could not load panel image {path}: {e}")
+                return None
+        
+        images = _image_executor.map(load, paths) if len(paths) > 1 else map(load, paths)
+        return {path: image for path, image in zip(paths, images) if image is not None}
+    
+    def _load_panel_image(self, image_path: str, width_mm: float, height_mm: float):
+        """
+        Load a panel image downscaled to what the panel needs at _PANEL_DPI.
+        
+        fpdf2 embeds images at full resolution; a 1024px+ render shown in a
+        190mm panel would otherwise carry far more pixels than it displays.
+        
+        Args:
+            image_path: Path to the stored scene image
+            width_mm: Panel width in mm
+            height_mm: Panel height in mm
+            
+        Returns:
+            The resized PIL image, or the path itself if it is already small
+            enough or Pillow is unavailable
+        """
+        if not PIL_AVAILABLE:
+            return image_path
+        
+        target_px = (int(width_mm * _PANEL_DPI / 25.4), int(height_mm * _PANEL_DPI / 25.4))
+        with Image.open(image_path) as img:
+            if img.width <= target_px[0] and img.height <= target_px[1]:
+                return image_path
+            img = img.convert('RGB')
+        img.thumbnail(target_px, Image.Resampling.LANCZOS)
+        return img
+    
     def _draw_placeholder_panel(
         self, 
-        pdf: FPDF, 
+        pdf: "FPDF", 
         x: float, 
         y: float, 
         w: float, 
@@ -255,7 +361,7 @@ class ComicPDFExporter:
         pdf.set_xy(x, y + h/2 - 5)
         pdf.cell(w, 10, "[Comic Panel Image]", align='C')
     
-    def _add_end_page(self, pdf: FPDF) -> None:
+    def _add_end_page(self, pdf: "FPDF") -> None:
         """Add THE END page."""
         pdf.add_page()
         
@@ -296,10 +402,9 @@ def export_story_pdf(story: Story, title: Optional[str] = None) -> Optional[byte
     return exporter.export_story_to_pdf(story, title)
 
 
-def get_pdf_download_name(story: Story) -> str:
-    """Generate a filename for the PDF download."""
+def get_pdf_download_name(story: Story, now: Optional[datetime] = None) -> str:
+    """Generate a filename for the PDF download, timestamped with now (default: current time)."""
     # Clean the prompt for filename
-    clean_prompt = "".join(c for c in story.initial_prompt[:30] if c.isalnum() or c == ' ')
-    clean_prompt = clean_prompt.replace(' ', '_')
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+    clean_prompt = _FILENAME_UNSAFE_RE.sub('', story.initial_prompt[:30]).replace(' ', '_')
+    timestamp = (now or datetime.now()).strftime('%Y%m%d_%H%M')
     return f"comic_{clean_prompt}_{timestamp}.pdf"
@@ -10,7 +10,7 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class PanelDescription:
     """Represents a single panel in a comic page."""
     panel_number: int
@@ -21,6 +21,101 @@ class PanelDescription:
     emotion: str = "neutral"
 
 
+# Closing requirements for build_comic_page_prompt (format with num_panels)
+_PAGE_REQUIREMENTS_TEMPLATE = """
+CRITICAL REQUIREMENTS:
+- SAME character designs across ALL {num_panels} panels (consistent face, hair, clothing, colors)
+- Clear visual storytelling flow from panel 1 to panel {num_panels}
+- Each panel is a distinct scene moment, not repeated
+- Dynamic varied compositions (different angles, distances, poses)
+- Professional comic book illustration quality
+- Visible panel borders separating each panel
+- Characters are expressive with clear emotions
+
+RESTRICTIONS:
+- NO random floating objects
+- NO distorted anatomy unless stylized
+- NO unclear action or confusing composition
+"""
+
+# Per-panel section of build_from_scene_and_panels, plus the optional dialogue line
+_SCENE_PANEL_TEMPLATE = """
+=== PANEL {number} ===
+VISUAL SCENE: {visual}
+CHARACTER ACTION: {action}
+CAMERA ANGLE: {camera}
+EMOTIONAL TONE: {emotion}
+"""
+
+_SCENE_PANEL_DIALOGUE_TEMPLATE = 'SPEECH BUBBLE TEXT: "{dialogue}"\n'
+
+# Closing requirements for build_from_scene_and_panels (format with panel_count)
+_SCENE_PAGE_REQUIREMENTS_TEMPLATE = """
+CRITICAL CONSISTENCY REQUIREMENTS:
+1. IDENTICAL character designs in every panel (same face shape, hair color/style, outfit, body type)
+2. Consistent environment/setting details throughout the page
+3. Logical visual progression from panel 1 → panel {panel_count}
+4. Each panel shows a DIFFERENT moment in the sequence (no duplicates)
+5. Professional comic illustration quality with polished finish
+
+COMPOSITION GUIDELINES:
+- Vary camera distances (close-up, medium, wide) across panels for visual interest
+- Use dynamic angles when action intensifies
+- Ensure character expressions match the emotional tone
+- Background details support the narrative
+
+STRICT RESTRICTIONS:
+- NO distorted or inconsistent anatomy
+- NO random floating objects or elements
+- NO unclear actions or confusing staging
+- NO missing panel borders
+- ALL panels must be clearly separated and distinct"""
+
+# Closing requirements for build_cover_prompt (format with story_title)
+_COVER_REQUIREMENTS_TEMPLATE = """
+COVER COMPOSITION REQUIREMENTS:
+- TITLE "{story_title}" prominently displayed at the TOP in bold stylized comic font
+- Main character(s) in a DYNAMIC, eye-catching hero pose as the focal point
+- Dramatic lighting with strong contrast (rim lighting, spotlights, or atmospheric glow)
+- Background hints at the story's setting or theme
+- Professional comic book cover quality with polished, print-ready finish
+- 3:4 portrait aspect ratio (standard comic book cover proportions)
+
+VISUAL IMPACT GOALS:
+- The cover should IMMEDIATELY grab attention
+- Convey the genre and tone of the story at a glance
+- Make viewers curious and eager to read the comic
+- Character pose should be powerful, dramatic, or intriguing
+- Colors should pop and create strong visual hierarchy
+
+TITLE STYLING:
+- Large, bold, readable from a distance
+- Style matches the genre (action = angular/bold, fantasy = ornate, horror = dripping/scratchy)
+- Positioned at top with room for character art below
+- May include subtle effects (shadows, outlines, gradients)
+
+RESTRICTIONS:
+- NO distorted anatomy or unclear character designs
+- NO cluttered or confusing compositions
+- NO watermarks, signatures, or modern UI elements
+- Title must be clearly readable and properly integrated"""
+
+# Static tail of build_simple_prompt
+_SIMPLE_PAGE_CHECKLIST = """
+CHARACTER CONSISTENCY CHECKLIST:
+✓ Face shape and features remain identical
+✓ Hair color, style, and length consistent
+✓ Outfit/clothing unchanged unless story dictates
+✓ Body proportions and height relationships maintained
+✓ Any unique features (scars, accessories) present in all panels
+
+RESTRICTIONS:
+- NO distorted anatomy or inconsistent character designs
+- NO confusing compositions or unclear actions
+- NO missing or broken panel borders
+- ALL panels must be visually distinct and properly separated"""
+
+
 class ComicPagePromptBuilder:
     """
     Builds structured prompts for generating full comic pages with multiple panels.
@@ -81,6 +176,22 @@ class ComicPagePromptBuilder:
             art_style: Default art style for comic pages
         """
         self.art_style = art_style
+        # Resolved once; every build call without a style override uses it
+        self._default_style_desc = self.ART_STYLES.get(art_style) or self.ART_STYLES["western_comic"]
+    
+    def _get_style_desc(self, art_style: Optional[str]) -> str:
+        """
+        Get the style description for an override, or the builder's default.
+        
+        Args:
+            art_style: Art style override, or None for the default
+            
+        Returns:
+            str: Style description (western_comic for unknown styles)
+        """
+        if not art_style:
+            return self._default_style_desc
+        return self.ART_STYLES.get(art_style) or self.ART_STYLES["western_comic"]
     
     def build_comic_page_prompt(
         self,
@@ -105,13 +216,12 @@ class ComicPagePromptBuilder:
         Returns:
             str: Complete structured prompt for image generation
         """
-        style = art_style or self.art_style
-        style_desc = self.ART_STYLES.get(style, self.ART_STYLES["western_comic"])
-        layout_desc = self.LAYOUT_TEMPLATES.get(layout, self.LAYOUT_TEMPLATES["4_panels"])
+        style_desc = self._get_style_desc(art_style)
+        layout_desc = self.LAYOUT_TEMPLATES.get(layout) or self.LAYOUT_TEMPLATES["4_panels"]
         
         num_panels = len(panels)
         
-        prompt = f"""GENERATE A PROFESSIONAL MULTI-PANEL COMIC BOOK PAGE
+        parts = [f"""GENERATE A PROFESSIONAL MULTI-PANEL COMIC BOOK PAGE
 
 PAGE TITLE: "{title}"
 
@@ -125,39 +235,25 @@ ART STYLE (apply consistently to ALL panels):
 {style_desc}
 
 PANEL-BY-PANEL BREAKDOWN:
-"""
+"""]
         # Add each panel with detailed description
         for panel in panels:
-            prompt += f"""
+            parts.append(f"""
 [PANEL {panel.panel_number}]
 - Visual: {panel.visual_description}
 - Action: {panel.character_action}
 - Camera: {panel.camera_angle}
 - Mood: {panel.emotion}
-"""
+""")
             if panel.dialogue:
-                prompt += f"- Speech bubble: \"{panel.dialogue}\"\n"
+                parts.append(f"- Speech bubble: \"{panel.dialogue}\"\n")
         
-        prompt += f"""
-CRITICAL REQUIREMENTS:
-- SAME character designs across ALL {num_panels} panels (consistent face, hair, clothing, colors)
-- Clear visual storytelling flow from panel 1 to panel {num_panels}
-- Each panel is a distinct scene moment, not repeated
-- Dynamic varied compositions (different angles, distances, poses)
-- Professional comic book illustration quality
-- Visible panel borders separating each panel
-- Characters are expressive with clear emotions
-
-RESTRICTIONS:
-- NO random floating objects
-- NO distorted anatomy unless stylized
-- NO unclear action or confusing composition
-"""
+        parts.append(_PAGE_REQUIREMENTS_TEMPLATE.format(num_panels=num_panels))
         
         if additional_instructions:
-            prompt += f"\nADDITIONAL: {additional_instructions}"
+            parts.append(f"\nADDITIONAL: {additional_instructions}")
         
-        return prompt
+        return "".join(parts)
     
     def _build_panel_prompt(self, panel: PanelDescription) -> str:
         """
@@ -169,16 +265,18 @@ RESTRICTIONS:
         Returns:
             str: Panel prompt text
         """
-        prompt = f"Panel {panel.panel_number}: "
-        prompt += f"{panel.visual_description} "
-        prompt += f"The character(s) {panel.character_action}. "
-        prompt += f"Camera angle: {panel.camera_angle}. "
-        prompt += f"Mood/emotion: {panel.emotion}. "
+        parts = [
+            f"Panel {panel.panel_number}: ",
+            f"{panel.visual_description} ",
+            f"The character(s) {panel.character_action}. ",
+            f"Camera angle: {panel.camera_angle}. ",
+            f"Mood/emotion: {panel.emotion}. ",
+        ]
         
         if panel.dialogue:
-            prompt += f"Speech bubble says: \"{panel.dialogue}\". "
+            parts.append(f"Speech bubble says: \"{panel.dialogue}\". ")
         
-        return prompt
+        return "".join(parts)
     
     def build_from_scene_and_panels(
         self,
@@ -203,8 +301,7 @@ RESTRICTIONS:
         Returns:
             str: Complete comic page prompt
         """
-        style = art_style or self.art_style
-        style_desc = self.ART_STYLES.get(style, self.ART_STYLES["western_comic"])
+        style_desc = self._get_style_desc(art_style)
         
         # Convert panel breakdown to PanelDescription objects
         panels = []
@@ -230,10 +327,10 @@ RESTRICTIONS:
         else:
             layout = "5_panels"
         
-        layout_desc = self.LAYOUT_TEMPLATES.get(layout, self.LAYOUT_TEMPLATES["4_panels"])
+        layout_desc = self.LAYOUT_TEMPLATES[layout]
         
         # Build a comprehensive prompt with scene context
-        prompt = f"""GENERATE A PROFESSIONAL MULTI-PANEL COMIC BOOK PAGE
+        parts = [f"""GENERATE A PROFESSIONAL MULTI-PANEL COMIC BOOK PAGE
 
 PAGE {page_number}: "{scene_title}"
 
@@ -250,41 +347,22 @@ ART STYLE (consistent across ALL panels):
 {style_desc}
 
 SEQUENTIAL PANEL BREAKDOWN:
-"""
+"""]
         # Add each panel with detailed description
         for panel in panels:
-            prompt += f"""
-=== PANEL {panel.panel_number} ===
-VISUAL SCENE: {panel.visual_description}
-CHARACTER ACTION: {panel.character_action}
-CAMERA ANGLE: {panel.camera_angle}
-EMOTIONAL TONE: {panel.emotion}
-"""
+            parts.append(_SCENE_PANEL_TEMPLATE.format(
+                number=panel.panel_number,
+                visual=panel.visual_description,
+                action=panel.character_action,
+                camera=panel.camera_angle,
+                emotion=panel.emotion
+            ))
             if panel.dialogue:
-                prompt += f"SPEECH BUBBLE TEXT: \"{panel.dialogue}\"\n"
+                parts.append(_SCENE_PANEL_DIALOGUE_TEMPLATE.format(dialogue=panel.dialogue))
         
-        prompt += f"""
-CRITICAL CONSISTENCY REQUIREMENTS:
-1. IDENTICAL character designs in every panel (same face shape, hair color/style, outfit, body type)
-2. Consistent environment/setting details throughout the page
-3. Logical visual progression from panel 1 → panel {panel_count}
-4. Each panel shows a DIFFERENT moment in the sequence (no duplicates)
-5. Professional comic illustration quality with polished finish
-
-COMPOSITION GUIDELINES:
-- Vary camera distances (close-up, medium, wide) across panels for visual interest
-- Use dynamic angles when action intensifies
-- Ensure character expressions match the emotional tone
-- Background details support the narrative
-
-STRICT RESTRICTIONS:
-- NO distorted or inconsistent anatomy
-- NO random floating objects or elements
-- NO unclear actions or confusing staging
-- NO missing panel borders
-- ALL panels must be clearly separated and distinct"""
+        parts.append(_SCENE_PAGE_REQUIREMENTS_TEMPLATE.format(panel_count=panel_count))
         
-        return prompt
+        return "".join(parts)
     
     def build_simple_prompt(
         self,
@@ -305,9 +383,8 @@ STRICT RESTRICTIONS:
         Returns:
             str: Comic page prompt
         """
-        style = art_style or self.art_style
-        style_desc = self.ART_STYLES.get(style, self.ART_STYLES["western_comic"])
-        layout = self.LAYOUT_TEMPLATES.get(f"{num_panels}_panels", "4_panels")
+        style_desc = self._get_style_desc(art_style)
+        layout = self.LAYOUT_TEMPLATES.get(f"{num_panels}_panels") or self.LAYOUT_TEMPLATES["4_panels"]
         
         prompt = f"""GENERATE A {num_panels}-PANEL COMIC BOOK PAGE
 
@@ -336,21 +413,9 @@ CRITICAL REQUIREMENTS:
 - Each panel captures a DISTINCT moment (no repetition)
 - Dynamic varied compositions (different angles, distances)
 - Professional comic book illustration quality
-
-CHARACTER CONSISTENCY CHECKLIST:
-✓ Face shape and features remain identical
-✓ Hair color, style, and length consistent
-✓ Outfit/clothing unchanged unless story dictates
-✓ Body proportions and height relationships maintained
-✓ Any unique features (scars, accessories) present in all panels
-
-RESTRICTIONS:
-- NO distorted anatomy or inconsistent character designs
-- NO confusing compositions or unclear actions
-- NO missing or broken panel borders
-- ALL panels must be visually distinct and properly separated"""
+"""
         
-        return prompt
+        return prompt + _SIMPLE_PAGE_CHECKLIST
     
     def build_cover_prompt(
         self,
@@ -371,53 +436,26 @@ RESTRICTIONS:
         Returns:
             str: Cover page prompt
         """
-        style = art_style or self.art_style
-        style_desc = self.ART_STYLES.get(style, self.ART_STYLES["western_comic"])
+        style_desc = self._get_style_desc(art_style)
         
-        prompt = f"""GENERATE A PROFESSIONAL COMIC BOOK COVER
+        parts = [f"""GENERATE A PROFESSIONAL COMIC BOOK COVER
 
 COMIC TITLE: "{story_title}"
 GENRE/THEME: {story_theme}
 
 ART STYLE:
 {style_desc}
-"""
+"""]
         
         if main_characters:
-            prompt += f"""
+            parts.append(f"""
 FEATURED CHARACTERS:
 {main_characters}
-"""
+""")
         
-        prompt += f"""
-COVER COMPOSITION REQUIREMENTS:
-- TITLE "{story_title}" prominently displayed at the TOP in bold stylized comic font
-- Main character(s) in a DYNAMIC, eye-catching hero pose as the focal point
-- Dramatic lighting with strong contrast (rim lighting, spotlights, or atmospheric glow)
-- Background hints at the story's setting or theme
-- Professional comic book cover quality with polished, print-ready finish
-- 3:4 portrait aspect ratio (standard comic book cover proportions)
-
-VISUAL IMPACT GOALS:
-- The cover should IMMEDIATELY grab attention
-- Convey the genre and tone of the story at a glance
-- Make viewers curious and eager to read the comic
-- Character pose should be powerful, dramatic, or intriguing
-- Colors should pop and create strong visual hierarchy
-
-TITLE STYLING:
-- Large, bold, readable from a distance
-- Style matches the genre (action = angular/bold, fantasy = ornate, horror = dripping/scratchy)
-- Positioned at top with room for character art below
-- May include subtle effects (shadows, outlines, gradients)
-
-RESTRICTIONS:
-- NO distorted anatomy or unclear character designs
-- NO cluttered or confusing compositions
-- NO watermarks, signatures, or modern UI elements
-- Title must be clearly readable and properly integrated"""
+        parts.append(_COVER_REQUIREMENTS_TEMPLATE.format(story_title=story_title))
         
-        return prompt
+        return "".join(parts)
 
 
 # Convenience function
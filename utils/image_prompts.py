@@ -4,9 +4,115 @@ Comic art prompt templates for image generation.
 Provides specialized prompts for different comic styles and scenes.
 """
 
+from functools import lru_cache
 from typing import Dict
 
 
+# Prompt bodies for ComicPromptTemplates, parsed once at import. Like the
+# story prompts, each puts its fixed instructions first and the per-request
+# fields (style, then scene or action) last, so prompts share a long
+# identical prefix.
+_SCENE_PROMPT_TEMPLATE = """Create a single comic book panel illustration.
+
+COMPOSITION REQUIREMENTS:
+- Single panel, no panel borders or frames
+- Cinematic wide-angle composition (16:9)
+- Dynamic perspective and dramatic angles
+- Focus on the key moment of the scene
+- Rich environmental details
+- Expressive character poses and faces
+- Professional comic book quality artwork
+
+MUST NOT INCLUDE:
+- Any text, words, or letters
+- Speech bubbles or thought bubbles
+- Captions or narration boxes
+- Watermarks or signatures
+- Multiple panels or comic strips
+- Real photographs or people
+
+Generate a visually stunning comic panel that captures the essence of the scene below.
+
+ART STYLE: {style_desc}
+
+SCENE TO ILLUSTRATE: {scene_text}"""
+
+_COVER_PROMPT_TEMPLATE = """Create a comic book cover illustration.
+
+COVER REQUIREMENTS:
+- Dramatic hero pose or action scene
+- Eye-catching composition
+- Bold and dynamic layout
+- Professional comic book cover quality
+- Vibrant, attention-grabbing colors
+- Epic and heroic atmosphere
+
+MUST NOT INCLUDE:
+- Any text, titles, or logos
+- Speech bubbles
+- Real photographs
+
+Create an epic comic book cover that would grab attention on a shelf.
+
+ART STYLE: {style_desc}
+
+TITLE: {story_title}
+THEME: {story_theme}"""
+
+_ACTION_PROMPT_TEMPLATE = """Create a dynamic action comic panel.
+
+ACTION PANEL REQUIREMENTS:
+- Explosive dynamic composition
+- Motion lines and impact effects
+- Dramatic perspective (low angle or dutch angle)
+- Energy and movement in every element
+- Intense lighting with strong contrasts
+- Characters in mid-action poses
+
+MUST NOT INCLUDE:
+- Any text or sound effects
+- Speech bubbles
+- Watermarks
+
+Create a high-impact action scene that jumps off the page!
+
+ART STYLE: {style_desc}
+
+ACTION: {action_description}"""
+
+_EMOTIONAL_PROMPT_TEMPLATE = """Create an emotionally impactful comic panel.
+
+EMOTIONAL REQUIREMENTS:
+- Close-up or medium shot for emotional impact
+- Expressive character faces and body language
+- Atmospheric environment that reinforces the mood
+- Color palette that matches the emotion
+
+MUST NOT INCLUDE:
+- Any text or captions
+- Speech bubbles
+- Watermarks
+
+Create a panel that makes the viewer feel the emotion.
+
+ART STYLE: {style_desc}
+
+LIGHTING: {lighting}
+
+SCENE: {scene_text}
+EMOTION: {emotion}"""
+
+# Lighting direction for each emotion in get_emotional_prompt
+_EMOTION_LIGHTING: Dict[str, str] = {
+    "sad": "soft blue shadows, melancholic atmosphere, rain or mist",
+    "happy": "warm golden lighting, bright cheerful colors, sunny atmosphere",
+    "tense": "harsh dramatic shadows, red/orange accents, claustrophobic framing",
+    "mysterious": "deep shadows, fog, moonlight, cool blue-purple palette",
+    "romantic": "soft pink/warm lighting, dreamy atmosphere, gentle glow",
+    "angry": "intense red lighting, sharp angles, aggressive composition"
+}
+
+
 class ComicPromptTemplates:
     """Templates for generating comic-style image prompts."""
     
@@ -36,6 +142,26 @@ class ComicPromptTemplates:
         )
     }
     
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _styled_template(template: str, style: str) -> str:
+        """
+        Fill in a prompt template's art style, leaving its other fields.
+        
+        Memoized: there are only a few templates and styles, so every
+        combination is resolved once and the builders only format the
+        per-request fields.
+        
+        Args:
+            template: One of the module-level prompt templates
+            style: Art style key (unknown keys fall back to western_comic)
+            
+        Returns:
+            str: The template with {style_desc} replaced
+        """
+        style_desc = ComicPromptTemplates.STYLES.get(style, ComicPromptTemplates.STYLES["western_comic"])
+        return template.replace("{style_desc}", style_desc)
+    
     @staticmethod
     def get_scene_prompt(scene_text: str, style: str = "western_comic") -> str:
         """
@@ -48,32 +174,8 @@ class ComicPromptTemplates:
         Returns:
             str: Formatted image generation prompt
         """
-        style_desc = ComicPromptTemplates.STYLES.get(style, ComicPromptTemplates.STYLES["western_comic"])
-        
-        return f"""Create a single comic book panel illustration:
-
-SCENE TO ILLUSTRATE: {scene_text}
-
-ART STYLE: {style_desc}
-
-COMPOSITION REQUIREMENTS:
-- Single panel, no panel borders or frames
-- Cinematic wide-angle composition (16:9)
-- Dynamic perspective and dramatic angles
-- Focus on the key moment of the scene
-- Rich environmental details
-- Expressive character poses and faces
-- Professional comic book quality artwork
-
-MUST NOT INCLUDE:
-- Any text, words, or letters
-- Speech bubbles or thought bubbles
-- Captions or narration boxes
-- Watermarks or signatures
-- Multiple panels or comic strips
-- Real photographs or people
-
-Generate a visually stunning comic panel that captures the essence of this scene."""
+        template = ComicPromptTemplates._styled_template(_SCENE_PROMPT_TEMPLATE, style)
+        return template.format(scene_text=scene_text)
     
     @staticmethod
     def get_cover_prompt(story_title: str, story_theme: str, style: str = "western_comic") -> str:
@@ -88,29 +190,8 @@ Generate a visually stunning comic panel that captures the essence of this scene
         Returns:
             str: Formatted cover image prompt
         """
-        style_desc = ComicPromptTemplates.STYLES.get(style, ComicPromptTemplates.STYLES["western_comic"])
-        
-        return f"""Create a comic book cover illustration:
-
-TITLE: {story_title}
-THEME: {story_theme}
-
-ART STYLE: {style_desc}
-
-COVER REQUIREMENTS:
-- Dramatic hero pose or action scene
-- Eye-catching composition
-- Bold and dynamic layout
-- Professional comic book cover quality
-- Vibrant, attention-grabbing colors
-- Epic and heroic atmosphere
-
-MUST NOT INCLUDE:
-- Any text, titles, or logos
-- Speech bubbles
-- Real photographs
-
-Create an epic comic book cover that would grab attention on a shelf."""
+        template = ComicPromptTemplates._styled_template(_COVER_PROMPT_TEMPLATE, style)
+        return template.format(story_title=story_title, story_theme=story_theme)
     
     @staticmethod
     def get_action_prompt(action_description: str, style: str = "western_comic") -> str:
@@ -124,28 +205,8 @@ Create an epic comic book cover that would grab attention on a shelf."""
         Returns:
             str: Formatted action scene prompt
         """
-        style_desc = ComicPromptTemplates.STYLES.get(style, ComicPromptTemplates.STYLES["western_comic"])
-        
-        return f"""Create a dynamic action comic panel:
-
-ACTION: {action_description}
-
-ART STYLE: {style_desc}
-
-ACTION PANEL REQUIREMENTS:
-- Explosive dynamic composition
-- Motion lines and impact effects
-- Dramatic perspective (low angle or dutch angle)
-- Energy and movement in every element
-- Intense lighting with strong contrasts
-- Characters in mid-action poses
-
-MUST NOT INCLUDE:
-- Any text or sound effects
-- Speech bubbles
-- Watermarks
-
-Create a high-impact action scene that jumps off the page!"""
+        template = ComicPromptTemplates._styled_template(_ACTION_PROMPT_TEMPLATE, style)
+        return template.format(action_description=action_description)
     
     @staticmethod  
     def get_emotional_prompt(emotion: str, scene_text: str, style: str = "western_comic") -> str:
@@ -160,38 +221,9 @@ Create a high-impact action scene that jumps off the page!"""
         Returns:
             str: Formatted emotional scene prompt
         """
-        emotion_lighting = {
-            "sad": "soft blue shadows, melancholic atmosphere, rain or mist",
-            "happy": "warm golden lighting, bright cheerful colors, sunny atmosphere",
-            "tense": "harsh dramatic shadows, red/orange accents, claustrophobic framing",
-            "mysterious": "deep shadows, fog, moonlight, cool blue-purple palette",
-            "romantic": "soft pink/warm lighting, dreamy atmosphere, gentle glow",
-            "angry": "intense red lighting, sharp angles, aggressive composition"
-        }
-        
-        lighting = emotion_lighting.get(emotion.lower(), "dramatic cinematic lighting")
-        style_desc = ComicPromptTemplates.STYLES.get(style, ComicPromptTemplates.STYLES["western_comic"])
-        
-        return f"""Create an emotionally impactful comic panel:
-
-SCENE: {scene_text}
-EMOTION: {emotion}
-
-ART STYLE: {style_desc}
-
-EMOTIONAL REQUIREMENTS:
-- {lighting}
-- Close-up or medium shot for emotional impact
-- Expressive character faces and body language
-- Atmospheric environment that reinforces the mood
-- Color palette that matches the emotion
-
-MUST NOT INCLUDE:
-- Any text or captions
-- Speech bubbles
-- Watermarks
-
-Create a panel that makes the viewer feel the emotion."""
+        lighting = _EMOTION_LIGHTING.get(emotion.lower(), "dramatic cinematic lighting")
+        template = ComicPromptTemplates._styled_template(_EMOTIONAL_PROMPT_TEMPLATE, style)
+        return template.format(scene_text=scene_text, emotion=emotion, lighting=lighting)
     
     @staticmethod
     def enhance_prompt_for_consistency(
@@ -0,0 +1,200 @@
+"""
+Exact-match cache for LLM responses.
+
+Maps a hash of (operation, prompt, model) to the validated result of that
+request, stored in SQLite so repeated prompts (a restarted story, another
+session, development runs) skip the API round-trip, even after a restart.
+"""
+
+import json
+import logging
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    op TEXT NOT NULL,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL
+)
+"""
+
+
+class LLMCache:
+    """LLM response cache backed by SQLite, with optional expiry."""
+    
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: Optional[float] = None,
+        max_entries: int = 512
+    ):
+        """
+        Open (or create) the cache database and drop expired entries.
+        
+        Args:
+            path: SQLite database file, or None to keep entries in memory only
+            ttl: Seconds an entry stays valid, or None to keep it until evicted
+            max_entries: Maximum number of entries; the oldest are evicted first
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        # One connection shared by all threads (prefetch workers included);
+        # the lock serializes its use
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._purge_expired()
+    
+    @staticmethod
+    def make_key(op: str, prompt: str, model: str) -> str:
+        """
+        Build the cache key for a request.
+        
+        Args:
+            op: Kind of request, e.g. "scene", "choices", "title" or "panels"
+            prompt: Full prompt text
+            model: Model name the prompt is sent to
+        
+        Returns:
+            str: Hex SHA-256 of the request
+        """
+        payload = json.dumps({"op": op, "prompt": prompt, "model": model}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        op: str = "",
+        model: str = ""
+    ) -> Any:
+        """
+        Return the cached value for a key, computing and storing it on a miss.
+        
+        The value must be JSON-serializable to be stored. If compute raises,
+        nothing is cached and the exception propagates.
+        
+        Args:
+            key: Key from make_key
+            compute: Function producing the value on a miss
+            op: Kind of request, stored alongside the entry
+            model: Model name, stored alongside the entry
+        
+        Returns:
+            Any: The cached or freshly computed value
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone()
+            if row is not None:
+                self.hits += 1
+                return json.loads(row[0])
+            self.misses += 1
+        
+        # Computed outside the lock so slow API calls don't block other lookups
+        value = compute()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        
+        try:
+            encoded = json.dumps(value)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, encoded, op, model, now, expires_at)
+                )
+                # Evict the oldest entries beyond the size limit
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning("⚠ Could not write LLM cache: %s", e)
+        
+        return value
+    
+    def purge_older_than(self, days: float) -> int:
+        """
+        Delete entries created more than the given number of days ago.
+        
+        Args:
+            days: Maximum entry age in days
+        
+        Returns:
+            int: Number of entries deleted
+        """
+        cutoff = time.time() - days * 86400
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,)).rowcount
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dict[str, int]: Hits, misses and current number of entries
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, falling back to an in-memory one if the file is unusable."""
+        if self.path:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                # WAL lets other processes (e.g. a second app instance) read while one writes
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(_SCHEMA)
+                return conn
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("⚠ Could not open LLM cache, keeping it in memory: %s", e)
+        
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute(_SCHEMA)
+        return conn
+    
+    def _purge_expired(self) -> None:
+        """Delete entries whose TTL has passed."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),)
+            )
+
+
+def create_llm_cache() -> Optional[LLMCache]:
+    """
+    Create the LLM response cache for the current settings.
+    
+    With temperature 0 responses are deterministic and entries never expire.
+    Otherwise caching is off unless LLM_CACHE_DETERMINISTIC_ONLY is disabled,
+    in which case entries expire after LLM_CACHE_TTL seconds.
+    
+    Returns:
+        Optional[LLMCache]: The cache, or None if caching is disabled
+    """
+    if settings.temperature == 0:
+        return LLMCache(settings.llm_cache_path)
+    if settings.cache_deterministic_only:
+        return None
+    return LLMCache(settings.llm_cache_path, ttl=settings.llm_cache_ttl)
@@ -3,15 +3,47 @@ Prompt templates for AI story generation.
 
 Contains carefully crafted prompts for different generation tasks.
 Third-person narrative style for immersive storytelling.
+
+Every prompt puts its fixed instructions first and the per-request text
+(story context, then the latest choice or scene) last, so consecutive
+requests share a long identical prefix that Gemini's implicit prompt
+caching can reuse.
 """
 
+import json
+import re
+from functools import lru_cache
 from typing import Dict
 
 
+# "CHOICE_1: ..." / "CHOICE_2: ..." lines in a choices response
+_CHOICE_LINE_RE = re.compile(r'^\s*CHOICE_([12]):[ \t]*(.*?)\s*$', re.MULTILINE)
+
+# Panel header ("PANEL_n...") or attribute ("VISUAL: ...") lines in a panel breakdown
+_PANEL_LINE_RE = re.compile(
+    r'^[ \t]*(?:(PANEL_)|(VISUAL|ACTION|CAMERA|EMOTION|DIALOGUE):)(.*)$',
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Keys of a panel in a panel breakdown
+_PANEL_FIELDS = ('visual', 'action', 'camera', 'emotion', 'dialogue')
+
+# Stripped scene lines that are choices or questions to the reader, not narrative
+_META_LINE_RE = re.compile(r'CHOICE|Option|\[|(?i:what do you|what will you)')
+
+
 class PromptTemplates:
-    """Collection of prompt templates for story generation."""
+    """
+    Collection of prompt templates for story generation.
+    
+    Every prompt is memoized: the same prompt is requested again by
+    fallbacks, prefetching and restarts, and most embed the full story
+    context or scene text. All arguments are strings or ints, so they
+    can serve as cache keys directly.
+    """
     
     @staticmethod
+    @lru_cache(maxsize=256)
     def get_initial_scene_prompt(user_prompt: str) -> str:
         """
         Generate prompt for creating the first scene.
@@ -24,8 +56,6 @@ class PromptTemplates:
         """
         return f"""You are a master storyteller crafting an engaging comic book narrative. Create a captivating opening scene.
 
-Story Concept: {user_prompt}
-
 NARRATIVE STYLE:
 - Write in THIRD PERSON perspective (he/she/they, character names)
 - The reader is an OBSERVER watching the story unfold, NOT a character in it
@@ -42,9 +72,12 @@ STORYTELLING GUIDELINES:
 7. Use present tense for immediacy ("She runs..." not "She ran...")
 
 Write ONLY the scene narrative. No choices, no questions to reader, no meta-commentary.
-Make it visual, dramatic, and impossible to look away from!"""
+Make it visual, dramatic, and impossible to look away from!
+
+Story Concept: {user_prompt}"""
     
     @staticmethod
+    @lru_cache(maxsize=256)
     def get_continuation_prompt(story_context: str, selected_choice: str) -> str:
         """
         Generate prompt for continuing the story based on a choice.
@@ -58,10 +91,6 @@ Make it visual, dramatic, and impossible to look away from!"""
         """
         return f"""You are continuing an epic comic book narrative. The reader has chosen what happens next.
 
-{story_context}
-
-WHAT HAPPENS NEXT: "{selected_choice}"
-
 NARRATIVE STYLE:
 - Write in THIRD PERSON perspective (he/she/they, character names)
 - The reader OBSERVES the story - they are NOT a character in it
@@ -79,9 +108,14 @@ STORYTELLING GUIDELINES:
 8. Use present tense ("He discovers..." not "He discovered...")
 
 Write ONLY the scene narrative. No choices, no questions, no meta-commentary.
-Make every panel count - drama, emotion, action!"""
+Make every panel count - drama, emotion, action!
+
+{story_context}
+
+WHAT HAPPENS NEXT: "{selected_choice}\""""
     
     @staticmethod
+    @lru_cache(maxsize=256)
     def get_choices_prompt(scene_content: str, story_context: str) -> str:
         """
         Generate prompt for creating 2 distinct choices.
@@ -95,12 +129,6 @@ Make every panel count - drama, emotion, action!"""
         """
         return f"""You are creating story branches for a comic narrative. Generate 2 exciting directions the story could take.
 
-Story So Far:
-{story_context}
-
-Current Scene:
-{scene_content}
-
 IMPORTANT - These are STORY DIRECTIONS, not reader actions:
 - Describe what HAPPENS NEXT in the story (third person)
 - Focus on plot developments, character actions, or events
@@ -123,9 +151,42 @@ Format your response EXACTLY as:
 CHOICE_1: [what happens in direction 1]
 CHOICE_2: [what happens in direction 2]
 
-No other text or explanations."""
+No other text or explanations.
+
+Story So Far:
+{story_context}
+
+Current Scene:
+{scene_content}"""
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def get_scene_bundle_prompt(scene_prompt: str) -> str:
+        """
+        Wrap a scene prompt so one response also carries the choices and title.
+        
+        Args:
+            scene_prompt: Initial or continuation scene prompt
+            
+        Returns:
+            str: Formatted prompt for AI, expecting a JSON response
+        """
+        return f"""OUTPUT FORMAT (this replaces the "write ONLY the scene narrative" rule below):
+Respond with a single JSON object with exactly these keys:
+- "scene": the scene narrative, written as described above
+- "choices": an array of exactly 2 story directions for what happens next.
+  Each is 8-15 words, third person, describing a plot development or
+  character action (NOT "You decide to..."). Both must be genuinely
+  interesting and lead to meaningfully different outcomes.
+- "title": a short comic book chapter title for the scene, 2-5 words,
+  no punctuation except ! or ?
+
+No other text outside the JSON object.
+
+{scene_prompt}"""
     
     @staticmethod
+    @lru_cache(maxsize=256)
     def get_story_ending_prompt(story_context: str, selected_choice: str) -> str:
         """
         Generate prompt for a satisfying story conclusion.
@@ -139,10 +200,6 @@ No other text or explanations."""
         """
         return f"""You are crafting the epic conclusion to a comic book narrative. Make it unforgettable.
 
-{story_context}
-
-FINAL DIRECTION: "{selected_choice}"
-
 NARRATIVE STYLE:
 - Write in THIRD PERSON perspective
 - The reader observes the grand finale unfold
@@ -158,9 +215,14 @@ STORYTELLING GUIDELINES:
 7. Use present tense for immediacy
 
 This is THE END - no cliffhangers, no new questions.
-Write ONLY the finale. Make readers feel something!"""
+Write ONLY the finale. Make readers feel something!
+
+{story_context}
+
+FINAL DIRECTION: "{selected_choice}\""""
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def get_panel_breakdown_prompt(scene_content: str, num_panels: int = 4) -> str:
         """
         Generate prompt for breaking a scene into comic panels.
@@ -174,9 +236,6 @@ Write ONLY the finale. Make readers feel something!"""
         """
         return f"""You are a professional comic book storyboard artist. Break this scene into {num_panels} visually distinct sequential panels that will create a compelling comic page.
 
-SCENE TO VISUALIZE:
-{scene_content}
-
 For each panel, provide DETAILED information:
 
 1. VISUAL: Complete visual description including:
@@ -218,27 +277,21 @@ VISUAL STORYTELLING PRINCIPLES:
 CHARACTER CONSISTENCY NOTE:
 Describe character appearances in detail in the FIRST panel they appear, then reference "same character" or "[character name]" in subsequent panels to maintain visual consistency.
 
-Format your response EXACTLY as:
-
-PANEL_1:
-VISUAL: [detailed visual description with setting, characters, colors, objects]
-ACTION: [specific poses, expressions, movements]
-CAMERA: [shot type and angle, e.g., "Wide shot, slightly low angle - establishing the scene"]
-EMOTION: [mood and tension level]
-DIALOGUE: [short speech/sound effect or "none"]
+OUTPUT FORMAT:
+Respond with a single JSON object with one key, "panels": an array of exactly {num_panels} panel objects in reading order. Each panel object has these string keys:
+- "visual": detailed visual description with setting, characters, colors, objects
+- "action": specific poses, expressions, movements
+- "camera": shot type and angle, e.g. "Wide shot, slightly low angle - establishing the scene"
+- "emotion": mood and tension level
+- "dialogue": short speech/sound effect, or "none"
 
-PANEL_2:
-VISUAL: [detailed visual description]
-ACTION: [specific poses, expressions, movements]
-CAMERA: [shot type and angle]
-EMOTION: [mood]
-DIALOGUE: [speech or "none"]
+No other text outside the JSON object.
 
-(continue for all {num_panels} panels)
-
-Respond with ONLY the panel breakdowns. No introductions or explanations."""
+SCENE TO VISUALIZE:
+{scene_content}"""
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def get_scene_title_prompt(scene_content: str) -> str:
         """
         Generate a short, catchy title for a scene.
@@ -249,9 +302,7 @@ Respond with ONLY the panel breakdowns. No introductions or explanations."""
         Returns:
             str: Formatted prompt for AI
         """
-        return f"""Create a short, catchy comic book style title for this scene:
-
-{scene_content}
+        return f"""Create a short, catchy comic book style title for the scene below.
 
 GUIDELINES:
 - 2-5 words maximum
@@ -261,9 +312,13 @@ GUIDELINES:
 
 Examples: "The Awakening", "Shadows Fall", "Point of No Return", "Into the Fire"
 
-Respond with ONLY the title, nothing else."""
+Respond with ONLY the title, nothing else.
+
+SCENE:
+{scene_content}"""
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def get_character_description_prompt(scene_content: str, story_context: str) -> str:
         """
         Extract character descriptions for visual consistency.
@@ -277,12 +332,6 @@ Respond with ONLY the title, nothing else."""
         """
         return f"""Analyze this story and create a DETAILED character reference sheet for the comic artist. This will be used to maintain visual consistency across all panels.
 
-STORY CONTEXT:
-{story_context}
-
-CURRENT SCENE:
-{scene_content}
-
 For each main character (max 3), provide SPECIFIC visual details:
 
 - NAME: Character name or role (e.g., "Maya" or "The Detective")
@@ -331,7 +380,13 @@ UNIQUE FEATURES: [anything distinctive]
 
 (repeat for other characters)
 
-Be SPECIFIC with colors, measurements, and details. Vague descriptions like "average looking" are not helpful."""
+Be SPECIFIC with colors, measurements, and details. Vague descriptions like "average looking" are not helpful.
+
+STORY CONTEXT:
+{story_context}
+
+CURRENT SCENE:
+{scene_content}"""
 
 
 class PromptFormatter:
@@ -374,16 +429,10 @@ class PromptFormatter:
         Raises:
             ValueError: If choices cannot be parsed
         """
-        lines = [line.strip() for line in ai_response.strip().split('\n') if line.strip()]
-        
-        choice1 = None
-        choice2 = None
-        
-        for line in lines:
-            if line.startswith('CHOICE_1:'):
-                choice1 = line.replace('CHOICE_1:', '').strip()
-            elif line.startswith('CHOICE_2:'):
-                choice2 = line.replace('CHOICE_2:', '').strip()
+        # If a choice line repeats, the last one wins
+        choices = dict(_CHOICE_LINE_RE.findall(ai_response))
+        choice1 = choices.get('1')
+        choice2 = choices.get('2')
         
         if not choice1 or not choice2:
             raise ValueError(f"Could not extract both choices from response: {ai_response}")
@@ -401,28 +450,20 @@ class PromptFormatter:
         Returns:
             str: Cleaned scene text
         """
-        # Remove any markdown formatting
-        scene_text = scene_text.replace('**', '').replace('*', '')
-        
-        # Remove any accidental choice text
-        lines = scene_text.split('\n')
-        cleaned_lines = []
+        # Remove any markdown formatting (bold and italic markers)
+        scene_text = scene_text.replace('*', '')
         
-        for line in lines:
-            line = line.strip()
-            # Skip lines that look like choices or meta-commentary
-            if line.startswith('CHOICE') or line.startswith('Option') or line.startswith('['):
-                continue
-            if line.lower().startswith('what do you') or line.lower().startswith('what will you'):
-                continue
-            cleaned_lines.append(line)
-        
-        return '\n\n'.join(line for line in cleaned_lines if line).strip()
+        # Drop blank lines and accidental choice text or meta-commentary
+        lines = (line.strip() for line in scene_text.split('\n'))
+        return '\n\n'.join(line for line in lines if line and not _META_LINE_RE.match(line))
 
     @staticmethod
     def extract_panel_breakdown(ai_response: str) -> list[dict]:
         """
-        Extract panel breakdown from AI response.
+        Extract panel breakdown from a plain-text AI response.
+        
+        Fallback for answers to get_panel_breakdown_prompt that come back as
+        "PANEL_N:" / "VISUAL: ..." lines instead of JSON.
         
         Args:
             ai_response: Raw AI response containing panel descriptions
@@ -436,32 +477,22 @@ class PromptFormatter:
         panels = []
         current_panel = {}
         
-        lines = ai_response.strip().split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
+        # One scan picks out the header and attribute lines; anything else is ignored
+        for header, attribute, value in _PANEL_LINE_RE.findall(ai_response):
             # Check for panel header
-            if line.upper().startswith('PANEL_'):
+            if header:
                 if current_panel:
                     panels.append(current_panel)
                 current_panel = {}
                 continue
             
             # Parse panel attributes
-            if line.upper().startswith('VISUAL:'):
-                current_panel['visual'] = line.split(':', 1)[1].strip()
-            elif line.upper().startswith('ACTION:'):
-                current_panel['action'] = line.split(':', 1)[1].strip()
-            elif line.upper().startswith('CAMERA:'):
-                current_panel['camera'] = line.split(':', 1)[1].strip()
-            elif line.upper().startswith('EMOTION:'):
-                current_panel['emotion'] = line.split(':', 1)[1].strip()
-            elif line.upper().startswith('DIALOGUE:'):
-                dialogue = line.split(':', 1)[1].strip()
-                current_panel['dialogue'] = None if dialogue.lower() == 'none' else dialogue
+            key = attribute.lower()
+            value = value.strip()
+            if key == 'dialogue':
+                current_panel['dialogue'] = None if value.lower() == 'none' else value
+            else:
+                current_panel[key] = value
         
         # Don't forget the last panel
         if current_panel:
@@ -472,6 +503,47 @@ class PromptFormatter:
         
         return panels
     
+    @staticmethod
+    def parse_panel_breakdown_json(ai_response: str) -> list[dict]:
+        """
+        Parse a JSON panel breakdown (see get_panel_breakdown_prompt).
+        
+        Args:
+            ai_response: Raw AI response, a JSON object with a "panels" array
+            
+        Returns:
+            list: Panel dictionaries in the same shape as extract_panel_breakdown;
+            empty fields are left out and "none" dialogue becomes None
+            
+        Raises:
+            ValueError: If the response is not valid JSON or has no panels
+        """
+        try:
+            data = json.loads(ai_response)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Panel breakdown is not valid JSON: {e}")
+        
+        raw_panels = data.get('panels') if isinstance(data, dict) else None
+        panels = []
+        
+        for raw_panel in raw_panels or []:
+            if not isinstance(raw_panel, dict):
+                continue
+            panel = {}
+            for key in _PANEL_FIELDS:
+                value = str(raw_panel.get(key) or '').strip()
+                if value:
+                    panel[key] = value
+            if panel.get('dialogue', '').lower() == 'none':
+                panel['dialogue'] = None
+            if panel:
+                panels.append(panel)
+        
+        if not panels:
+            raise ValueError(f"Could not extract panels from response: {ai_response}")
+        
+        return panels
+    
     @staticmethod
     def extract_scene_title(ai_response: str) -> str:
         """
@@ -483,8 +555,8 @@ class PromptFormatter:
         Returns:
             str: Clean scene title
         """
-        # Clean and return first line
-        title = ai_response.strip().split('\n')[0].strip()
+        # Clean and return first line; partition stops at the first newline
+        title = ai_response.lstrip().partition('\n')[0].strip()
         # Remove quotes if present
         title = title.strip('"\'')
         return title
@@ -4,50 +4,76 @@ Session manager for Streamlit state management.
 Handles persistence of story data across user interactions.
 """
 
-import streamlit as st
-from typing import Optional
-from models.story import Story
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from models.story import Story
+
+
+def _session_state() -> Any:
+    """
+    Get Streamlit's session state.
+    
+    Streamlit is imported here rather than at module level: the utils
+    package imports this module, and services that only need the prompt
+    helpers shouldn't pay for loading Streamlit. Inside the app it is
+    already loaded, so this is a sys.modules lookup.
+    """
+    import streamlit as st
+    return st.session_state
+
+
+@dataclass(slots=True)
+class AppState:
+    """Per-session application state, kept under a single session_state key."""
+    story: Optional["Story"] = None
+    loading: bool = False
+    error: Optional[str] = None
+    success: Optional[str] = None
 
 
 class SessionManager:
     """Manages Streamlit session state for the story application."""
     
-    # Session state keys
-    STORY_KEY = "current_story"
-    INITIALIZED_KEY = "session_initialized"
-    LOADING_KEY = "is_loading"
-    ERROR_KEY = "error_message"
-    SUCCESS_KEY = "success_message"
+    # Session state key holding the AppState
+    STATE_KEY = "app_state"
     
     @staticmethod
     def initialize() -> None:
         """Initialize session state with default values."""
-        if SessionManager.INITIALIZED_KEY not in st.session_state:
-            st.session_state[SessionManager.INITIALIZED_KEY] = True
-            st.session_state[SessionManager.STORY_KEY] = None
-            st.session_state[SessionManager.LOADING_KEY] = False
-            st.session_state[SessionManager.ERROR_KEY] = None
-            st.session_state[SessionManager.SUCCESS_KEY] = None
+        session_state = _session_state()
+        if SessionManager.STATE_KEY not in session_state:
+            session_state[SessionManager.STATE_KEY] = AppState()
+    
+    @staticmethod
+    def _state() -> AppState:
+        """Get this session's AppState, creating it on first use."""
+        session_state = _session_state()
+        state = session_state.get(SessionManager.STATE_KEY)
+        if state is None:
+            state = session_state[SessionManager.STATE_KEY] = AppState()
+        return state
     
     @staticmethod
-    def get_story() -> Optional[Story]:
+    def get_story() -> Optional["Story"]:
         """
         Get the current story from session state.
         
         Returns:
             Optional[Story]: Current story or None
         """
-        return st.session_state.get(SessionManager.STORY_KEY)
+        return SessionManager._state().story
     
     @staticmethod
-    def set_story(story: Optional[Story]) -> None:
+    def set_story(story: Optional["Story"]) -> None:
         """
         Set the current story in session state.
         
         Args:
             story: Story to store
         """
-        st.session_state[SessionManager.STORY_KEY] = story
+        SessionManager._state().story = story
     
     @staticmethod
     def has_story() -> bool:
@@ -62,7 +88,8 @@ class SessionManager:
     @staticmethod
     def clear_story() -> None:
         """Clear the current story from session."""
-        st.session_state[SessionManager.STORY_KEY] = None
+        SessionManager._state().story = None
+        _session_state().pop('compact_scene_html', None)
         SessionManager.clear_messages()
     
     @staticmethod
@@ -73,7 +100,7 @@ class SessionManager:
         Args:
             is_loading: Loading state
         """
-        st.session_state[SessionManager.LOADING_KEY] = is_loading
+        SessionManager._state().loading = is_loading
     
     @staticmethod
     def is_loading() -> bool:
@@ -83,7 +110,7 @@ class SessionManager:
         Returns:
             bool: True if loading
         """
-        return st.session_state.get(SessionManager.LOADING_KEY, False)
+        return SessionManager._state().loading
     
     @staticmethod
     def set_error(message: str) -> None:
@@ -93,8 +120,9 @@ class SessionManager:
         Args:
             message: Error message to display
         """
-        st.session_state[SessionManager.ERROR_KEY] = message
-        st.session_state[SessionManager.SUCCESS_KEY] = None
+        state = SessionManager._state()
+        state.error = message
+        state.success = None
     
     @staticmethod
     def set_success(message: str) -> None:
@@ -104,8 +132,9 @@ class SessionManager:
         Args:
             message: Success message to display
         """
-        st.session_state[SessionManager.SUCCESS_KEY] = message
-        st.session_state[SessionManager.ERROR_KEY] = None
+        state = SessionManager._state()
+        state.success = message
+        state.error = None
     
     @staticmethod
     def get_error() -> Optional[str]:
@@ -115,7 +144,7 @@ class SessionManager:
         Returns:
             Optional[str]: Error message or None
         """
-        return st.session_state.get(SessionManager.ERROR_KEY)
+        return SessionManager._state().error
     
     @staticmethod
     def get_success() -> Optional[str]:
@@ -125,19 +154,21 @@ class SessionManager:
         Returns:
             Optional[str]: Success message or None
         """
-        return st.session_state.get(SessionManager.SUCCESS_KEY)
+        return SessionManager._state().success
     
     @staticmethod
     def clear_messages() -> None:
         """Clear all messages (error and success)."""
-        st.session_state[SessionManager.ERROR_KEY] = None
-        st.session_state[SessionManager.SUCCESS_KEY] = None
+        state = SessionManager._state()
+        state.error = None
+        state.success = None
     
     @staticmethod
     def reset_session() -> None:
         """Reset entire session state."""
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        session_state = _session_state()
+        for key in list(session_state.keys()):
+            del session_state[key]
         SessionManager.initialize()
     
     @staticmethod